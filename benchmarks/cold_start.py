@@ -0,0 +1,146 @@
+"""
+Cold-start benchmark for the serverless entry point (api/index.py).
+
+Every run is a fresh interpreter with an empty upload directory, as on a new
+serverless instance. It measures:
+  - import_seconds:        `from api.index import app`
+  - first_upload_seconds:  the first POST /api/upload (synthetic dump)
+  - process_seconds:       interpreter start to end of the first upload
+
+Usage (from the repository root):
+  python benchmarks/cold_start.py                 compare with the checked-in baseline
+  python benchmarks/cold_start.py --update        record a new baseline
+Exits with status 1 when a median is slower than the baseline by more than
+--tolerance (default 30%).
+
+The baseline holds the medians of the tree it was recorded on (see its
+"note"), not a before/after comparison. Most of import_seconds is FastAPI
+and pydantic, which api/index.py needs to export `app`; the lazy imports of
+the backend's own modules move it by a few percent at most.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "cold_start_baseline.json")
+METRICS = ("import_seconds", "first_upload_seconds", "process_seconds")
+
+# Runs inside the fresh interpreter. The request is sent straight to the ASGI
+# app, so the benchmark needs no HTTP client or server.
+CHILD = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+sys.path[:0] = [ROOT, ROOT + "/benchmarks"]
+
+from api.index import app
+imported = time.perf_counter()
+
+from synthetic_dump import synthetic_dump
+payload = synthetic_dump(templates=TEMPLATES, tags_per_template=TAGS).encode("utf-16")
+boundary = "coldstartboundary"
+body = (
+    f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"dump.csv\"\r\n"
+    f"Content-Type: text/csv\r\n\r\n"
+).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+
+async def upload():
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/upload", "raw_path": b"/api/upload",
+        "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={boundary}".encode()),
+                    (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {}
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(3600)
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            # The client has its answer; background tasks may still run after this
+            response["done"] = time.perf_counter()
+    await app(scope, receive, send)
+    return response
+
+request_started = time.perf_counter()
+response = asyncio.run(upload())
+print(json.dumps({
+    "status": response["status"],
+    "import_seconds": imported - started,
+    "first_upload_seconds": response["done"] - request_started,
+}))
+"""
+
+
+def run_once(templates, tags):
+    code = CHILD.replace("ROOT", repr(ROOT)).replace("TEMPLATES", str(templates)).replace("TAGS", str(tags))
+    with tempfile.TemporaryDirectory() as upload_dir:
+        env = dict(os.environ, AVEVA_UPLOAD_DIR=os.path.join(upload_dir, "uploads"))
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT, capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    if result["status"] != 200:
+        raise RuntimeError(f"Upload failed with status {result['status']}")
+    result["process_seconds"] = elapsed
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument("--templates", type=int, default=5)
+    ap.add_argument("--tags", type=int, default=1000, help="tags per template")
+    ap.add_argument("--tolerance", type=float, default=0.30)
+    ap.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    args = ap.parse_args()
+
+    runs = [run_once(args.templates, args.tags) for _ in range(args.runs)]
+    medians = {m: round(statistics.median(r[m] for r in runs), 4) for m in METRICS}
+    report = {
+        "note": "Medians of the tree this was recorded on; cold_start.py compares new runs with them",
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "templates": args.templates,
+        "tags_per_template": args.tags,
+        "median": medians,
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.update:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE}")
+        return 0
+
+    if not os.path.exists(BASELINE):
+        print("No baseline yet; run with --update to record one.")
+        return 0
+
+    with open(BASELINE, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["median"]
+    regressed = False
+    for m in METRICS:
+        limit = baseline[m] * (1 + args.tolerance)
+        flag = "REGRESSION" if medians[m] > limit else "ok"
+        regressed |= medians[m] > limit
+        print(f"{m:22s} {medians[m]:8.4f}s  baseline {baseline[m]:8.4f}s  {flag}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
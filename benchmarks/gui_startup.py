@@ -0,0 +1,106 @@
+"""
+Startup benchmark for the desktop GUI (main_gui.py).
+
+Every run is a fresh interpreter, as when an engineer launches the tool. It
+measures:
+  - import_seconds:        `import main_gui`
+  - build_seconds:         tk.Tk() and AvevaTagManagerApp(root)
+  - first_window_seconds:  start of the script to the main window being mapped
+  - process_seconds:       interpreter start to exit, as seen by the parent
+
+--root measures another checkout, so before/after numbers come from the
+same machine and interpreter:
+  git worktree add ../before <commit>
+  python benchmarks/gui_startup.py --root ../before --output before.json
+  python benchmarks/gui_startup.py --compare before.json
+
+A display is needed (on Linux without one, run it under xvfb-run). The
+PyInstaller build adds unpacking the archive to these numbers, so slow
+network shares magnify the differences rather than hide them.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS = ("import_seconds", "build_seconds", "first_window_seconds", "process_seconds")
+
+# Runs inside the fresh interpreter, in the same order as `python main_gui.py`
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, ROOT)
+
+import main_gui
+imported = time.perf_counter()
+
+root = main_gui.tk.Tk()
+app = main_gui.AvevaTagManagerApp(root)
+built = time.perf_counter()
+
+root.wait_visibility(root)
+root.update()
+shown = time.perf_counter()
+root.destroy()
+
+print(json.dumps({
+    "import_seconds": imported - started,
+    "build_seconds": built - imported,
+    "first_window_seconds": shown - started,
+}))
+"""
+
+
+def run_once(root):
+    code = CHILD.replace("ROOT", repr(root))
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = elapsed
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument("--root", default=ROOT, help="checkout to measure (default: this one)")
+    ap.add_argument("--output", help="write the report to this JSON file")
+    ap.add_argument("--compare", help="report of an earlier run to compare with")
+    args = ap.parse_args()
+
+    root = os.path.abspath(args.root)
+    # The first run warms the OS file cache and writes the .pyc files
+    run_once(root)
+    runs = [run_once(root) for _ in range(args.runs)]
+    report = {
+        "python": sys.version.split()[0],
+        "root": root,
+        "runs": args.runs,
+        "median": {m: round(statistics.median(r[m] for r in runs), 4) for m in METRICS},
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            before = json.load(f)["median"]
+        for m in METRICS:
+            after = report["median"][m]
+            change = (after - before[m]) / before[m] * 100 if before[m] else 0.0
+            print(f"{m:22s} {before[m]:8.4f}s -> {after:8.4f}s  ({change:+.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""
+Load test for the web API.
+
+Starts the app with uvicorn on a free local port and a fresh upload
+directory, then runs the browser workflow for --users concurrent users:
+  upload -> extract template -> extract area -> PLC matrix -> addresses
+  -> extension report -> delete session
+Each step runs for all users at once (a phase), so the peak RSS sampled
+during a phase belongs to that endpoint. Models and artifacts are shared per
+dump, so every user uploads a distinct dump unless --shared-dump is given
+(which measures the cached path instead).
+
+Reports per endpoint: requests, errors, p50/p95/p99 and mean latency,
+throughput (requests per second of phase time), mean response size and peak
+RSS of the server processes (read from /proc, so Linux only).
+
+Usage (from the repository root):
+  python benchmarks/load_test.py --users 8 --templates 10 --tags 5000
+  python benchmarks/load_test.py --workers 4 --output after.json --compare before.json
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from synthetic_dump import synthetic_dump  # noqa: E402
+
+PERCENTILES = (50, 95, 99)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(port, method, path, body=None, headers=None, timeout=600):
+    """Returns (status, response bytes, seconds). The body is read in full, as a browser would."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    started = time.perf_counter()
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, data, time.perf_counter() - started
+    finally:
+        conn.close()
+
+
+def multipart(filename, payload):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+class Server:
+    """uvicorn in a subprocess, with its own upload directory."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.port = free_port()
+        self.upload_dir = tempfile.TemporaryDirectory()
+        self.process = None
+
+    def __enter__(self):
+        env = dict(os.environ, AVEVA_UPLOAD_DIR=os.path.join(self.upload_dir.name, "uploads"))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "web_app.backend.main:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"],
+            cwd=ROOT, env=env
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {self.process.returncode}")
+            try:
+                if request(self.port, "GET", "/api/status", timeout=2)[0] == 200:
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError("uvicorn did not start within 60s")
+
+    def __exit__(self, *exc):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.upload_dir.cleanup()
+
+
+def _rss_of_tree(root_pid):
+    """Summed VmRSS (bytes) of a process and its descendants, or None without /proc."""
+    if not os.path.isdir("/proc"):
+        return None
+    parents = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                # The command name may contain spaces; fields resume after ")"
+                parents[int(name)] = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    tree = {root_pid}
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parents.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+
+    total = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+class RssSampler(threading.Thread):
+    """Samples the server's RSS in the background; reset() starts a new peak."""
+
+    def __init__(self, pid, interval=0.05):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self._stop_event = threading.Event()
+
+    def reset(self):
+        self.peak = _rss_of_tree(self.pid)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = _rss_of_tree(self.pid)
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.bytes = 0
+        self.phase_seconds = 0.0
+        self.peak_rss = None
+
+    def add(self, status, data, seconds):
+        self.latencies.append(seconds)
+        self.bytes += len(data)
+        if status >= 400:
+            self.errors += 1
+
+    def report(self):
+        values = sorted(self.latencies)
+        count = len(values)
+        result = {
+            "requests": count,
+            "errors": self.errors,
+            "mean_seconds": round(sum(values) / count, 4) if count else None,
+            "throughput_rps": round(count / self.phase_seconds, 2) if self.phase_seconds else None,
+            "mean_response_bytes": self.bytes // count if count else None,
+            "peak_rss_mb": round(self.peak_rss / 1024 / 1024, 1) if self.peak_rss else None,
+        }
+        for p in PERCENTILES:
+            value = percentile(values, p)
+            result[f"p{p}_seconds"] = round(value, 4) if value is not None else None
+        return result
+
+
+STEPS = ("upload", "extract_template", "extract_area", "extract_matrix", "extract_addresses",
+         "analyze_extensions", "delete_session")
+
+
+def step_request(name, session):
+    """(method, path, JSON body or None) of a workflow step for an uploaded session."""
+    session_id = session["session_id"]
+    if name == "extract_template":
+        return "POST", "/api/extract/template", {"session_id": session_id, "templates": session["templates"][:2]}
+    if name == "extract_area":
+        return "POST", "/api/extract/area", {"session_id": session_id, "areas": session["areas"][:2]}
+    if name == "extract_matrix":
+        return "POST", "/api/extract/matrix", {"session_id": session_id}
+    if name == "extract_addresses":
+        return "POST", "/api/extract/addresses", {"session_id": session_id, "alarm_only": False}
+    if name == "analyze_extensions":
+        return "POST", "/api/analyze/extensions", {"session_id": session_id}
+    return "DELETE", f"/api/session/{session_id}", None
+
+
+def run(args):
+    print(f"Generating {args.users} dump(s): {args.templates} templates x {args.tags} tags ...", file=sys.stderr)
+    base = synthetic_dump(templates=args.templates, tags_per_template=args.tags, areas=args.areas)
+    if args.shared_dump:
+        payloads = [base.encode("utf-16")] * args.users
+    else:
+        # A distinct header line per user gives every dump its own hash
+        payloads = [(f":Load test user {u}\n" + base).encode("utf-16") for u in range(args.users)]
+    headers = {"Accept-Encoding": args.accept_encoding} if args.accept_encoding else {}
+    sessions = [None] * args.users
+
+    def run_step(name, u):
+        if name == "upload":
+            body, upload_headers = multipart(f"dump{u}.csv", payloads[u])
+            status, data, seconds = request(server.port, "POST", "/api/upload", body, upload_headers)
+            sessions[u] = json.loads(data) if status == 200 else None
+            return status, data, seconds
+        if sessions[u] is None:
+            # The upload failed; count the step as failed without sending it
+            return 599, b"", 0.0
+        method, path, payload = step_request(name, sessions[u])
+        step_headers = dict(headers)
+        data = None
+        if payload is not None:
+            data = json.dumps(payload).encode()
+            step_headers["Content-Type"] = "application/json"
+        return request(server.port, method, path, data, step_headers)
+
+    stats = {name: EndpointStats() for name in STEPS}
+    with Server(args.workers) as server:
+        sampler = RssSampler(server.process.pid)
+        sampler.start()
+        try:
+            with ThreadPoolExecutor(max_workers=args.users) as pool:
+                for _ in range(args.iterations):
+                    for name in STEPS:
+                        endpoint = stats[name]
+                        sampler.reset()
+                        started = time.perf_counter()
+                        for status, data, seconds in pool.map(lambda u: run_step(name, u), range(args.users)):
+                            endpoint.add(status, data, seconds)
+                        endpoint.phase_seconds += time.perf_counter() - started
+                        if sampler.peak is not None:
+                            endpoint.peak_rss = max(endpoint.peak_rss or 0, sampler.peak)
+        finally:
+            sampler.stop()
+
+    return {
+        "python": sys.version.split()[0],
+        "users": args.users,
+        "workers": args.workers,
+        "iterations": args.iterations,
+        "templates": args.templates,
+        "tags_per_template": args.tags,
+        "dump_bytes": len(payloads[0]),
+        "shared_dump": args.shared_dump,
+        "accept_encoding": args.accept_encoding,
+        "endpoints": {name: s.report() for name, s in stats.items()},
+    }
+
+
+def print_report(report, baseline=None):
+    print(f"{report['users']} users, {report['workers']} worker(s), {report['iterations']} iteration(s), "
+          f"dump {report['dump_bytes'] / 1024 / 1024:.1f} MB")
+    columns = ["requests", "errors"] + [f"p{p}_seconds" for p in PERCENTILES] + ["mean_seconds", "throughput_rps", "peak_rss_mb"]
+    print(f"{'endpoint':20s}" + "".join(f"{c.replace('_seconds', ''):>16s}" for c in columns))
+    for name, values in report["endpoints"].items():
+        cells = []
+        for c in columns:
+            value = values[c]
+            cell = "n/a" if value is None else str(value)
+            old = (baseline or {}).get("endpoints", {}).get(name, {}).get(c)
+            if old and value is not None and c not in ("requests", "errors"):
+                cell += f" ({(value - old) / old:+.0%})"
+            cells.append(f"{cell:>16s}")
+        print(f"{name:20s}" + "".join(cells))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int, default=4, help="concurrent users")
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    ap.add_argument("--iterations", type=int, default=1, help="workflow repetitions per user")
+    ap.add_argument("--templates", type=int, default=5)
+    ap.add_argument("--tags", type=int, default=2000, help="tags per template")
+    ap.add_argument("--areas", type=int, default=10)
+    ap.add_argument("--shared-dump", action="store_true", help="every user uploads the same dump")
+    ap.add_argument("--accept-encoding", default="gzip", help="Accept-Encoding sent with downloads ('' for none)")
+    ap.add_argument("--output", help="write the results as JSON")
+    ap.add_argument("--compare", help="JSON results of an earlier run; changes are shown next to each value")
+    args = ap.parse_args()
+
+    report = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {args.output}")
+    failed = sum(e["errors"] for e in report["endpoints"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Synthetic Galaxy dump generator for the benchmarks.
+Produces the same shape as a real export: header lines, a $Area template and
+user templates with Tagname, Area, ShortDesc, Extensions(MxBigString) (XML with
+I/O and alarm extensions) and *.InputSource(MxReferenceType) columns.
+"""
+
+EXTENSIONS_XML = (
+    '"<ExtensionInfo><ObjectExtension></ObjectExtension><AttributeExtension>'
+    '<Attribute Name=""PV"" ExtensionType=""inputoutputextension"" InheritedFromTagName=""""/>'
+    '<Attribute Name=""PV"" ExtensionType=""alarmextension"" InheritedFromTagName=""""/>'
+    '<Attribute Name=""SP"" ExtensionType=""inputoutputextension"" InheritedFromTagName=""""/>'
+    '</AttributeExtension></ExtensionInfo>"'
+)
+
+
+def synthetic_dump(templates=5, tags_per_template=1000, areas=10):
+    """Returns the dump as a str; encode it with "utf-16" like the real files."""
+    lines = [":grammar=1.0\n", ":Generated by benchmarks/synthetic_dump.py\n"]
+
+    lines.append(":TEMPLATE=$Area\n")
+    lines.append(":Tagname,Area,ShortDesc\n")
+    for a in range(areas):
+        lines.append(f"Area{a:03d},,Area {a}\n")
+
+    for t in range(templates):
+        lines.append("\n")
+        lines.append(f":TEMPLATE=$Template{t:02d}\n")
+        lines.append(
+            ":Tagname,Area,ShortDesc,Extensions(MxBigString),"
+            "PV.InputSource(MxReferenceType),SP.InputSource(MxReferenceType)\n"
+        )
+        for i in range(tags_per_template):
+            area = f"Area{(i % areas):03d}"
+            lines.append(
+                f"T{t:02d}_Tag{i:06d},{area},Tag {i} of template {t},{EXTENSIONS_XML},"
+                f"PLC{t}.DB{i % 100}.DBD{i * 4},PLC{t}.DB{i % 100}.DBD{i * 4 + 2}\n"
+            )
+    return "".join(lines)
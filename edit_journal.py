@@ -0,0 +1,201 @@
+import json
+import os
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def journal_path(dump_path):
+    return dump_path + JOURNAL_SUFFIX
+
+
+def _dump_identity(dump_path):
+    stat = os.stat(dump_path)
+    return {"file": os.path.basename(dump_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def _same_file(path, other):
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+
+def _batch(results):
+    """(template, tag, column, old, new) of the values an update_tag_values() call changed."""
+    return [
+        (r["Template"], r["Tag"], r["Column"], r["OldValue"], r["Value"])
+        for r in results if r["Status"] == "updated"
+    ]
+
+
+def _inverse(edit):
+    template, tag, column, old, new = edit
+    # Undoing a rename looks the tag up by its new name
+    return template, (new if column == "Tagname" else tag), column, old
+
+
+class EditJournal:
+    """
+    Append-only journal of the edits made to a loaded dump, kept next to it
+    as <dump>.journal (JSON lines). Each batch of edits (one import), each
+    undo, redo and save is one line, written and fsync'ed when it happens,
+    so the journal is a checkpoint that costs one small append instead of a
+    rewrite of the UTF-16 dump. A line cut short by a crash is ignored.
+
+      {"op": "open", "file": ..., "size": ..., "mtime": ...}   the original dump
+      {"op": "apply", "edits": [[template, tag, column, old, new], ...]}
+      {"op": "undo"} / {"op": "redo"}
+      {"op": "saved", "path": ...}
+
+    Undo and redo apply the old or new values through
+    AvevaParser.update_tag_values, without parsing the dump again. After a
+    crash, recover() replays the batches still in effect onto the freshly
+    parsed original.
+    """
+
+    def __init__(self, dump_path):
+        self.dump_path = dump_path
+        self.path = journal_path(dump_path)
+        self.done = []      # Batches in effect, oldest first: [(template, tag, column, old, new), ...]
+        self.undone = []    # Undone batches, most recent last
+        self.unsaved = 0    # Journal lines since the last save
+
+    # Restart
+
+    def recoverable(self):
+        """
+        Number of edits in effect that a previous session journaled for this
+        same dump and did not save, or 0. Loads them for recover().
+        """
+        self.done, self.undone, self.unsaved = [], [], 0
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Cut short by a crash: nothing after it was written
+                break
+        if not records or records[0] != {"op": "open", **_dump_identity(self.dump_path)}:
+            return 0
+        for record in records[1:]:
+            self._replay_record(record)
+        return sum(map(len, self.done)) if self.unsaved else 0
+
+    def recover(self, parser):
+        """Applies the loaded batches to a freshly parsed dump; returns update_tag_values results."""
+        edits = [(template, tag, column, new) for batch in self.done for template, tag, column, old, new in batch]
+        # The journal goes on from the recovered state: undone batches and a
+        # line cut short are dropped
+        self.undone = []
+        self.unsaved = len(self.done)
+        self._rewrite()
+        return parser.update_tag_values(edits)
+
+    def _replay_record(self, record):
+        op = record["op"]
+        if op == "apply":
+            self.done.append([tuple(edit) for edit in record["edits"]])
+            self.undone = []
+        elif op == "undo" and self.done:
+            self.undone.append(self.done.pop())
+        elif op == "redo" and self.undone:
+            self.done.append(self.undone.pop())
+        if op == "saved":
+            self.unsaved = 0
+        else:
+            self.unsaved += 1
+
+    # Session
+
+    def start(self):
+        """Starts an empty journal for the dump, replacing any previous one."""
+        self.done, self.undone, self.unsaved = [], [], 0
+        self._rewrite()
+
+    def apply(self, parser, edits):
+        """
+        Applies (template, tag, column, value) edits through update_tag_values
+        and journals them; returns its results. If the journal line cannot be
+        written the parser gets the old values back before the OSError is
+        raised, so the model never holds edits the journal does not know.
+        """
+        results = parser.update_tag_values(edits)
+        try:
+            self.record(results)
+        except OSError:
+            parser.update_tag_values([_inverse(edit) for edit in reversed(_batch(results))])
+            raise
+        return results
+
+    def record(self, results):
+        """Journals the edits of one update_tag_values() call that changed a value."""
+        batch = _batch(results)
+        if batch:
+            undone = self.undone
+            self.done.append(batch)
+            self.undone = []
+            try:
+                self._append({"op": "apply", "edits": batch})
+            except OSError:
+                self.done.pop()
+                self.undone = undone
+                raise
+        return len(batch)
+
+    def can_undo(self):
+        return bool(self.done)
+
+    def can_redo(self):
+        return bool(self.undone)
+
+    def undo(self, parser):
+        """Restores the old values of the last batch; returns update_tag_values results."""
+        batch = self.done.pop()
+        self.undone.append(batch)
+        results = parser.update_tag_values([_inverse(edit) for edit in reversed(batch)])
+        self._append({"op": "undo"})
+        return results
+
+    def redo(self, parser):
+        """Applies the last undone batch again; returns update_tag_values results."""
+        batch = self.undone.pop()
+        self.done.append(batch)
+        results = parser.update_tag_values([(template, tag, column, new) for template, tag, column, old, new in batch])
+        self._append({"op": "redo"})
+        return results
+
+    def mark_saved(self, path):
+        """
+        Journals a save. Saving over the dump itself makes it the new
+        original: the journal starts again from it (dropping undo history),
+        since its "open" identity no longer matches the file.
+        """
+        if _same_file(path, self.dump_path):
+            self.start()
+        else:
+            self._append({"op": "saved", "path": path})
+
+    def _append(self, record):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if record["op"] != "saved":
+            self.unsaved += 1
+        else:
+            self.unsaved = 0
+
+    def _rewrite(self):
+        """Writes the journal of the current state to a temporary file and swaps it in."""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "open", **_dump_identity(self.dump_path)}) + "\n")
+            for batch in self.done:
+                f.write(json.dumps({"op": "apply", "edits": batch}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
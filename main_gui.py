@@ -2,9 +2,108 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
 import csv
+import queue
+import threading
 from datetime import datetime
-from aveva_parser import AvevaParser
-from extension_analyzer import ExtensionAnalyzer
+from itertools import islice
+from aveva_parser import AvevaParser, ProgressReporter
+# extension_analyzer (and the XML stack), edit_journal, table_index and
+# virtual_table are imported where first needed, after the window is up
+
+# Write buffer of CSV exports
+EXPORT_BUFFER = 1 << 20
+
+class TaskCancelled(Exception):
+    """Raised inside a background task once Cancel was pressed."""
+
+class TaskProgress(ProgressReporter):
+    """ProgressReporter of a background task: every report is also a cancellation point."""
+
+    def __init__(self, callback, cancelled):
+        super().__init__(callback, interval=0.1)
+        self.cancelled = cancelled
+
+    def check(self):
+        """Raises TaskCancelled if Cancel was pressed; for loops that report no progress."""
+        if self.cancelled.is_set():
+            raise TaskCancelled()
+
+    def _maybe_send(self):
+        self.check()
+        super()._maybe_send()
+
+class TaskRunner:
+    """
+    Runs long operations (parsing, analysis, imports, saves) on a worker
+    thread, one at a time, so the Tk main loop keeps the window responsive.
+    The worker never touches widgets: progress events and the outcome go
+    through a queue that the main thread drains every POLL_MS with
+    root.after, and on_progress / on_done / on_error run there.
+    cancel() makes the task's next progress report raise TaskCancelled.
+    """
+    POLL_MS = 50
+
+    def __init__(self, root, on_progress=None, on_idle=None):
+        self.root = root
+        self.on_progress = on_progress  # on_progress(event), see ProgressReporter.event
+        self.on_idle = on_idle          # on_idle(), before the task's own handler
+        self.queue = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = None
+        self.label = None
+        self._handlers = (None, None)
+
+    @property
+    def busy(self):
+        return self.thread is not None
+
+    def run(self, label, work, on_done=None, on_error=None):
+        """
+        Starts work(progress) on a worker thread; on_done(result) or
+        on_error(exception) follows on the main thread. Returns False, without
+        starting it, while another task is running.
+        """
+        if self.busy:
+            return False
+        self.label = label
+        self.cancelled.clear()
+        self._handlers = (on_done, on_error)
+        progress = TaskProgress(lambda event: self.queue.put(("progress", event)), self.cancelled)
+        self.thread = threading.Thread(target=self._work, args=(work, progress), daemon=True)
+        self.thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+        return True
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _work(self, work, progress):
+        try:
+            self.queue.put(("done", work(progress)))
+        except Exception as e:
+            self.queue.put(("error", e))
+
+    def _poll(self):
+        while True:
+            try:
+                kind, value = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if self.on_progress:
+                    self.on_progress(value)
+                continue
+
+            on_done, on_error = self._handlers
+            self.thread = None
+            self._handlers = (None, None)
+            if self.on_idle:
+                self.on_idle()
+            handler = on_done if kind == "done" else on_error
+            if handler:
+                handler(value)
+            return
+        self.root.after(self.POLL_MS, self._poll)
 
 class AvevaTagManagerApp:
     def __init__(self, root):
@@ -22,6 +121,10 @@ class AvevaTagManagerApp:
         self.root.geometry("{}x{}+{}+{}".format(window_width, window_height, x_cordinate, y_cordinate))
         
         self.parser = None
+        self.analyzer = None  # One per loaded file: it caches the parsed Extensions
+        self.journal = None   # EditJournal of the loaded file, None if it cannot be written
+        self.sd_filter = None  # Filter bars of the ShortDesc and PLC I/O tables, once built
+        self.plc_filter = None
         self.current_file_path = None
         
         self.create_widgets()
@@ -35,40 +138,124 @@ class AvevaTagManagerApp:
         self.file_entry = tk.Entry(file_frame, width=50)
         self.file_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
         tk.Button(file_frame, text="Browse", command=self.load_file).pack(side=tk.LEFT)
+        
+        self.btn_redo = tk.Button(file_frame, text="Redo", command=self.redo_edits, state=tk.DISABLED)
+        self.btn_redo.pack(side=tk.RIGHT, padx=2)
+        self.btn_undo = tk.Button(file_frame, text="Undo", command=self.undo_edits, state=tk.DISABLED)
+        self.btn_undo.pack(side=tk.RIGHT, padx=2)
+        for key, command in (("<Control-z>", self.undo_edits), ("<Control-y>", self.redo_edits)):
+            # Not while typing in an entry, e.g. a table filter
+            self.root.bind(key, lambda e, command=command: None if isinstance(e.widget, (tk.Entry, ttk.Entry)) else command())
 
         # Tabs
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
+        # Tab contents are built when a tab is first selected (see build_tab)
+        self.tab_setups = {}
+        
         # Tab 1: Template Extraction
         self.tab_template = tk.Frame(self.notebook)
         self.notebook.add(self.tab_template, text="Template Extraction")
-        self.setup_template_tab()
+        self.tab_setups[str(self.tab_template)] = self.setup_template_tab
         
         # Tab 2: Area Extraction
         self.tab_area = tk.Frame(self.notebook)
         self.notebook.add(self.tab_area, text="Area Extraction")
-        self.setup_area_tab()
+        self.tab_setups[str(self.tab_area)] = self.setup_area_tab
 
         # Tab 3: Extensions Analysis
         self.tab_extensions = tk.Frame(self.notebook)
         self.notebook.add(self.tab_extensions, text="Extensions Analysis")
-        self.setup_extension_tab()
+        self.tab_setups[str(self.tab_extensions)] = self.setup_extension_tab
 
         # Tab 4: ShortDesc Manager
         self.tab_shortdesc = tk.Frame(self.notebook)
         self.notebook.add(self.tab_shortdesc, text="ShortDesc Manager")
-        self.setup_shortdesc_tab()
+        self.tab_setups[str(self.tab_shortdesc)] = self.setup_shortdesc_tab
 
         # Tab 5: PLC I/O Manager
         self.tab_plcio = tk.Frame(self.notebook)
         self.notebook.add(self.tab_plcio, text="PLC I/O Manager")
-        self.setup_plcio_tab()
+        self.tab_setups[str(self.tab_plcio)] = self.setup_plcio_tab
+        
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.build_tab(self.notebook.select()))
+        self.build_tab(self.notebook.select())
 
-        # Status Bar
+        # Status Bar, with the progress of the running task
+        status_frame = tk.Frame(self.root, bd=1, relief=tk.SUNKEN)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        
         self.status_var = tk.StringVar()
         self.status_var.set("Ready")
-        tk.Label(self.root, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W).pack(side=tk.BOTTOM, fill=tk.X)
+        tk.Label(status_frame, textvariable=self.status_var, anchor=tk.W).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.btn_cancel = tk.Button(status_frame, text="Cancel", command=self.cancel_task, state=tk.DISABLED)
+        self.btn_cancel.pack(side=tk.RIGHT, padx=2)
+        self.progress_bar = ttk.Progressbar(status_frame, orient=tk.HORIZONTAL, length=200, mode="determinate")
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        
+        self.tasks = TaskRunner(self.root, on_progress=self.show_progress, on_idle=self.task_finished)
+
+    def build_tab(self, tab):
+        """Builds a tab's widgets on its first selection and shows the loaded file in them."""
+        setup = self.tab_setups.pop(str(tab), None)
+        if setup:
+            setup()
+            self.show_file_in_tabs(str(tab))
+
+    def is_built(self, tab):
+        return str(tab) not in self.tab_setups
+
+    def run_task(self, label, work, on_done, failure="Operation failed"):
+        """
+        Runs work(progress) in the background (see TaskRunner); on_done(result)
+        updates the widgets afterwards. Errors are shown as "<failure>: <error>".
+        """
+        def on_error(e):
+            if isinstance(e, TaskCancelled):
+                self.status_var.set(f"{label} cancelled.")
+            else:
+                messagebox.showerror("Error", f"{failure}:\n{e}")
+                self.status_var.set(f"{failure}.")
+        
+        if not self.check_idle():
+            return
+        self.tasks.run(label, work, on_done, on_error)
+        self.status_var.set(f"{label}...")
+        self.progress_bar.config(mode="determinate", value=0)
+        self.btn_cancel.config(state=tk.NORMAL)
+
+    def check_idle(self):
+        """False, after telling the user, while a background task is running."""
+        if self.tasks.busy:
+            messagebox.showwarning("Busy", f"Please wait for '{self.tasks.label}' to finish, or cancel it.")
+            return False
+        return True
+
+    def show_progress(self, event):
+        if event["TotalRows"]:
+            done, total = event["Rows"], event["TotalRows"]
+        else:
+            done, total = event["Bytes"], event["TotalBytes"]
+        text = f"{self.tasks.label}..."
+        if total:
+            self.progress_bar.config(mode="determinate", maximum=total, value=min(done, total))
+            text += f" {min(done, total) * 100 // total}%"
+        else:
+            self.progress_bar.config(mode="indeterminate")
+            self.progress_bar.step()
+        if event["Template"]:
+            text += f" ({event['Template']})"
+        self.status_var.set(text)
+
+    def task_finished(self):
+        self.progress_bar.config(mode="determinate", value=0)
+        self.btn_cancel.config(state=tk.DISABLED)
+
+    def cancel_task(self):
+        self.tasks.cancel()
+        self.status_var.set(f"Cancelling {self.tasks.label}...")
 
     def setup_template_tab(self):
         # Instructions
@@ -145,52 +332,183 @@ class AvevaTagManagerApp:
             filetypes=(("Aveva Dump", "*.csv"), ("All files", "*.*"))
         )
         
-        if filename:
+        if filename and self.check_idle():
             self.file_entry.delete(0, tk.END)
             self.file_entry.insert(0, filename)
             self.current_file_path = filename
             self.parse_file(filename)
 
     def parse_file(self, filename):
+        def work(progress):
+            parser = AvevaParser(filename, progress)
+            # Ensure parser uses utf-16 based on rules, though parser defaults to it.
+            parser.parse()
+            # The model outlives this task
+            parser.progress = None
+            return parser
+        
+        self.run_task("Parsing file", work, self.file_parsed, failure="Failed to parse file")
+
+    def analyzer_for(self, progress):
+        """The loaded file's analyzer, reporting to a task's progress. Tasks run one at a time."""
+        self.analyzer.progress = progress
+        return self.analyzer
+
+    def file_parsed(self, parser):
         try:
-            self.status_var.set("Parsing file...")
-            self.root.update_idletasks()
+            self.parser = parser
+            from extension_analyzer import ExtensionAnalyzer
+            self.analyzer = ExtensionAnalyzer(parser)
             
-            self.parser = AvevaParser(filename)
-            # Ensure parser uses utf-16 based on rules, though parser defaults to it.
-            self.parser.parse()
+            self.show_file_in_tabs()
             
-            # Update Template Tab
-            self.template_listbox.delete(0, tk.END)
             templates = self.parser.get_template_names()
-            for t in templates:
+            count_areas = sum(1 for a in self.parser.get_area_names() if a)
+            self.status_var.set(f"Loaded {len(templates)} templates and {count_areas} areas.")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to parse file:\n{e}")
+            self.status_var.set("Error parsing file.")
+            return
+        
+        self.open_journal(parser)
+
+    def show_file_in_tabs(self, *tabs):
+        """
+        Fills the lists and enables the buttons of the given tabs, by default
+        all built ones, for the loaded file. Unbuilt tabs follow in build_tab.
+        """
+        if not self.parser:
+            return
+        tabs = {str(tab) for tab in tabs} or {
+            str(tab) for tab in self.notebook.tabs() if self.is_built(tab)
+        }
+        
+        # Update Template Tab
+        if str(self.tab_template) in tabs:
+            self.template_listbox.delete(0, tk.END)
+            for t in self.parser.get_template_names():
                 if t == "$Area": continue
                 self.template_listbox.insert(tk.END, t)
-            
-            # Update Area Tab
+            self.btn_extract_template.config(state=tk.NORMAL, bg="#aaddaa")
+        
+        # Update Area Tab
+        if str(self.tab_area) in tabs:
             self.area_listbox.delete(0, tk.END)
-            areas = self.parser.get_area_names()
-            count_areas = 0
-            for a in areas:
+            for a in self.parser.get_area_names():
                 if a: 
                     self.area_listbox.insert(tk.END, a)
-                    count_areas += 1
-            
-            self.status_var.set(f"Loaded {len(templates)} templates and {count_areas} areas.")
-            
-            # Enable Buttons
-            self.btn_extract_template.config(state=tk.NORMAL, bg="#aaddaa")
             self.btn_extract_area.config(state=tk.NORMAL, bg="#aaddaa")
+        
+        # Enable Buttons
+        if str(self.tab_extensions) in tabs:
             self.btn_analyze_ext.config(state=tk.NORMAL, bg="#aaddaa")
             self.btn_extract_matrix.config(state=tk.NORMAL, bg="#aaddaa")
             self.btn_extract_addr.config(state=tk.NORMAL, bg="#aaddaa")
             self.btn_extract_addr_alarm.config(state=tk.NORMAL, bg="#aaddaa")
+        if str(self.tab_shortdesc) in tabs:
             self.btn_load_sd.config(state=tk.NORMAL, bg="#aaddaa")
+        if str(self.tab_plcio) in tabs:
             self.btn_load_plc.config(state=tk.NORMAL, bg="#aaddaa")
+
+    def open_journal(self, parser):
+        """
+        Journals the edits to the loaded file (see EditJournal). If a previous
+        session left unsaved edits for the same file, offers to apply them again.
+        """
+        from edit_journal import EditJournal
+        journal = EditJournal(self.current_file_path)
+        try:
+            count = journal.recoverable()
+            recover = count and messagebox.askyesno(
+                "Recover Edits",
+                f"{count} unsaved edits from a previous session were found for this file.\nApply them again?"
+            )
+            if not recover:
+                journal.start()
+        except OSError as e:
+            # E.g. a read-only share: editing still works, without undo or recovery
+            self.journal = None
+            self.update_undo_buttons()
+            messagebox.showwarning("Edit Journal", f"Edits will not be journaled:\n{e}")
+            return
+        
+        self.journal = journal
+        self.update_undo_buttons()
+        if recover:
+            def done(results):
+                updated = sum(1 for r in results if r["Status"] == "updated")
+                self.status_var.set(f"Recovered {updated} edits.")
+                self.update_undo_buttons()
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to parse file:\n{e}")
-            self.status_var.set("Error parsing file.")
+            self.run_task("Recovering edits", lambda progress: journal.recover(parser), done, failure="Recovery failed")
+
+    def update_undo_buttons(self):
+        journal = self.journal
+        self.btn_undo.config(state=tk.NORMAL if journal and journal.can_undo() else tk.DISABLED)
+        self.btn_redo.config(state=tk.NORMAL if journal and journal.can_redo() else tk.DISABLED)
+
+    def apply_edits(self, edits):
+        """
+        Applies one batch of (template, tag, column, value) edits to the
+        parser and journals it; returns the update_tag_values() results.
+        Runs in a task. If the journal cannot be written the edits are
+        rolled back and the task fails.
+        """
+        if self.journal:
+            return self.journal.apply(self.parser, edits)
+        return self.parser.update_tag_values(edits)
+
+    def table_changes(self, results):
+        """(ShortDesc, PLC I/O) lists of (row index, new row) for the updated values shown in the tables."""
+        from extension_analyzer import INPUT_SOURCE_SUFFIX
+        sd_changes, plc_changes = [], []
+        # Tables of tabs never opened have no index
+        sd_index = self.sd_filter.index if self.sd_filter else None
+        plc_index = self.plc_filter.index if self.plc_filter else None
+        for result in results:
+            if result["Status"] != "updated":
+                continue
+            tmpl, tag, column, value = result["Template"], result["Tag"], result["Column"], result["Value"]
+            if column == "ShortDesc" and sd_index is not None:
+                i = sd_index.find((tmpl, tag), ("Template", "Tag"))
+                if i is not None:
+                    sd_changes.append((i, (tag, value, tmpl)))
+            elif column.endswith(INPUT_SOURCE_SUFFIX) and plc_index is not None:
+                attr = column[:-len(INPUT_SOURCE_SUFFIX)]
+                i = plc_index.find((tmpl, tag, attr), ("Template", "Tag", "Attribute"))
+                if i is not None:
+                    plc_changes.append((i, (tag, attr, value, tmpl)))
+        return sd_changes, plc_changes
+
+    def show_edits(self, changes):
+        """Updates only the edited rows of the tables; the XML analysis is not run again."""
+        sd_changes, plc_changes = changes
+        if self.sd_filter:
+            self.sd_filter.update_rows(sd_changes)
+        if self.plc_filter:
+            self.plc_filter.update_rows(plc_changes)
+        self.update_undo_buttons()
+
+    def undo_edits(self):
+        if not (self.journal and self.journal.can_undo()):
+            return
+        
+        def done(changes):
+            self.show_edits(changes)
+            self.status_var.set("Last edit batch undone.")
+        
+        self.run_task("Undoing", lambda progress: self.table_changes(self.journal.undo(self.parser)), done, failure="Undo failed")
+
+    def redo_edits(self):
+        if not (self.journal and self.journal.can_redo()):
+            return
+        
+        def done(changes):
+            self.show_edits(changes)
+            self.status_var.set("Edit batch redone.")
+        
+        self.run_task("Redoing", lambda progress: self.table_changes(self.journal.redo(self.parser)), done, failure="Redo failed")
 
     def extract_plc_addresses(self):
         default_name = self.generate_filename("PLC_Addresses")
@@ -202,11 +520,8 @@ class AvevaTagManagerApp:
         )
         
         if save_path:
-            try:
-                self.status_var.set("Extracting PLC addresses...")
-                self.root.update_idletasks()
-                
-                analyzer = ExtensionAnalyzer(self.parser)
+            def work(progress):
+                analyzer = self.analyzer_for(progress)
                 results = analyzer.get_plc_addresses() # List of dicts
                 
                 # Write to CSV
@@ -215,13 +530,13 @@ class AvevaTagManagerApp:
                     writer = csv.DictWriter(f, fieldnames=fields)
                     writer.writeheader()
                     writer.writerows(results)
-                            
+                return len(results)
+            
+            def done(count):
                 messagebox.showinfo("Success", f"PLC addresses saved to:\n{save_path}")
-                self.status_var.set(f"Extraction complete. Found {len(results)} items.")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Extraction failed:\n{e}")
-                self.status_var.set("Extraction failed.")
+                self.status_var.set(f"Extraction complete. Found {count} items.")
+            
+            self.run_task("Extracting PLC addresses", work, done, failure="Extraction failed")
 
     def extract_plc_matrix(self):
         save_dir = filedialog.askdirectory(
@@ -230,23 +545,16 @@ class AvevaTagManagerApp:
         )
         
         if save_dir:
-            try:
-                self.status_var.set("Generating PLC Matrices...")
-                self.root.update_idletasks()
-                
-                analyzer = ExtensionAnalyzer(self.parser)
+            def work(progress):
+                analyzer = self.analyzer_for(progress)
                 matrices = analyzer.get_plc_matrices_by_template() # Dict { tmpl: (headers, rows) }
                 
-                if not matrices:
-                    messagebox.showinfo("Info", "No PLC data found to extract.")
-                    self.status_var.set("No data found.")
-                    return
-
                 count = 0
                 base_name = os.path.splitext(os.path.basename(self.current_file_path))[0]
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M")
                 
                 for tmpl, (headers, rows) in matrices.items():
+                    progress.check()
                     # clean template name (remove $)
                     clean_tmpl = tmpl.replace('$', '').replace(':', '')
                     filename = f"{base_name}_{clean_tmpl}_Matrix_{timestamp}.csv"
@@ -257,13 +565,17 @@ class AvevaTagManagerApp:
                         writer.writerow(headers)
                         writer.writerows(rows)
                     count += 1
-                            
+                return count
+            
+            def done(count):
+                if not count:
+                    messagebox.showinfo("Info", "No PLC data found to extract.")
+                    self.status_var.set("No data found.")
+                    return
                 messagebox.showinfo("Success", f"Saved {count} matrix files to:\n{save_dir}")
                 self.status_var.set(f"Matrix extraction complete. Saved {count} files.")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Extraction failed:\n{e}")
-                self.status_var.set("Extraction failed.")
+            
+            self.run_task("Generating PLC Matrices", work, done, failure="Extraction failed")
 
     def extract_tags_addresses(self, alarm_only=False):
         save_dir = filedialog.askdirectory(
@@ -272,25 +584,19 @@ class AvevaTagManagerApp:
         )
         
         if save_dir:
-            try:
-                # alarm_only is passed as arg
-                mode_text = "Alarm Only" if alarm_only else "All Tags"
-                self.status_var.set(f"Extracting Addresses ({mode_text})...")
-                self.root.update_idletasks()
-                
-                analyzer = ExtensionAnalyzer(self.parser)
+            # alarm_only is passed as arg
+            mode_text = "Alarm Only" if alarm_only else "All Tags"
+            
+            def work(progress):
+                analyzer = self.analyzer_for(progress)
                 # Renamed method in analyzer to be more generic
                 area_data = analyzer.extract_address_map_by_area(alarm_only=alarm_only) 
                 
-                if not area_data:
-                    messagebox.showinfo("Info", "No data found.")
-                    self.status_var.set("No data found.")
-                    return
-
                 count = 0
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M")
                 
                 for area, rows in area_data.items():
+                    progress.check()
                     # clean area name
                     clean_area = area.replace('/', '_').replace('\\', '_')
                     if not clean_area: clean_area = "NoArea"
@@ -303,149 +609,17 @@ class AvevaTagManagerApp:
                         for row in rows:
                             writer.writerow(row)
                     count += 1
-                            
+                return count
+            
+            def done(count):
+                if not count:
+                    messagebox.showinfo("Info", "No data found.")
+                    self.status_var.set("No data found.")
+                    return
                 messagebox.showinfo("Success", f"Saved {count} files to:\n{save_dir}")
                 self.status_var.set(f"Extraction ({mode_text}) complete. Saved {count} files.")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Extraction failed:\n{e}")
-                self.status_var.set("Extraction failed.")
-
-    def setup_shortdesc_tab(self):
-        # Top Frame for Buttons
-        top_frame = tk.Frame(self.tab_shortdesc, bg="#f0f0f0")
-        top_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
-        
-        self.btn_load_sd = tk.Button(top_frame, text="Load / Refresh List", command=self.load_short_desc, state=tk.DISABLED, height=1, width=20, bg="#dddddd")
-        self.btn_load_sd.pack(side=tk.LEFT, padx=5)
-        
-        self.btn_export_sd = tk.Button(top_frame, text="Export CSV", command=self.export_short_desc, state=tk.DISABLED, height=1, width=15, bg="#dddddd")
-        self.btn_export_sd.pack(side=tk.LEFT, padx=5)
-        
-        self.btn_import_sd = tk.Button(top_frame, text="Import CSV (Update)", command=self.import_short_desc, state=tk.DISABLED, height=1, width=20, bg="#ffdddd")
-        self.btn_import_sd.pack(side=tk.LEFT, padx=5)
-        
-        # Center Frame for Treeview
-        tree_frame = tk.Frame(self.tab_shortdesc)
-        tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        columns = ("Tag", "ShortDesc", "Template")
-        self.sd_tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
-        self.sd_tree.heading("Tag", text="Tagname")
-        self.sd_tree.heading("ShortDesc", text="Short Description")
-        self.sd_tree.heading("Template", text="Template")
-        
-        self.sd_tree.column("Tag", width=250)
-        self.sd_tree.column("ShortDesc", width=400)
-        self.sd_tree.column("Template", width=150)
-        
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.sd_tree.yview)
-        self.sd_tree.configure(yscroll=scrollbar.set)
-        
-        self.sd_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-    def load_short_desc(self):
-        if not self.parser:
-            return
-            
-        try:
-            self.status_var.set("Loading ShortDesc data...")
-            self.root.update_idletasks()
             
-            # Clear current tree
-            for i in self.sd_tree.get_children():
-                self.sd_tree.delete(i)
-                
-            data = self.parser.get_all_tags_with_column("ShortDesc")
-            
-            for item in data:
-                self.sd_tree.insert("", tk.END, values=(item["Tag"], item["Value"], item["Template"]))
-                
-            self.status_var.set(f"Loaded {len(data)} items.")
-            
-            # Enable Export/Import
-            self.btn_export_sd.config(state=tk.NORMAL)
-            self.btn_import_sd.config(state=tk.NORMAL)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load ShortDesc:\n{e}")
-
-    def export_short_desc(self):
-        default_name = self.generate_filename("ShortDesc_Export")
-        save_path = filedialog.asksaveasfilename(
-            initialdir=os.path.dirname(self.current_file_path),
-            title="Export ShortDesc CSV",
-            defaultextension=".csv",
-            initialfile=default_name
-        )
-        
-        if save_path:
-            try:
-                with open(save_path, 'w', encoding='utf-8-sig', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["Tagname", "ShortDesc", "Template"])
-                    
-                    for child in self.sd_tree.get_children():
-                        writer.writerow(self.sd_tree.item(child)["values"])
-                        
-                messagebox.showinfo("Success", f"Exported to:\n{save_path}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Export failed:\n{e}")
-
-    def import_short_desc(self):
-        filename = filedialog.askopenfilename(
-            initialdir=os.path.dirname(self.current_file_path),
-            title="Import ShortDesc CSV",
-            filetypes=(("CSV files", "*.csv"), ("All files", "*.*"))
-        )
-        
-        if filename:
-            if not messagebox.askyesno("Confirm Import", "This will update the ShortDesc values in memory.\nProceed?"):
-                return
-                
-            try:
-                self.status_var.set("Importing & Updating...")
-                self.root.update_idletasks()
-                
-                updated_count = 0
-                error_count = 0
-                
-                with open(filename, 'r', encoding='utf-8-sig') as f:
-                    reader = csv.DictReader(f)
-                    # Verify headers
-                    if "Tagname" not in reader.fieldnames or "ShortDesc" not in reader.fieldnames:
-                        messagebox.showerror("Error", "CSV must have 'Tagname' and 'ShortDesc' columns.")
-                        return
-                    
-                    for row in reader:
-                        tag = row["Tagname"]
-                        val = row["ShortDesc"]
-                        tmpl = row.get("Template", "") # Optional if we iterate all? 
-                        
-                        # Optimization: If template is known, quicker. If not, scan?
-                        # AvevaParser.update_tag_value needs template.
-                        # If Import CSV lacks correct Template, we might fail or need to search.
-                        # Let's assume Exported CSV is used, which has Template.
-                        
-                        if tmpl:
-                            success = self.parser.update_tag_value(tmpl, tag, "ShortDesc", val)
-                            if success: updated_count += 1
-                            else: error_count += 1
-                        else:
-                            # Try to find template for tag? Too slow for now.
-                            error_count += 1
-                            
-                self.status_var.set(f"Updated {updated_count} tags. (Errors/Skipped: {error_count})")
-                messagebox.showinfo("Import Complete", f"Updated: {updated_count}\nNot Found/Error: {error_count}")
-                
-                # Refresh list to show changes
-                self.load_short_desc()
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Import failed:\n{e}")
-
+            self.run_task(f"Extracting Addresses ({mode_text})", work, done, failure="Extraction failed")
 
     # ... (ensure_blank_line, generate_filename, extract_template_data, extract_area_data remain same) ...
     # I need to be careful with replace_file_content to not wipe them out.
@@ -466,11 +640,8 @@ class AvevaTagManagerApp:
         )
         
         if save_path:
-            try:
-                self.status_var.set("Analyzing extensions...")
-                self.root.update_idletasks()
-                
-                analyzer = ExtensionAnalyzer(self.parser)
+            def work(progress):
+                analyzer = self.analyzer_for(progress)
                 results = analyzer.analyze() # Dictionary { ExtensionType: [Items] }
                 
                 # Write to CSV
@@ -481,13 +652,12 @@ class AvevaTagManagerApp:
                     for ext_type, items in results.items():
                         for item in items:
                             writer.writerow([ext_type, item])
-                            
+            
+            def done(_):
                 messagebox.showinfo("Success", f"Report saved to:\n{save_path}")
                 self.status_var.set("Analysis complete.")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Analysis failed:\n{e}")
-                self.status_var.set("Analysis failed.")
+            
+            self.run_task("Analyzing extensions", work, done, failure="Analysis failed")
 
 
     def ensure_blank_line(self, lines):
@@ -540,7 +710,7 @@ class AvevaTagManagerApp:
         )
         
         if save_path:
-            try:
+            def work(progress):
                 lines = []
                 lines.extend(self.parser.get_headers())
                 
@@ -549,13 +719,17 @@ class AvevaTagManagerApp:
                     lines.extend(self.parser.get_template_content("$Area"))
                 
                 for tmpl in selected_templates:
+                    progress.check()
                     self.ensure_blank_line(lines)
                     lines.extend(self.parser.get_template_content(tmpl))
                 
                 self.write_file(save_path, lines)
+            
+            def done(_):
+                self.status_var.set("Ready")
                 messagebox.showinfo("Success", f"Saved {len(selected_templates)} templates to:\n{save_path}")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            self.run_task("Extracting templates", work, done, failure="Extraction failed")
 
     def extract_area_data(self):
         selection = self.area_listbox.curselection()
@@ -580,14 +754,17 @@ class AvevaTagManagerApp:
         )
         
         if save_path:
-            try:
-                lines = self.perform_area_extraction(selected_areas)
+            def work(progress):
+                lines = self.perform_area_extraction(selected_areas, progress)
                 self.write_file(save_path, lines)
+            
+            def done(_):
+                self.status_var.set("Ready")
                 messagebox.showinfo("Success", f"Saved {len(selected_areas)} areas to:\n{save_path}")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            self.run_task("Extracting areas", work, done, failure="Extraction failed")
 
-    def perform_area_extraction(self, target_areas):
+    def perform_area_extraction(self, target_areas, progress=None):
         # target_areas is a list of strings
         lines = []
         lines.extend(self.parser.get_headers())
@@ -598,6 +775,7 @@ class AvevaTagManagerApp:
 
         for tmpl in self.parser.get_template_names():
             if tmpl == "$Area": continue
+            if progress: progress.check()
             
             content = self.parser.get_template_content(tmpl)
             area_col_idx = self.parser.get_column_index(tmpl, "Area")
@@ -626,6 +804,40 @@ class AvevaTagManagerApp:
                 
         return lines
 
+    def export_table(self, filter_bar, header, suffix, title):
+        """Writes the rows a table shows (after its filter) to a CSV file, on the worker thread."""
+        default_name = self.generate_filename(suffix)
+        save_path = filedialog.asksaveasfilename(
+            initialdir=os.path.dirname(self.current_file_path),
+            title=title,
+            defaultextension=".csv",
+            initialfile=default_name
+        )
+        
+        if save_path:
+            # Taken now: the filter may change while the file is written
+            count, rows = filter_bar.shown_rows()
+            
+            def work(progress):
+                progress.begin("export", total_rows=count)
+                with open(save_path, 'w', encoding='utf-8-sig', newline='', buffering=EXPORT_BUFFER) as f:
+                    writer = csv.writer(f)
+                    writer.writerow(header)
+                    while True:
+                        chunk = list(islice(rows, ProgressReporter.CHECK_EVERY))
+                        if not chunk:
+                            break
+                        writer.writerows(chunk)
+                        progress.advance(len(chunk))
+                progress.finish()
+                return count
+            
+            def done(count):
+                self.status_var.set(f"Exported {count} rows.")
+                messagebox.showinfo("Success", f"Exported to:\n{save_path}")
+            
+            self.run_task("Exporting", work, done, failure="Export failed")
+
     def write_file(self, path, lines):
         # RULE: Use utf-16 for Aveva Dump files and newline=''
         with open(path, 'w', encoding='utf-16', newline='') as f:
@@ -654,42 +866,46 @@ class AvevaTagManagerApp:
         
         # Center Frame for Treeview
         tree_frame = tk.Frame(self.tab_shortdesc)
-        tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        columns = ("Tag", "ShortDesc", "Template")
-        self.sd_tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
-        self.sd_tree.heading("Tag", text="Tagname")
-        self.sd_tree.heading("ShortDesc", text="Short Description")
-        self.sd_tree.heading("Template", text="Template")
+        from virtual_table import FilterBar, VirtualTable
         
-        self.sd_tree.column("Tag", width=250)
-        self.sd_tree.column("ShortDesc", width=400)
-        self.sd_tree.column("Template", width=150)
-        
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.sd_tree.yview)
-        self.sd_tree.configure(yscroll=scrollbar.set)
+        # Only the rows in view become Treeview items
+        self.sd_table = VirtualTable(
+            tree_frame,
+            ("Tag", "ShortDesc", "Template"),
+            headings={"Tag": "Tagname", "ShortDesc": "Short Description", "Template": "Template"},
+            widths={"Tag": 250, "ShortDesc": 400, "Template": 150}
+        )
+        self.sd_table.pack(fill=tk.BOTH, expand=True)
         
-        self.sd_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.sd_filter = FilterBar(self.tab_shortdesc, self.sd_table)
+        self.sd_filter.pack(side=tk.TOP, fill=tk.X, padx=5)
+        tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
 
     def load_short_desc(self):
         if not self.parser:
             return
             
-        try:
-            self.status_var.set("Loading ShortDesc data...")
-            self.root.update_idletasks()
+        def work(progress):
+            from table_index import TableIndex
+            rows = [
+                (item["Tag"], item["Value"], item["Template"])
+                for item in self.parser.get_all_tags_with_column("ShortDesc")
+            ]
+            # Built here, off the main thread; searched on every keystroke
+            return TableIndex(rows, self.sd_table.columns)
             
-            # Clear current tree
-            for i in self.sd_tree.get_children():
-                self.sd_tree.delete(i)
-                
-            data = self.parser.get_all_tags_with_column("ShortDesc")
-            
-            for item in data:
-                self.sd_tree.insert("", tk.END, values=(item["Tag"], item["Value"], item["Template"]))
-                
-            self.status_var.set(f"Loaded {len(data)} items.")
+        self.run_task(
+            "Loading ShortDesc data",
+            work,
+            self.show_short_desc,
+            failure="Failed to load ShortDesc"
+        )
+
+    def show_short_desc(self, index):
+        try:
+            self.sd_filter.set_index(index)
+            self.status_var.set(f"Loaded {len(index)} items.")
             
             # Enable Export/Import and Save Dump
             self.btn_export_sd.config(state=tk.NORMAL)
@@ -700,27 +916,7 @@ class AvevaTagManagerApp:
             messagebox.showerror("Error", f"Failed to load ShortDesc:\n{e}")
 
     def export_short_desc(self):
-        default_name = self.generate_filename("ShortDesc_Export")
-        save_path = filedialog.asksaveasfilename(
-            initialdir=os.path.dirname(self.current_file_path),
-            title="Export ShortDesc CSV",
-            defaultextension=".csv",
-            initialfile=default_name
-        )
-        
-        if save_path:
-            try:
-                with open(save_path, 'w', encoding='utf-8-sig', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["Tagname", "ShortDesc", "Template"])
-                    
-                    for child in self.sd_tree.get_children():
-                        writer.writerow(self.sd_tree.item(child)["values"])
-                        
-                messagebox.showinfo("Success", f"Exported to:\n{save_path}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Export failed:\n{e}")
+        self.export_table(self.sd_filter, ["Tagname", "ShortDesc", "Template"], "ShortDesc_Export", "Export ShortDesc CSV")
 
     def import_short_desc(self):
         filename = filedialog.askopenfilename(
@@ -733,10 +929,7 @@ class AvevaTagManagerApp:
             if not messagebox.askyesno("Confirm Import", "This will update the ShortDesc values in memory.\nProceed?"):
                 return
                 
-            try:
-                self.status_var.set("Importing & Updating...")
-                self.root.update_idletasks()
-                
+            def work(progress):
                 updated_count = 0
                 error_count = 0
                 
@@ -744,29 +937,35 @@ class AvevaTagManagerApp:
                     reader = csv.DictReader(f)
                     # Verify headers
                     if "Tagname" not in reader.fieldnames or "ShortDesc" not in reader.fieldnames:
-                        messagebox.showerror("Error", "CSV must have 'Tagname' and 'ShortDesc' columns.")
-                        return
+                        raise ValueError("CSV must have 'Tagname' and 'ShortDesc' columns.")
                     
+                    edits = []
                     for row in reader:
                         tag = row["Tagname"]
                         val = row["ShortDesc"]
                         tmpl = row.get("Template", "") 
                         
                         if tmpl:
-                            success = self.parser.update_tag_value(tmpl, tag, "ShortDesc", val)
-                            if success: updated_count += 1
-                            else: error_count += 1
+                            edits.append((tmpl, tag, "ShortDesc", val))
                         else:
                             error_count += 1
-                            
+                
+                # Last point to cancel: the edits below are applied all at once
+                progress.check()
+                # One indexed pass per template instead of a scan per row
+                results = self.apply_edits(edits)
+                for result in results:
+                    if result["Status"] in ("updated", "unchanged"): updated_count += 1
+                    else: error_count += 1
+                return updated_count, error_count, self.table_changes(results)
+            
+            def done(counts):
+                updated_count, error_count, changes = counts
+                self.show_edits(changes)
                 self.status_var.set(f"Updated {updated_count} tags. (Errors/Skipped: {error_count})")
                 messagebox.showinfo("Import Complete", f"Updated: {updated_count}\nNot Found/Error: {error_count}")
-                
-                # Refresh list to show changes
-                self.load_short_desc()
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Import failed:\n{e}")
+            
+            self.run_task("Importing & Updating", work, done, failure="Import failed")
 
     def save_modified_dump(self):
         default_name = self.generate_filename("Modified_Dump")
@@ -778,18 +977,18 @@ class AvevaTagManagerApp:
         )
         
         if save_path:
-            try:
-                self.status_var.set("Saving modified dump file...")
-                self.root.update_idletasks()
-                
-                self.parser.save(save_path)
-                
+            def done(_):
+                # Saving over the loaded dump starts a new journal, without undo history
+                self.update_undo_buttons()
                 messagebox.showinfo("Success", f"File saved successfully to:\n{save_path}")
                 self.status_var.set("File saved successfully.")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Save failed:\n{e}")
-                self.status_var.set("Save failed.")
+            
+            def work(progress):
+                self.parser.save(save_path)
+                if self.journal:
+                    self.journal.mark_saved(save_path)
+            
+            self.run_task("Saving modified dump file", work, done, failure="Save failed")
 
     def setup_plcio_tab(self):
         # Top Frame for Buttons
@@ -813,45 +1012,45 @@ class AvevaTagManagerApp:
         
         # Center Frame for Treeview
         tree_frame = tk.Frame(self.tab_plcio)
-        tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        columns = ("Tag", "Attribute", "PLC_Address", "Template")
-        self.plc_tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
-        self.plc_tree.heading("Tag", text="Tagname")
-        self.plc_tree.heading("Attribute", text="Attribute")
-        self.plc_tree.heading("PLC_Address", text="PLC Address")
-        self.plc_tree.heading("Template", text="Template")
         
-        self.plc_tree.column("Tag", width=200)
-        self.plc_tree.column("Attribute", width=150)
-        self.plc_tree.column("PLC_Address", width=300)
-        self.plc_tree.column("Template", width=150)
+        from virtual_table import FilterBar, VirtualTable
         
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.plc_tree.yview)
-        self.plc_tree.configure(yscroll=scrollbar.set)
+        # Only the rows in view become Treeview items
+        self.plc_table = VirtualTable(
+            tree_frame,
+            ("Tag", "Attribute", "PLC_Address", "Template"),
+            headings={"Tag": "Tagname", "Attribute": "Attribute", "PLC_Address": "PLC Address", "Template": "Template"},
+            widths={"Tag": 200, "Attribute": 150, "PLC_Address": 300, "Template": 150}
+        )
+        self.plc_table.pack(fill=tk.BOTH, expand=True)
         
-        self.plc_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.plc_filter = FilterBar(self.tab_plcio, self.plc_table)
+        self.plc_filter.pack(side=tk.TOP, fill=tk.X, padx=5)
+        tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
 
     def load_plcio(self):
         if not self.parser:
             return
             
-        try:
-            self.status_var.set("Loading PLC I/O data...")
-            self.root.update_idletasks()
+        def work(progress):
+            from table_index import TableIndex
+            rows = [
+                (item["Tag"], item["Attribute"], item["PLC_Address"], item["Template"])
+                for item in self.analyzer_for(progress).get_plc_addresses()
+            ]
+            return TableIndex(rows, self.plc_table.columns)
             
-            # Clear current tree
-            for i in self.plc_tree.get_children():
-                self.plc_tree.delete(i)
-            
-            analyzer = ExtensionAnalyzer(self.parser)
-            data = analyzer.get_plc_addresses()
-            
-            for item in data:
-                self.plc_tree.insert("", tk.END, values=(item["Tag"], item["Attribute"], item["PLC_Address"], item["Template"]))
-                
-            self.status_var.set(f"Loaded {len(data)} items.")
+        self.run_task(
+            "Loading PLC I/O data",
+            work,
+            self.show_plcio,
+            failure="Failed to load PLC I/O"
+        )
+
+    def show_plcio(self, index):
+        try:
+            self.plc_filter.set_index(index)
+            self.status_var.set(f"Loaded {len(index)} items.")
             
             # Enable Buttons
             self.btn_export_plc.config(state=tk.NORMAL)
@@ -862,27 +1061,7 @@ class AvevaTagManagerApp:
             messagebox.showerror("Error", f"Failed to load PLC I/O:\n{e}")
 
     def export_plcio(self):
-        default_name = self.generate_filename("PLC_IO_Export")
-        save_path = filedialog.asksaveasfilename(
-            initialdir=os.path.dirname(self.current_file_path),
-            title="Export PLC I/O CSV",
-            defaultextension=".csv",
-            initialfile=default_name
-        )
-        
-        if save_path:
-            try:
-                with open(save_path, 'w', encoding='utf-8-sig', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["Tag", "Attribute", "PLC_Address", "Template"])
-                    
-                    for child in self.plc_tree.get_children():
-                        writer.writerow(self.plc_tree.item(child)["values"])
-                        
-                messagebox.showinfo("Success", f"Exported to:\n{save_path}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Export failed:\n{e}")
+        self.export_table(self.plc_filter, ["Tag", "Attribute", "PLC_Address", "Template"], "PLC_IO_Export", "Export PLC I/O CSV")
 
     def import_plcio(self):
         filename = filedialog.askopenfilename(
@@ -895,10 +1074,7 @@ class AvevaTagManagerApp:
             if not messagebox.askyesno("Confirm Import", "This will update the PLC Addresses based on Attribute names.\nProceed?"):
                 return
                 
-            try:
-                self.status_var.set("Importing & Updating PLC I/O...")
-                self.root.update_idletasks()
-                
+            def work(progress):
                 updated_count = 0
                 error_count = 0
                 
@@ -907,9 +1083,9 @@ class AvevaTagManagerApp:
                     # Verify headers (allow flexible naming if needed, but strict for now)
                     required = ["Tag", "Attribute", "PLC_Address"]
                     if not all(col in reader.fieldnames for col in required):
-                         messagebox.showerror("Error", f"CSV must have columns: {required}")
-                         return
+                         raise ValueError(f"CSV must have columns: {required}")
                     
+                    edits = []
                     for row in reader:
                         tag = row["Tag"]
                         attr = row["Attribute"]
@@ -919,20 +1095,26 @@ class AvevaTagManagerApp:
                         target_col = f"{attr}.InputSource(MxReferenceType)"
                         
                         if tmpl:
-                            success = self.parser.update_tag_value(tmpl, tag, target_col, addr)
-                            if success: updated_count += 1
-                            else: error_count += 1
+                            edits.append((tmpl, tag, target_col, addr))
                         else:
                             error_count += 1
-                            
+                
+                # Last point to cancel: the edits below are applied all at once
+                progress.check()
+                # One indexed pass per template instead of a scan per row
+                results = self.apply_edits(edits)
+                for result in results:
+                    if result["Status"] in ("updated", "unchanged"): updated_count += 1
+                    else: error_count += 1
+                return updated_count, error_count, self.table_changes(results)
+            
+            def done(counts):
+                updated_count, error_count, changes = counts
+                self.show_edits(changes)
                 self.status_var.set(f"Updated {updated_count} items. (Errors/Skipped: {error_count})")
                 messagebox.showinfo("Import Complete", f"Updated: {updated_count}\nNot Found/Error: {error_count}")
-                
-                # Refresh list
-                self.load_plcio()
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Import failed:\n{e}")
+            
+            self.run_task("Importing & Updating PLC I/O", work, done, failure="Import failed")
 
 if __name__ == "__main__":
     root = tk.Tk()
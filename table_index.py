@@ -0,0 +1,240 @@
+import re
+import threading
+from array import array
+
+MODES = ("contains", "prefix", "regex")
+BLOCK_ROWS = 256   # Rows per block of text searched at once
+NARROW_RATIO = 16  # Re-check the previous matches if at most 1/16 of the rows
+_LAST_CHAR = chr(0x10FFFF)
+
+
+def fold(value):
+    """Search form of a value: case-folded, on one line (lines separate the columns)."""
+    return str(value).casefold().replace("\n", " ")
+
+
+def _trigrams(text):
+    return set(zip(text, text[1:], text[2:]))
+
+
+class TableIndex:
+    """
+    Search index over the rows of a GUI table (tuples of strings, one per
+    column), so that the filter box can re-run on every keystroke. Matching
+    is case-insensitive, over all columns or one of them:
+
+      prefix    a value starts with the query: binary search in the row order
+                sorted by each column, built up front
+      contains  the query appears in a value
+      regex     re.search per value, so that anchors, lookarounds and
+                whitespace classes never reach into another column; a scan
+                of every value, slower than the other two on large tables
+
+    "contains" first searches the text of whole blocks of BLOCK_ROWS rows,
+    one value per line, and checks single rows only in the blocks with a
+    hit. The trigram index
+    from build_trigrams(), meant for a background thread, narrows
+    "contains" to the blocks holding every trigram of the query; until it
+    is done every block is searched. A "contains" query that extends the
+    previous one with few matches only re-checks those matches, so typing
+    narrows the result instead of searching again.
+    """
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = tuple(columns)
+        # One line per value, so that a match never spans two columns
+        self._texts = ["\n".join(map(fold, row)) for row in rows]
+        self._blocks = [
+            "\n".join(self._texts[start:start + BLOCK_ROWS])
+            for start in range(0, len(rows), BLOCK_ROWS)
+        ]
+        values = [text.split("\n") for text in self._texts]
+        self._sorted = [
+            array("I", sorted(range(len(rows)), key=lambda i, c=c: values[i][c]))
+            for c in range(len(self.columns))
+        ]
+        self._grams = None  # { trigram: {block, ...} } once built
+        self._last = None   # (mode, column, query, matches) of the previous search
+        self._keys = {}     # { key columns: { key values: row } }, see find()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._touched = set()  # Blocks updated while the trigram index was building
+
+    def __len__(self):
+        return len(self.rows)
+
+    def build_trigrams(self):
+        """Builds the trigram index; returns False if close() stopped it."""
+        grams = {}
+        for block, text in enumerate(self._blocks):
+            if self._stop.is_set():
+                return False
+            self._add_trigrams(grams, block, text)
+        with self._lock:
+            for block in self._touched:
+                self._add_trigrams(grams, block, self._blocks[block])
+            self._touched.clear()
+            self._grams = grams
+        return True
+
+    @staticmethod
+    def _add_trigrams(grams, block, text):
+        for gram in _trigrams(text):
+            blocks = grams.get(gram)
+            if blocks is None:
+                grams[gram] = blocks = set()
+            blocks.add(block)
+
+    def close(self):
+        """Stops a build_trigrams() in progress (the table was reloaded)."""
+        self._stop.set()
+
+    def find(self, key, columns):
+        """
+        Index of the first row whose values in columns (names) equal key, or
+        None. The map for a set of columns is built on first use and kept.
+        """
+        columns = tuple(columns)
+        positions = self._keys.get(columns)
+        if positions is None:
+            picks = [self.columns.index(column) for column in columns]
+            positions = {}
+            for i, row in enumerate(self.rows):
+                positions.setdefault(tuple(row[c] for c in picks), i)
+            self._keys[columns] = positions
+        return positions.get(tuple(key))
+
+    def update_row(self, i, row):
+        """
+        Replaces rows[i] and updates the index in place: the cost depends on
+        the row, not on the size of the table.
+        """
+        old_row = self.rows[i]
+        text = "\n".join(map(fold, row))
+        old_values = self._texts[i].split("\n")
+        new_values = text.split("\n")
+
+        changed = [c for c, (old, new) in enumerate(zip(old_values, new_values)) if old != new]
+        for c in changed:
+            order = self._sorted[c]
+            del order[self._lower_bound(order, c, old_values[c], i)]
+
+        block = i // BLOCK_ROWS
+        first = block * BLOCK_ROWS
+        with self._lock:
+            self.rows[i] = row
+            self._texts[i] = text
+            self._blocks[block] = "\n".join(self._texts[first:first + BLOCK_ROWS])
+            # The old row's trigrams stay: they only cost a needless block search
+            if self._grams is not None:
+                self._add_trigrams(self._grams, block, text)
+            else:
+                self._touched.add(block)
+
+        for c in changed:
+            order = self._sorted[c]
+            order.insert(self._lower_bound(order, c, new_values[c], i), i)
+
+        # A changed key drops the maps over it; find() builds them again
+        for columns in list(self._keys):
+            if any(old_row[c] != row[c] for c in map(self.columns.index, columns)):
+                del self._keys[columns]
+        self._last = None
+
+    def search(self, query, mode="contains", column=None):
+        """
+        Indexes of the rows matching query, ascending; all rows for an empty
+        query. column is a column name, or None for any column. Raises
+        re.error for an invalid regex.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        if not query:
+            return list(range(len(self.rows)))
+        c = None if column is None else self.columns.index(column)
+        matches = self._matcher(query, mode, c)
+
+        last = self._last
+        if mode == "prefix":
+            # The binary search beats re-checking any number of matches
+            found = self._prefix(fold(query), c)
+        elif (mode == "contains" and last and last[:2] == (mode, c)
+              and fold(last[2]) in fold(query) and len(last[3]) <= len(self.rows) // NARROW_RATIO):
+            found = [i for i in last[3] if matches(self._texts[i])]
+        else:
+            found = self._scan(query, mode, c, matches)
+
+        self._last = (mode, c, query, found)
+        return found
+
+    def _matcher(self, query, mode, c):
+        """Predicate on a row's folded text."""
+        if mode == "regex":
+            search = re.compile(query, re.IGNORECASE).search
+            if c is None:
+                return lambda text: any(search(value) for value in text.split("\n"))
+            return lambda text: search(text.split("\n")[c]) is not None
+
+        needle = fold(query)
+        if mode == "prefix":
+            if c is None:
+                inner = "\n" + needle
+                return lambda text: text.startswith(needle) or inner in text
+            return lambda text: text.split("\n")[c].startswith(needle)
+        if c is None:
+            return lambda text: needle in text
+        return lambda text: needle in text.split("\n")[c]
+
+    def _prefix(self, needle, c):
+        found = set()
+        for column in (range(len(self.columns)) if c is None else (c,)):
+            order = self._sorted[column]
+            start = self._lower_bound(order, column, needle)
+            end = self._lower_bound(order, column, needle + _LAST_CHAR)
+            found.update(order[start:end])
+        return sorted(found)
+
+    def _lower_bound(self, order, c, value, row=-1):
+        """First position in order whose (value, row) is not below the given one; equal values are in row order."""
+        low, high = 0, len(order)
+        while low < high:
+            mid = (low + high) // 2
+            if (self._texts[order[mid]].split("\n")[c], order[mid]) < (value, row):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _scan(self, query, mode, c, matches):
+        if mode == "regex":
+            # A pattern can match the joined text of a block but no single
+            # value, or the other way round (\A, lookbehind), so no block test
+            return [i for i, text in enumerate(self._texts) if matches(text)]
+
+        needle = fold(query)
+        hit = lambda text: needle in text
+        blocks = self._candidate_blocks(needle)
+        if c is None:
+            matches = hit
+
+        found = []
+        for block in blocks:
+            if hit(self._blocks[block]):
+                first = block * BLOCK_ROWS
+                texts = self._texts[first:first + BLOCK_ROWS]
+                found.extend(first + i for i, text in enumerate(texts) if matches(text))
+        return found
+
+    def _candidate_blocks(self, needle):
+        grams = self._grams
+        if grams is None or len(needle) < 3:
+            return range(len(self._blocks))
+        # Rarest trigram first: the intersection shrinks fastest
+        postings = sorted((grams.get(gram, ()) for gram in _trigrams(needle)), key=len)
+        blocks = set(postings[0])
+        for posting in postings[1:]:
+            if not blocks:
+                break
+            blocks &= posting
+        return sorted(blocks)
@@ -0,0 +1,165 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from web_app.backend.admission import DISK, MEMORY, AdmissionRejected, DumpScan, MemoryBudget, scan_dump
+from web_app.backend.aveva_parser import AvevaParser
+from web_app.backend.snapshot import StreamingSnapshotWriter, load_snapshot, read_snapshot_index
+from web_app.backend.uploads import ingest_upload
+
+SAMPLE = (
+    ":Header1\r\n"
+    ":TEMPLATE=$Area\r\n"
+    ":Tagname,Area\r\n"
+    "Área1,Área1\r\n"
+    "\r\n"
+    ":TEMPLATE=$UserDefined\r\n"
+    ":Tagname,ShortDesc,Area\r\n"
+    "MyTag,설명,Área1\r\n"
+    "MyTag2,OldDesc2,Área1"
+)
+
+
+def make_scan(**sections):
+    """DumpScan with the given {template: rows} of 100-character lines."""
+    scan = DumpScan()
+    for name, rows in sections.items():
+        scan.sections[name] = [rows, rows * 100, 0]
+    return scan
+
+
+class TestScanAndSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dump = os.path.join(self.tmpdir.name, "dump.csv")
+        with open(self.dump, "wb") as f:
+            f.write(SAMPLE.encode("utf-16"))
+        self.parser = AvevaParser(self.dump)
+        self.parser.parse()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_scan_counts_rows_like_the_parser(self):
+        with open(self.dump, "rb") as f:
+            # Tiny chunks split lines (and UTF-16 code units) everywhere
+            scan = scan_dump(f, chunk_size=7)
+        self.assertEqual(scan.size, os.path.getsize(self.dump))
+        self.assertEqual(list(scan.sections), [None, "$Area", "$UserDefined"])
+        self.assertEqual(scan.sections[None][0], len(self.parser.headers))
+        for name, lines in self.parser.templates.items():
+            self.assertEqual(scan.sections[name][0], len(lines))
+            # Characters as stored in the file, CR of each CRLF included
+            self.assertEqual(scan.sections[name][1], sum(len(line) for line in lines) + len(lines) - (name == "$UserDefined"))
+        # One character outside Latin-1 (the Korean description is two)
+        self.assertEqual(scan.sections["$UserDefined"][2], 2)
+
+    def test_snapshot_index_gives_the_same_rows(self):
+        path = os.path.join(self.tmpdir.name, "dump.snap")
+        writer = StreamingSnapshotWriter(self.dump, path)
+        writer.parse()
+        writer.commit()
+        scan = DumpScan.from_snapshot_index(read_snapshot_index(path), os.path.getsize(self.dump))
+        with open(self.dump, "rb") as f:
+            self.assertEqual(scan.rows, scan_dump(f).rows)
+
+    def test_disk_backed_model_matches_parsed_model(self):
+        path = os.path.join(self.tmpdir.name, "dump.snap")
+        writer = StreamingSnapshotWriter(self.dump, path)
+        writer.parse()
+        writer.commit()
+
+        lazy = load_snapshot(path, self.dump, lazy=True)
+        self.assertEqual(lazy.headers, self.parser.headers)
+        self.assertEqual(list(lazy.templates), list(self.parser.templates))
+        for name, lines in self.parser.templates.items():
+            self.assertEqual(list(lazy.templates[name]), lines)
+        self.assertEqual(lazy.get_area_names(), self.parser.get_area_names())
+
+        # Edits go to a copy that holds only the edited template in memory
+        edited = lazy.copy({"$UserDefined"})
+        results = edited.update_tag_values([("$UserDefined", "MyTag", "ShortDesc", "New")])
+        self.assertEqual(results[0]["Status"], "updated")
+        self.assertIn("MyTag,New,Área1\n", edited.templates["$UserDefined"])
+        self.assertIn("MyTag,설명,Área1\n", lazy.templates["$UserDefined"])
+        # Sections of the disk-backed model itself cannot be edited in place
+        with self.assertRaises(TypeError):
+            lazy.update_tag_values([("$UserDefined", "MyTag", "ShortDesc", "New")])
+
+    def test_ingest_in_disk_mode_streams_a_snapshot(self):
+        scans = []
+
+        def admit(scan):
+            scans.append(scan)
+            return DISK
+
+        location = os.path.join(self.tmpdir.name, "upload.part")
+        data = SAMPLE.encode("utf-16")
+        result = ingest_upload(io.BytesIO(data), "dump.csv", location, admit=admit)
+        self.assertEqual(result.mode, DISK)
+        self.assertIsNone(result.parser)
+        # Admitted on the size: the upload is read once
+        self.assertEqual(scans[0].size, len(data))
+        self.assertGreaterEqual(scans[0].memory_estimate(), len(data))
+        lazy = load_snapshot(result.snapshot_path, location, lazy=True)
+        self.assertEqual(list(lazy.templates["$UserDefined"]), self.parser.templates["$UserDefined"])
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def test_small_dump_is_held_in_memory(self):
+        budget = MemoryBudget(limit=10 ** 6)
+        mode, cost = budget.admit(make_scan(T1=100))
+        self.assertEqual(mode, MEMORY)
+        self.assertEqual(budget.used, cost)
+        budget.release(cost)
+        self.assertEqual(budget.used, 0)
+
+    def test_large_or_tight_dumps_degrade_to_disk(self):
+        budget = MemoryBudget(limit=10 ** 7, max_model=10 ** 6)
+        # Ten templates of ~160KB: the full model is over max_model
+        mode, large = budget.admit(make_scan(**{f"T{i}": 1000 for i in range(10)}))
+        self.assertEqual(mode, DISK)
+        self.assertLess(large, 10 ** 6)
+
+        budget.used = budget.limit - 400 * 1000
+        mode, _ = budget.admit(make_scan(**{f"T{i}": 1000 for i in range(5)}))
+        self.assertEqual(mode, DISK)
+        self.assertEqual(budget.counters["admitted_disk"], 2)
+
+    def test_evicts_before_degrading(self):
+        evicted = []
+        budget = MemoryBudget(limit=10 ** 6)
+
+        def evict(amount):
+            evicted.append(amount)
+            budget.release(budget.used)
+
+        budget.evict = evict
+        budget.used = budget.limit
+        mode, _ = budget.admit(make_scan(T1=100))
+        self.assertEqual(mode, MEMORY)
+        self.assertEqual(len(evicted), 1)
+
+    def test_queues_until_released(self):
+        budget = MemoryBudget(limit=10 ** 6, queue_timeout=10)
+        budget.used = budget.limit
+        timer = threading.Timer(0.05, budget.release, [budget.limit])
+        timer.start()
+        mode, _ = budget.admit(make_scan(T1=100))
+        timer.join()
+        self.assertEqual(mode, MEMORY)
+        self.assertEqual(budget.counters["queued"], 1)
+
+    def test_rejects_after_timeout(self):
+        budget = MemoryBudget(limit=10 ** 6, queue_timeout=0.01)
+        budget.used = budget.limit
+        with self.assertRaises(AdmissionRejected) as cm:
+            budget.admit(make_scan(T1=100))
+        self.assertGreaterEqual(cm.exception.retry_after, 1)
+        self.assertEqual(budget.counters["rejected"], 1)
+        self.assertEqual(budget.waiting, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from aveva_parser import AvevaParser, ProgressReporter
+from extension_analyzer import ExtensionAnalyzer
+from web_app.backend.extension_analyzer import ExtensionAnalyzer as BackendAnalyzer
+from web_app.backend.snapshot import load_snapshot, write_snapshot
+
+EXTENSIONS = (
+    '"<ExtensionInfo><ObjectExtension><Extension ExtensionType=""objext""/></ObjectExtension>'
+    '<AttributeExtension><Attribute Name=""DI1"" ExtensionType=""inputoutputextension""/>'
+    '<Attribute Name=""DI1"" ExtensionType=""alarmextension""/></AttributeExtension></ExtensionInfo>"'
+)
+
+
+class TestAnalyzerCache(unittest.TestCase):
+    def setUp(self):
+        self.parser = AvevaParser("dummy.csv")
+        self.parser.templates = {
+            "$UserDefined": [
+                ":TEMPLATE=$UserDefined\n",
+                ":Tagname,Area,ShortDesc,Extensions(MxBigString),DI1.InputSource(MxReferenceType)\n",
+                f"Tag1,Area1,Desc1,{EXTENSIONS},PLC1.DB1.DBX0.0\n",
+                "Tag2,Area1,Desc2,,PLC1.DB1.DBX0.1\n",
+                "Tag3,Area2,Desc3,<bad,\n",
+            ]
+        }
+        self.events = []
+        self.analyzer = ExtensionAnalyzer(self.parser, ProgressReporter(self.events.append))
+
+    def test_reports_share_one_parse(self):
+        self.assertEqual(
+            [(r["Tag"], r["PLC_Address"]) for r in self.analyzer.get_plc_addresses()],
+            [("Tag1", "PLC1.DB1.DBX0.0")]
+        )
+        first = self.analyzer._cache["$UserDefined"]
+        self.assertEqual(dict(self.analyzer.analyze()), {
+            "objext": ["Tag1"], "inputoutputextension": ["Tag1.DI1"], "alarmextension": ["Tag1.DI1"]
+        })
+        self.assertEqual(dict(self.analyzer.extract_address_map_by_area(alarm_only=True)), {
+            "Area1": [["Tag1.DI1", "DB1.DBX0.0"]]
+        })
+        self.assertEqual(len(self.analyzer.extract_address_map_by_area()["Area1"]), 2)
+        self.assertIs(self.analyzer._cache["$UserDefined"], first)
+        # Cached templates still move the progress bar
+        self.assertEqual(self.events[-1]["Rows"], 3)
+
+    def test_edits_invalidate_precisely(self):
+        self.analyzer.get_plc_addresses()
+        first = self.analyzer._cache["$UserDefined"]
+
+        self.parser.update_tag_values([("$UserDefined", "Tag1", "ShortDesc", "New")])
+        self.analyzer.get_plc_addresses()
+        self.assertIs(self.analyzer._cache["$UserDefined"], first)
+
+        self.parser.update_tag_value("$UserDefined", "Tag1", "DI1.InputSource(MxReferenceType)", "PLC2.DB9")
+        self.assertEqual(self.analyzer.get_plc_addresses()[0]["PLC_Address"], "PLC2.DB9")
+        self.assertIsNot(self.analyzer._cache["$UserDefined"], first)
+
+        # A dump parsed again is parsed again too
+        lines = self.parser.templates["$UserDefined"][:3]
+        self.parser.begin_stream()
+        self.parser.feed("".join(lines).encode("utf-16"))
+        self.parser.end_stream()
+        self.assertEqual(len(self.analyzer.extract_address_map_by_area()["Area1"]), 1)
+
+    def test_disk_backed_templates_are_not_cached(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.snap")
+            write_snapshot(self.parser, path)
+            parser = load_snapshot(path, "dump.csv", lazy=True)
+            analyzer = BackendAnalyzer(parser)
+            self.assertEqual(len(analyzer.get_plc_addresses()), 1)
+            self.assertEqual(len(analyzer.extract_address_map_by_area()["Area1"]), 2)
+            self.assertEqual(analyzer._cache, {})
+            # Unmaps the snapshot before the directory is removed
+            del analyzer, parser
+
+
+if __name__ == '__main__':
+    unittest.main()
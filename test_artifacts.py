@@ -0,0 +1,71 @@
+import os
+import tempfile
+import gzip
+import time
+import unittest
+import zipfile
+import zlib
+
+from web_app.backend.artifacts import (
+    artifact_writer, etag_matches, iter_compressed, iter_file, make_etag, negotiate_coding, write_zip_member
+)
+
+
+class TestArtifacts(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_etag_matching(self):
+        etag = make_etag("abc_area_0123")
+        self.assertTrue(etag_matches(etag, etag))
+        self.assertTrue(etag_matches(f'"other", W/{etag}', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('"other"', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+    def build_zip(self, name):
+        path = os.path.join(self.tmpdir.name, name)
+        with artifact_writer(path) as f, zipfile.ZipFile(f, mode='w') as z:
+            write_zip_member(z, "a.csv", b"Tag,Addr\r\n")
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_rebuilt_zip_is_byte_identical(self):
+        first = self.build_zip("first.zip")
+        time.sleep(2)  # ZIP timestamps have a 2 second resolution
+        self.assertEqual(first, self.build_zip("second.zip"))
+
+    def test_failed_build_leaves_nothing_behind(self):
+        path = os.path.join(self.tmpdir.name, "out.csv")
+        with self.assertRaises(RuntimeError):
+            with artifact_writer(path) as f:
+                f.write(b"partial")
+                raise RuntimeError("boom")
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_coding_negotiation(self):
+        self.assertEqual(negotiate_coding("gzip, deflate, br"), "gzip")
+        self.assertEqual(negotiate_coding("deflate;q=1, gzip;q=0.5"), "deflate")
+        self.assertEqual(negotiate_coding("gzip;q=0, deflate"), "deflate")
+        self.assertEqual(negotiate_coding("*"), "gzip")
+        self.assertIsNone(negotiate_coding("br, identity"))
+        self.assertIsNone(negotiate_coding(None))
+        self.assertNotEqual(make_etag("abc_area_0123", "gzip"), make_etag("abc_area_0123"))
+
+    def test_streaming_compression_round_trip(self):
+        path = os.path.join(self.tmpdir.name, "out.csv")
+        data = "".join(f"Tag{i},Area{i % 10},Description {i}\r\n" for i in range(20000)).encode("utf-16")
+        with open(path, "wb") as f:
+            f.write(data)
+
+        gzipped = b"".join(iter_compressed(iter_file(path, chunk_size=4096), "gzip"))
+        self.assertEqual(gzip.decompress(gzipped), data)
+        self.assertLess(len(gzipped), len(data) // 5)
+        deflated = b"".join(iter_compressed(iter_file(path), "deflate"))
+        self.assertEqual(zlib.decompress(deflated), data)
+
+if __name__ == '__main__':
+    unittest.main()
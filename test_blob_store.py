@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from web_app.backend.blob_store import BlobStore
+
+
+class TestBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = BlobStore(self.tmpdir.name)
+        self.store.ensure_dirs()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def spool(self, content):
+        path = self.store.staging_path()
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_duplicate_uploads_share_one_blob(self):
+        first = self.store.commit(self.spool(b"dump"), "abc")
+        second = self.store.commit(self.spool(b"dump"), "abc")
+
+        self.assertEqual(first, second)
+        self.assertEqual(os.listdir(self.store.blob_dir), ["abc.csv"])
+
+    def test_remove_deletes_blob_and_derived_files(self):
+        blob = self.store.commit(self.spool(b"dump"), "abc")
+        with open(self.store.snapshot_path("abc"), "wb") as f:
+            f.write(b"snap")
+        artifact = self.store.artifact_path("abc", "area", {"areas": ["A1"]}, "extracted_areas.csv")
+        other = self.store.artifact_path("def", "area", {"areas": ["A1"]}, "extracted_areas.csv")
+        for path in (artifact, other):
+            with open(path, "w") as f:
+                f.write("x")
+
+        self.store.remove("abc")
+        self.assertFalse(os.path.exists(blob))
+        self.assertFalse(os.path.exists(self.store.snapshot_path("abc")))
+        self.assertFalse(os.path.exists(artifact))
+        self.assertTrue(os.path.exists(other))
+
+    def test_artifact_path_depends_on_params(self):
+        a = self.store.artifact_path("abc", "area", {"areas": ["A1", "A2"]}, "out.csv")
+        b = self.store.artifact_path("abc", "area", {"areas": ["A1", "A2"]}, "out.csv")
+        c = self.store.artifact_path("abc", "area", {"areas": ["A1"]}, "out.csv")
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+
+from web_app.backend.aveva_parser import AvevaParser
+from web_app.backend.browse import (
+    CursorError, Dataset, build_area_dataset, build_name_dataset, build_shortdesc_dataset, build_tag_dataset
+)
+
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        rows = []
+        for i in range(250):
+            tmpl = "$Pump" if i % 2 else "$Valve"
+            area = f"Area{i % 5}"
+            rows.append((f"Tag{i:03d}", tmpl, area, f"Description {i}"))
+        self.dataset = Dataset(["Tag", "Template", "Area", "ShortDesc"], rows, group_columns=["Template", "Area"])
+
+    def collect(self, **kwargs):
+        tags, cursor = [], None
+        while True:
+            rows, cursor, _ = self.dataset.page("Tag", limit=40, cursor=cursor, **kwargs)
+            tags.extend(r[0] for r in rows)
+            if cursor is None:
+                return tags
+
+    def test_pages_cover_everything_once(self):
+        tags = self.collect()
+        self.assertEqual(tags, sorted(r[0] for r in self.dataset.rows))
+
+    def test_descending(self):
+        tags = self.collect(descending=True)
+        self.assertEqual(tags, sorted((r[0] for r in self.dataset.rows), reverse=True))
+
+    def test_prefix_is_case_insensitive(self):
+        rows, cursor, total = self.dataset.page("Tag", prefix="tag01")
+        self.assertEqual([r[0] for r in rows], [f"Tag{i:03d}" for i in range(10, 20)])
+        self.assertIsNone(cursor)
+        self.assertEqual(total, 10)
+
+    def test_filters_and_substring(self):
+        tags = self.collect(filters={"Template": "$Pump", "Area": "Area1"})
+        expected = [r[0] for r in self.dataset.rows if r[1] == "$Pump" and r[2] == "Area1"]
+        self.assertEqual(tags, sorted(expected))
+
+        rows, _, total = self.dataset.page("Tag", contains="SCRIPTION 12")
+        self.assertEqual({r[0] for r in rows}, {"Tag012"} | {f"Tag{i}" for i in range(120, 130)})
+        self.assertIsNone(total)
+
+    def test_cursor_from_other_query_rejected(self):
+        _, cursor, _ = self.dataset.page("Tag", limit=10)
+        with self.assertRaises(CursorError):
+            self.dataset.page("Tag", limit=10, cursor=cursor, prefix="Tag1")
+        with self.assertRaises(CursorError):
+            self.dataset.page("Tag", cursor="garbage")
+
+
+class TestBuilders(unittest.TestCase):
+    def setUp(self):
+        self.parser = AvevaParser("dummy.csv")
+        self.parser.templates = {
+            "$Area": [":TEMPLATE=$Area\n", ":Tagname\n", "Area1\n", "Area2\n"],
+            "$UserDefined": [
+                ":TEMPLATE=$UserDefined\n",
+                ":Tagname,ShortDesc,Area\n",
+                "MyTag,\"Desc, with comma\",Area1\n",
+                "MyTag2,OldDesc2,Area1\n"
+            ],
+            "$NoDesc": [":TEMPLATE=$NoDesc\n", ":Tagname,Area\n", "Other,Area2\n"]
+        }
+
+    def test_datasets(self):
+        tags = build_tag_dataset(self.parser)
+        self.assertEqual(len(tags.rows), 3)
+        self.assertIn(("MyTag", "$UserDefined", "Area1", "Desc, with comma"), tags.rows)
+
+        shortdesc = build_shortdesc_dataset(self.parser, tags)
+        self.assertEqual({r[0] for r in shortdesc.rows}, {"MyTag", "MyTag2"})
+
+        areas = build_area_dataset(self.parser, tags)
+        self.assertEqual(areas.rows, [("Area1", "2"), ("Area2", "1")])
+
+    def test_name_dataset_pages_sorted(self):
+        names = build_name_dataset("Area", [f"area{i:03d}" for i in range(250, 0, -1)] + ["AREA000"])
+        rows, cursor, total = names.page("Area", limit=100)
+        self.assertEqual(total, 251)
+        self.assertEqual([r[0] for r in rows[:2]], ["AREA000", "area001"])
+        rows, cursor, _ = names.page("Area", limit=100, cursor=cursor)
+        self.assertEqual(rows[0], ("area100",))
+
+        rows, cursor, total = names.page("Area", prefix="Area02")
+        self.assertEqual((total, cursor), (10, None))
+
+    def test_area_tag_counts_sort_numerically(self):
+        self.parser.templates["$Area"] = [":TEMPLATE=$Area\n", ":Tagname\n", "Area1\n", "Area2\n", "Area3\n"]
+        rows = [f"Tag{i},Area{1 if i < 10 else 2 if i < 12 else 3}\n" for i in range(112)]
+        self.parser.templates["$NoDesc"] = [":TEMPLATE=$NoDesc\n", ":Tagname,Area\n"] + rows
+        del self.parser.templates["$UserDefined"]
+        areas = build_area_dataset(self.parser, build_tag_dataset(self.parser))
+
+        rows, _, _ = areas.page("Tags", limit=2)
+        self.assertEqual([r[1] for r in rows], ["2", "10"])
+        _, cursor, _ = areas.page("Tags", limit=1)
+        rows, _, _ = areas.page("Tags", cursor=cursor)
+        self.assertEqual([r[1] for r in rows], ["10", "100"])
+        rows, _, _ = areas.page("Tags", descending=True)
+        self.assertEqual([r[1] for r in rows], ["100", "10", "2"])
+
+        rows, _, total = areas.page("Tags", prefix="10")
+        self.assertEqual(([r[1] for r in rows], total), (["10", "100"], None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import os
+import tempfile
+import unittest
+
+from web_app.backend.aveva_parser import AvevaParser
+from web_app.backend.bulk_edits import append_edit_log, edits_from_csv, iter_dump_bytes, read_edit_log
+
+
+class TestBulkUpdate(unittest.TestCase):
+    def setUp(self):
+        self.parser = AvevaParser("dummy.csv")
+        self.parser.headers = [":grammar=1\n"]
+        self.parser.templates = {
+            "$UserDefined": [
+                ":TEMPLATE=$UserDefined\n",
+                ":Tagname,ShortDesc,DI1.InputSource(MxReferenceType)\n",
+                "MyTag,\"Desc, with comma\",PLC1.A\n",
+                "MyTag2,OldDesc2,PLC1.B\n"
+            ]
+        }
+
+    def test_statuses(self):
+        results = self.parser.update_tag_values([
+            ("$UserDefined", "MyTag2", "ShortDesc", "NewDesc2"),
+            ("$UserDefined", "MyTag", "ShortDesc", "Desc, with comma"),
+            ("$UserDefined", "Missing", "ShortDesc", "x"),
+            ("$UserDefined", "MyTag", "NoSuchColumn", "x"),
+            ("$Other", "MyTag", "ShortDesc", "x"),
+        ])
+        self.assertEqual(
+            [r["Status"] for r in results],
+            ["updated", "unchanged", "tag_not_found", "column_not_found", "template_not_found"]
+        )
+        self.assertEqual(results[0]["OldValue"], "OldDesc2")
+        self.assertEqual(self.parser.templates["$UserDefined"][3], "MyTag2,NewDesc2,PLC1.B\n")
+
+    def test_matches_single_updates(self):
+        other = self.parser.copy(["$UserDefined"])
+        edits = [
+            ("$UserDefined", "MyTag", "ShortDesc", "Quoted \"desc\""),
+            ("$UserDefined", "MyTag2", "DI1.InputSource(MxReferenceType)", "PLC2.B"),
+        ]
+        self.parser.update_tag_values(edits)
+        for edit in edits:
+            other.update_tag_value(*edit)
+        self.assertEqual(self.parser.templates, other.templates)
+
+    def test_copy_leaves_original_untouched(self):
+        before = list(self.parser.templates["$UserDefined"])
+        clone = self.parser.copy(["$UserDefined"])
+        clone.update_tag_values([("$UserDefined", "MyTag", "ShortDesc", "Changed")])
+
+        self.assertEqual(self.parser.templates["$UserDefined"], before)
+        self.assertIn("MyTag,Changed,PLC1.A\n", clone.templates["$UserDefined"])
+
+    def test_edits_from_csv_layouts(self):
+        shortdesc = io.StringIO("Tagname,ShortDesc,Template\nMyTag,New,$UserDefined\n")
+        self.assertEqual(edits_from_csv(shortdesc), [("$UserDefined", "MyTag", "ShortDesc", "New")])
+
+        plc = io.StringIO("Tag,Attribute,PLC_Address,Template\nMyTag,DI1,PLC9.A,$UserDefined\n")
+        self.assertEqual(
+            edits_from_csv(plc),
+            [("$UserDefined", "MyTag", "DI1.InputSource(MxReferenceType)", "PLC9.A")]
+        )
+
+        with self.assertRaises(ValueError):
+            edits_from_csv(io.StringIO("A,B\n1,2\n"))
+
+    def test_edit_log_replay(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "session.edits")
+            append_edit_log(path, 1, [("$UserDefined", "MyTag", "ShortDesc", "First")])
+            append_edit_log(path, 2, [("$UserDefined", "MyTag", "ShortDesc", "Second")])
+
+            self.assertEqual(read_edit_log(path, 1), [("$UserDefined", "MyTag", "ShortDesc", "First")])
+            self.assertEqual(len(read_edit_log(path, 2)), 2)
+
+    def test_dump_bytes(self):
+        data = b"".join(iter_dump_bytes(self.parser)).decode("utf-16")
+        expected = "".join(self.parser.headers + self.parser.templates["$UserDefined"])
+        self.assertEqual(data, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+
+from web_app.backend.aveva_parser import AvevaParser
+from web_app.backend.snapshot import StreamingSnapshotWriter
+from web_app.backend.chunked_uploads import ChunkedUploadStore, ChunkError, IncrementalIngest, UploadClosed
+
+CHUNK = 64 * 1024
+
+
+def make_dump(rows):
+    lines = [":Header1\r\n", ":TEMPLATE=$Area\r\n", ":Tagname\r\n", "Area1\r\n",
+             ":TEMPLATE=$UserDefined\r\n", ":Tagname,ShortDesc,Area\r\n"]
+    lines.extend(f"Tag{i},Description {i},Area1\r\n" for i in range(rows))
+    return "".join(lines).encode("utf-16")
+
+
+class TestChunkedUpload(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = ChunkedUploadStore(self.tmpdir.name)
+        self.data = make_dump(5000)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def put(self, info, index):
+        part = self.data[index * CHUNK:(index + 1) * CHUNK]
+        self.store.write_chunk(info, index, part, hashlib.sha256(part).hexdigest())
+
+    def test_chunks_in_any_order_assemble_the_file(self):
+        info = self.store.create("dump.csv", len(self.data), CHUNK)
+        self.assertGreater(info["chunks"], 3)
+        for index in reversed(range(info["chunks"])):
+            self.put(info, index)
+        self.assertEqual(self.store.received(info["upload_id"]), list(range(info["chunks"])))
+        with open(self.store.data_path(info["upload_id"]), "rb") as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(self.store.file_sha256(info["upload_id"]), hashlib.sha256(self.data).hexdigest())
+
+    def test_rejects_bad_chunks(self):
+        info = self.store.create("dump.csv", len(self.data), CHUNK)
+        part = self.data[:CHUNK]
+        with self.assertRaises(ChunkError):
+            self.store.write_chunk(info, 0, part, "0" * 64)
+        with self.assertRaises(ChunkError):
+            self.store.write_chunk(info, 0, part[:-1], hashlib.sha256(part[:-1]).hexdigest())
+        with self.assertRaises(ChunkError):
+            self.store.write_chunk(info, info["chunks"], part, hashlib.sha256(part).hexdigest())
+        self.assertEqual(self.store.received(info["upload_id"]), [])
+
+    def test_incremental_ingest_matches_parse(self):
+        info = self.store.create("dump.csv", len(self.data), CHUNK)
+        parser = AvevaParser(self.store.data_path(info["upload_id"]))
+        ingest = IncrementalIngest(self.store, info, parser)
+
+        # Out of order: nothing can be fed until chunk 0 arrives
+        for index in range(1, info["chunks"]):
+            self.put(info, index)
+            ingest.advance()
+        self.assertEqual(ingest.next_chunk, 0)
+        self.put(info, 0)
+        ingest.advance()
+        self.assertTrue(ingest.complete)
+        self.assertEqual(ingest.digest.hexdigest(), hashlib.sha256(self.data).hexdigest())
+
+        reference = AvevaParser(self.store.data_path(info["upload_id"]))
+        reference.parse()
+        self.assertEqual(parser.headers, reference.headers)
+        self.assertEqual(parser.templates, reference.templates)
+
+    def test_no_chunks_after_finalize_or_abort(self):
+        info = self.store.create("dump.csv", len(self.data), CHUNK)
+        data_path = self.store.data_path(info["upload_id"])
+        ingest = IncrementalIngest(self.store, info, StreamingSnapshotWriter(data_path, data_path + ".snap.part"))
+        self.put(info, 0)
+
+        # DELETE: the writer is aborted, and an advance() queued before does nothing
+        ingest.close()
+        ingest.parser.abort()
+        ingest.advance()
+        self.assertEqual(ingest.next_chunk, 0)
+
+        self.assertTrue(self.store.claim_finalize(info["upload_id"]))
+        self.assertFalse(self.store.claim_finalize(info["upload_id"]))
+        with self.assertRaises(UploadClosed):
+            self.put(info, 1)
+        self.store.remove(info["upload_id"])
+        self.assertFalse(self.store.claim_finalize(info["upload_id"]))
+
+        other = self.store.create("dump.csv", len(self.data), CHUNK)
+        self.store.remove(other["upload_id"])
+        with self.assertRaises(FileNotFoundError):
+            self.put(other, 0)
+
+    def test_sweep_removes_abandoned_uploads(self):
+        info = self.store.create("dump.csv", len(self.data), CHUNK)
+        self.assertEqual(self.store.sweep(time.time(), 3600), 0)
+        self.assertIsNotNone(self.store.info(info["upload_id"]))
+        self.assertGreater(self.store.sweep(time.time() + 7200, 3600), 0)
+        self.assertIsNone(self.store.info(info["upload_id"]))
+        self.assertEqual(os.listdir(self.store.root), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import os
+import tempfile
+import unittest
+
+from aveva_parser import AvevaParser
+from edit_journal import EditJournal
+
+
+def make_dump(path):
+    lines = [
+        ":Header1\n",
+        ":TEMPLATE=$UserDefined\n",
+        ":Tagname,ShortDesc,DI1.InputSource(MxReferenceType)\n",
+        "Tag1,Desc1,PLC1.A\n",
+        "Tag2,Desc2,PLC1.B\n",
+    ]
+    with open(path, "w", encoding="utf-16", newline="") as f:
+        f.writelines(lines)
+
+
+class TestEditJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dump = os.path.join(self.tmpdir.name, "dump.csv")
+        make_dump(self.dump)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def parsed(self):
+        parser = AvevaParser(self.dump)
+        parser.parse()
+        return parser
+
+    def values(self, parser):
+        return [
+            (row["Tag"], row["Value"]) for row in parser.get_all_tags_with_column("ShortDesc")
+        ] + [
+            (row["Tag"], row["Value"]) for row in parser.get_all_tags_with_column("DI1.InputSource(MxReferenceType)")
+        ]
+
+    def edit(self, parser, journal, edits):
+        return journal.record(parser.update_tag_values(edits))
+
+    def test_undo_redo_without_reparsing(self):
+        parser = self.parsed()
+        journal = EditJournal(self.dump)
+        journal.start()
+        original = self.values(parser)
+
+        self.assertEqual(self.edit(parser, journal, [
+            ("$UserDefined", "Tag1", "ShortDesc", "New1"),
+            ("$UserDefined", "Tag1", "ShortDesc", "Newer1"),
+            ("$UserDefined", "Missing", "ShortDesc", "x"),
+        ]), 2)
+        self.edit(parser, journal, [("$UserDefined", "Tag2", "DI1.InputSource(MxReferenceType)", "PLC2.B")])
+        edited = self.values(parser)
+
+        journal.undo(parser)
+        journal.undo(parser)
+        self.assertEqual(self.values(parser), original)
+        self.assertFalse(journal.can_undo())
+        journal.redo(parser)
+        journal.redo(parser)
+        self.assertEqual(self.values(parser), edited)
+
+        # A new batch clears the redo stack
+        journal.undo(parser)
+        self.edit(parser, journal, [("$UserDefined", "Tag2", "ShortDesc", "Other")])
+        self.assertFalse(journal.can_redo())
+
+    def test_failed_journal_write_rolls_back(self):
+        parser = self.parsed()
+        journal = EditJournal(self.dump)
+        journal.start()
+        journal.apply(parser, [("$UserDefined", "Tag1", "ShortDesc", "New1")])
+        journal.undo(parser)
+        original = self.values(parser)
+
+        path, journal.path = journal.path, self.tmpdir.name  # A directory cannot be appended to
+        with self.assertRaises(OSError):
+            journal.apply(parser, [
+                ("$UserDefined", "Tag1", "ShortDesc", "Other1"),
+                ("$UserDefined", "Tag1", "Tagname", "Renamed1"),
+                ("$UserDefined", "Tag2", "DI1.InputSource(MxReferenceType)", "PLC2.B"),
+            ])
+        self.assertEqual(self.values(parser), original)
+        self.assertFalse(journal.can_undo())
+        self.assertTrue(journal.can_redo())
+
+        journal.path = path
+        journal.redo(parser)
+        self.assertEqual(EditJournal(self.dump).recoverable(), 1)
+
+    def test_recovery_after_crash(self):
+        parser = self.parsed()
+        journal = EditJournal(self.dump)
+        journal.start()
+        self.edit(parser, journal, [("$UserDefined", "Tag1", "ShortDesc", "New1")])
+        self.edit(parser, journal, [("$UserDefined", "Tag2", "ShortDesc", "New2")])
+        self.edit(parser, journal, [("$UserDefined", "Tag2", "ShortDesc", "Undone")])
+        journal.undo(parser)
+        expected = self.values(parser)
+        # The process dies in the middle of a write
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"op": "apply", "edits": [["$User')
+
+        restarted = EditJournal(self.dump)
+        self.assertEqual(restarted.recoverable(), 2)
+        fresh = self.parsed()
+        restarted.recover(fresh)
+        self.assertEqual(self.values(fresh), expected)
+
+        # The journal goes on from the recovered state
+        restarted.undo(fresh)
+        again = EditJournal(self.dump)
+        self.assertEqual(again.recoverable(), 1)
+
+    def test_nothing_to_recover(self):
+        parser = self.parsed()
+        journal = EditJournal(self.dump)
+        self.assertEqual(journal.recoverable(), 0)
+        journal.start()
+        self.edit(parser, journal, [("$UserDefined", "Tag1", "ShortDesc", "New1")])
+        journal.mark_saved(os.path.join(self.tmpdir.name, "saved.csv"))
+        self.assertEqual(EditJournal(self.dump).recoverable(), 0)
+
+        # Edits journaled for another version of the dump are not replayed
+        self.edit(parser, journal, [("$UserDefined", "Tag2", "ShortDesc", "New2")])
+        self.assertEqual(EditJournal(self.dump).recoverable(), 2)
+        with open(self.dump, "a", encoding="utf-16") as f:
+            f.write("Tag3,Desc3,\n")
+        self.assertEqual(EditJournal(self.dump).recoverable(), 0)
+
+    def test_save_over_dump_then_crash(self):
+        parser = self.parsed()
+        journal = EditJournal(self.dump)
+        journal.start()
+        self.edit(parser, journal, [("$UserDefined", "Tag1", "ShortDesc", "New1")])
+        parser.save(self.dump)
+        journal.mark_saved(self.dump)
+        # The saved dump is the new original: nothing to undo or recover yet
+        self.assertFalse(journal.can_undo())
+        self.assertEqual(EditJournal(self.dump).recoverable(), 0)
+
+        self.edit(parser, journal, [("$UserDefined", "Tag2", "ShortDesc", "New2")])
+        expected = self.values(parser)
+        # The process dies before the next save
+        restarted = EditJournal(self.dump)
+        self.assertEqual(restarted.recoverable(), 1)
+        fresh = self.parsed()
+        restarted.recover(fresh)
+        self.assertEqual(self.values(fresh), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+import unittest
+
+from web_app.backend.blob_store import BlobStore
+from web_app.backend.lifecycle import SessionLifecycle
+from web_app.backend.session_store import MemorySessionStore
+
+
+class TestSessionLifecycle(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.blobs = BlobStore(self.tmpdir.name)
+        self.blobs.ensure_dirs()
+        self.sessions = MemorySessionStore()
+        self.lifecycle = SessionLifecycle(
+            self.sessions, self.blobs, self.release,
+            idle_ttl=60, disk_quota=1000, sweep_interval=1
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def release(self, session_id):
+        return self.sessions.release(session_id, on_last_reference=self.blobs.remove) is not None
+
+    def add_session(self, session_id, sha256, size, last_access):
+        with open(self.blobs.blob_path(sha256), "wb") as f:
+            f.write(b"x" * size)
+        record = self.lifecycle.new_record(filename="dump.csv", sha256=sha256)
+        record["last_access"] = last_access
+        self.sessions.put(session_id, record)
+
+    def write_artifact(self, name, size, mtime):
+        path = self.blobs.artifact_path("abc", name, {}, "out.csv")
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_idle_sessions_expire(self):
+        now = time.time()
+        self.add_session("old", "aaa", 10, now - 120)
+        self.add_session("fresh", "bbb", 10, now)
+
+        self.lifecycle.sweep(now)
+        self.assertIsNone(self.sessions.get("old"))
+        self.assertIsNotNone(self.sessions.get("fresh"))
+        self.assertFalse(os.path.exists(self.blobs.blob_path("aaa")))
+        self.assertEqual(self.lifecycle.counters["sessions_expired"], 1)
+
+    def test_quota_evicts_artifacts_before_sessions(self):
+        now = time.time()
+        self.add_session("s1", "abc", 400, now)
+        old = self.write_artifact("old", 400, now - 30)
+        new = self.write_artifact("new", 400, now - 10)
+
+        self.lifecycle.sweep(now)
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+        self.assertIsNotNone(self.sessions.get("s1"))
+        self.assertEqual(self.lifecycle.counters["artifacts_evicted"], 1)
+
+    def test_quota_evicts_least_recently_used_session(self):
+        now = time.time()
+        self.add_session("lru", "aaa", 600, now - 30)
+        self.add_session("mru", "bbb", 600, now - 10)
+
+        self.lifecycle.sweep(now)
+        self.assertIsNone(self.sessions.get("lru"))
+        self.assertIsNotNone(self.sessions.get("mru"))
+        self.assertEqual(self.lifecycle.counters["sessions_evicted"], 1)
+        self.assertEqual(self.lifecycle.status()["active_sessions"], 1)
+
+    def test_abandoned_scratch_files_removed(self):
+        now = time.time()
+        stale = self.blobs.staging_path()
+        with open(stale, "wb") as f:
+            f.write(b"partial")
+        os.utime(stale, (now - 120, now - 120))
+        active = self.blobs.staging_path()
+        with open(active, "wb") as f:
+            f.write(b"partial")
+
+        self.lifecycle.sweep(now)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(active))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import asyncio
+import unittest
+
+from web_app.backend.metrics import MetricsMiddleware, Registry
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge(self):
+        hits = self.registry.counter("cache_total", "Cache lookups", ["result"])
+        hits.inc(result="hit")
+        hits.inc(2, result="hit")
+        hits.inc(result="miss")
+        self.registry.gauge("sessions", "Sessions", function=lambda: 7)
+
+        text = self.registry.render()
+        self.assertIn("# TYPE cache_total counter", text)
+        self.assertIn('cache_total{result="hit"} 3', text)
+        self.assertIn('cache_total{result="miss"} 1', text)
+        self.assertIn("sessions 7", text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        latency = self.registry.histogram("latency_seconds", "Latency", ["route"], buckets=[0.1, 1])
+        for value in (0.05, 0.5, 0.5, 5):
+            latency.observe(value, route="/api/x")
+
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{route="/api/x",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{route="/api/x",le="1"} 3', text)
+        self.assertIn('latency_seconds_bucket{route="/api/x",le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_count{route="/api/x"} 4', text)
+
+    def test_broken_function_does_not_fail_scrape(self):
+        self.registry.gauge("broken", "Broken", function=lambda: 1 / 0)
+        self.registry.gauge("ok", "Ok", function=lambda: 1)
+        text = self.registry.render()
+        self.assertIn("# broken unavailable", text)
+        self.assertIn("ok 1", text)
+
+    def test_middleware_labels_by_route(self):
+        requests = self.registry.counter("requests_total", "Requests", ["method", "route", "status"])
+        latency = self.registry.histogram("latency_seconds", "Latency", ["method", "route"])
+
+        class Route:
+            path = "/api/browse/{name}"
+
+        async def app(scope, receive, send):
+            scope["route"] = Route()
+            await send({"type": "http.response.start", "status": 404})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        middleware = MetricsMiddleware(app, requests, latency)
+        asyncio.run(middleware({"type": "http", "method": "GET"}, None, send))
+        self.assertEqual(requests.value(method="GET", route="/api/browse/{name}", status=404), 1)
+        self.assertEqual(latency.count(method="GET", route="/api/browse/{name}"), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from web_app.backend.aveva_parser import AvevaParser, ProgressReporter
+from web_app.backend.extension_analyzer import ExtensionAnalyzer
+from web_app.backend.progress import ProgressHub
+from web_app.backend.snapshot import load_snapshot, write_snapshot
+
+
+def make_dump(path, rows):
+    lines = [":Header1\n", ":TEMPLATE=$UserDefined\n", ":Tagname,ShortDesc\n"]
+    lines.extend(f"Tag{i},Desc{i}\n" for i in range(rows))
+    with open(path, "w", encoding="utf-16", newline="") as f:
+        f.writelines(lines)
+    return len(lines)
+
+
+class TestProgressReporter(unittest.TestCase):
+    def test_throttled(self):
+        events = []
+        progress = ProgressReporter(events.append, interval=3600)
+        progress.begin("test")
+        for _ in range(10000):
+            progress.row()
+        # Nothing is sent before the interval has passed
+        self.assertEqual(events, [])
+        progress.finish()
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0]["Finished"])
+        self.assertEqual(events[0]["Rows"], 10000)
+
+    def test_parse_reports_rows_and_bytes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "dump.csv")
+            line_count = make_dump(path, 2000)
+
+            events = []
+            parser = AvevaParser(path, ProgressReporter(events.append, interval=0))
+            parser.parse()
+
+            self.assertGreater(len(events), 1)
+            rows = [e["Rows"] for e in events]
+            self.assertEqual(rows, sorted(rows))
+            self.assertEqual(events[-1]["Rows"], line_count)
+            self.assertEqual(events[-1]["Bytes"], os.path.getsize(path))
+            self.assertEqual(events[-1]["Template"], "$UserDefined")
+
+    def test_analyzer_counts_every_row(self):
+        parser = AvevaParser("dummy.csv")
+        parser.templates = {
+            "$UserDefined": [
+                ":TEMPLATE=$UserDefined\n",
+                ":Tagname,Extensions(MxBigString)\n",
+                "Tag1,\n",
+                "Tag2,\n"
+            ]
+        }
+        events = []
+        ExtensionAnalyzer(parser, ProgressReporter(events.append)).analyze()
+        self.assertEqual(events[-1]["Operation"], "analyze")
+        self.assertEqual(events[-1]["Rows"], 2)
+        self.assertEqual(events[-1]["TotalRows"], 2)
+
+    def test_disk_backed_total_comes_from_the_index(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.snap")
+            parser = AvevaParser("dummy.csv")
+            parser.templates = {
+                "$A": [":TEMPLATE=$A\n", ":Tagname\n", "Tag1\n", "Tag2\n"],
+                "$B": [":TEMPLATE=$B\n", ":Tagname\n", "Tag3\n"],
+            }
+            write_snapshot(parser, path)
+            lazy = load_snapshot(path, "dump.csv", lazy=True)
+
+            events = []
+            analyzer = ExtensionAnalyzer(lazy, ProgressReporter(events.append))
+            analyzer._begin("analyze")
+            self.assertEqual(analyzer.progress.total_rows, 3)
+            # Nothing was decoded to count the rows
+            self.assertEqual(len(lazy.templates._cache), 0)
+
+            analyzer.analyze()
+            self.assertEqual((events[-1]["Rows"], events[-1]["TotalRows"]), (3, 3))
+            del analyzer, lazy
+
+
+class TestProgressHub(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.hub = ProgressHub(self.tmpdir.name, poll_interval=0.01)
+        self.hub.ensure_dir()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def collect(self, progress_id, timeout=5):
+        async def run():
+            return [frame async for frame in self.hub.stream(progress_id, timeout)]
+        return asyncio.run(run())
+
+    def test_stream_ends_with_done(self):
+        self.hub.reporter("request-1").finish()
+        self.hub.close("request-1", error="boom")
+        frames = self.collect("request-1")
+        self.assertEqual(frames, ['event: done\ndata: {"Status": "error", "Detail": "boom"}\n\n'])
+
+    def test_stream_times_out_without_events(self):
+        frames = self.collect("request-2", timeout=0.05)
+        self.assertEqual(frames[-1], "event: timeout\ndata: {}\n\n")
+
+    def test_invalid_ids_are_silent(self):
+        self.assertFalse(self.hub.valid_id("../etc"))
+        self.hub.reporter("../etc").finish()
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from web_app.backend.session_store import MemorySessionStore, SqliteSessionStore
+
+
+class SessionStoreContract:
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = self.make_store()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_put_get_update(self):
+        self.store.put("s1", {"sha256": "abc", "filename": "dump.csv"})
+        self.store.update("s1", filename="renamed.csv")
+        self.assertEqual(self.store.get("s1"), {"sha256": "abc", "filename": "renamed.csv"})
+        self.assertIsNone(self.store.get("missing"))
+        self.assertEqual(len(self.store), 1)
+
+    def test_compare_and_update(self):
+        self.store.put("s1", {"sha256": "abc", "filename": "a.csv"})
+        committed = []
+        self.assertTrue(self.store.compare_and_update("s1", {"revision": None}, {"revision": 1}, lambda: committed.append(1)))
+        # A second writer that read the same revision loses
+        self.assertFalse(self.store.compare_and_update("s1", {"revision": None}, {"revision": 1}, lambda: committed.append(2)))
+        self.assertEqual(committed, [1])
+        self.assertEqual(self.store.get("s1")["revision"], 1)
+
+        def fail():
+            raise OSError("disk full")
+        with self.assertRaises(OSError):
+            self.store.compare_and_update("s1", {"revision": 1}, {"revision": 2}, fail)
+        self.assertEqual(self.store.get("s1")["revision"], 1)
+        self.assertFalse(self.store.compare_and_update("missing", {}, {"revision": 1}))
+
+    def test_release_reports_last_reference(self):
+        released = []
+        self.store.put("s1", {"sha256": "abc", "filename": "a.csv"})
+        self.store.put("s2", {"sha256": "abc", "filename": "b.csv"})
+        self.assertEqual(self.store.count_for("abc"), 2)
+
+        self.store.release("s1", on_last_reference=released.append)
+        self.assertEqual(released, [])
+        self.store.release("s2", on_last_reference=released.append)
+        self.assertEqual(released, ["abc"])
+        self.assertIsNone(self.store.release("s2", on_last_reference=released.append))
+
+
+class TestMemorySessionStore(SessionStoreContract, unittest.TestCase):
+    def make_store(self):
+        return MemorySessionStore()
+
+
+class TestSqliteSessionStore(SessionStoreContract, unittest.TestCase):
+    def make_store(self):
+        return SqliteSessionStore(os.path.join(self.tmpdir.name, "sessions.db"))
+
+    def test_visible_to_other_instances(self):
+        # A second store on the same file stands in for another worker process
+        self.store.put("s1", {"sha256": "abc", "filename": "a.csv"})
+        other = SqliteSessionStore(self.store.path)
+        self.assertEqual(other.get("s1")["sha256"], "abc")
+
+if __name__ == '__main__':
+    unittest.main()
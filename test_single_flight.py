@@ -0,0 +1,61 @@
+import threading
+import time
+import unittest
+
+from web_app.backend.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def run_concurrently(self, flight, key, fn, count=8):
+        results, errors = [], []
+
+        def worker():
+            try:
+                results.append(flight.do(key, fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, errors
+
+    def test_concurrent_callers_share_one_computation(self):
+        flight = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "matrix"
+
+        results, errors = self.run_concurrently(flight, "k", compute)
+        self.assertEqual(results, ["matrix"] * 8)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.coalesced, 7)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_errors_are_shared_and_not_cached(self):
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.2)
+            raise ValueError("bad dump")
+
+        results, errors = self.run_concurrently(flight, "k", fail, count=4)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 4)
+        # The next call starts a fresh computation
+        self.assertEqual(flight.do("k", lambda: "ok"), "ok")
+
+    def test_different_keys_run_independently(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do("a", lambda: 1), 1)
+        self.assertEqual(flight.do("b", lambda: 2), 2)
+        self.assertEqual(flight.coalesced, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from web_app.backend.aveva_parser import AvevaParser
+from web_app.backend.snapshot import load_snapshot, write_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.parser = AvevaParser("dummy.csv")
+        self.parser.headers = [":Header1\n", ":Header2\n"]
+        self.parser.templates = {
+            "$Area": [":TEMPLATE=$Area\n", ":Tagname\n", "Área1\n", "\n"],
+            "$UserDefined": [
+                ":TEMPLATE=$UserDefined\n",
+                ":Tagname,ShortDesc,Area\n",
+                "MyTag,\"Desc, with comma\",Área1\n",
+                "MyTag2,OldDesc2,Área1"
+            ]
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        path = os.path.join(self.tmpdir.name, "model.snap")
+        write_snapshot(self.parser, path)
+
+        loaded = load_snapshot(path, "dump.csv")
+        self.assertEqual(loaded.filepath, "dump.csv")
+        self.assertEqual(loaded.headers, self.parser.headers)
+        self.assertEqual(loaded.templates, self.parser.templates)
+        self.assertEqual(list(loaded.templates), list(self.parser.templates))
+
+    def test_rejects_foreign_file(self):
+        path = os.path.join(self.tmpdir.name, "model.snap")
+        with open(path, "wb") as f:
+            f.write(b"not a snapshot at all")
+        self.assertIsNone(load_snapshot(path, "dump.csv"))
+
+if __name__ == '__main__':
+    unittest.main()
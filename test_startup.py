@@ -0,0 +1,44 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from web_app.backend.startup import RunOnceMiddleware
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestStartup(unittest.TestCase):
+    def test_setup_runs_once_before_first_request(self):
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["type"])
+
+        middleware = RunOnceMiddleware(app, setup=lambda: calls.append("setup"))
+        for _ in range(3):
+            asyncio.run(middleware({"type": "http"}, None, None))
+        self.assertEqual(calls, ["setup", "http", "http", "http"])
+
+    def test_import_does_no_file_system_work(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            upload_dir = os.path.join(tmpdir, "uploads")
+            env = dict(os.environ, AVEVA_UPLOAD_DIR=upload_dir)
+            # Modules loaded by the import itself (site may load zipfile before it)
+            code = (
+                "import sys; before = set(sys.modules); import web_app.backend.main; "
+                "print(' '.join(sorted(set(sys.modules) - before)))"
+            )
+            out = subprocess.run(
+                [sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+            )
+            self.assertFalse(os.path.exists(upload_dir))
+            loaded = out.stdout.split()
+            for module in ("zipfile", "sqlite3", "xml.etree.ElementTree", "web_app.backend.aveva_parser",
+                           "web_app.backend.extension_analyzer", "web_app.backend.snapshot"):
+                self.assertFalse(module in loaded, f"{module} is imported at startup")
+
+if __name__ == '__main__':
+    unittest.main()
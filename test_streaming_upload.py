@@ -0,0 +1,87 @@
+import hashlib
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+
+from aveva_parser import AvevaParser
+from web_app.backend.uploads import UploadError, ingest_upload
+
+SAMPLE = (
+    ":Header1\r\n"
+    ":TEMPLATE=$Area\r\n"
+    ":Tagname,Area\r\n"
+    "Area1,Area1\r\n"
+    "\r\n"
+    ":TEMPLATE=$UserDefined\r\n"
+    ":Tagname,ShortDesc,Area\r\n"
+    "MyTag,OldDesc,Area1\r\n"
+    "MyTag2,OldDesc2,Area1"
+)
+
+
+class TestStreamingUpload(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.raw = SAMPLE.encode('utf-16')
+        self.reference = os.path.join(self.tmpdir.name, "reference.csv")
+        with open(self.reference, "wb") as f:
+            f.write(self.raw)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def parse_reference(self):
+        parser = AvevaParser(self.reference)
+        parser.parse()
+        return parser
+
+    def test_feed_matches_parse_for_any_chunking(self):
+        expected = self.parse_reference()
+        for chunk_size in (1, 3, 7, 64, len(self.raw)):
+            parser = AvevaParser("dummy.csv")
+            parser.begin_stream()
+            for i in range(0, len(self.raw), chunk_size):
+                parser.feed(self.raw[i:i + chunk_size])
+            parser.end_stream()
+            self.assertEqual(parser.headers, expected.headers, chunk_size)
+            self.assertEqual(parser.templates, expected.templates, chunk_size)
+
+    def test_ingest_csv(self):
+        dest = os.path.join(self.tmpdir.name, "upload.csv")
+        result = ingest_upload(io.BytesIO(self.raw), "dump.csv", dest)
+
+        self.assertEqual(result.sha256, hashlib.sha256(self.raw).hexdigest())
+        self.assertEqual(result.size, len(self.raw))
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), self.raw)
+        self.assertEqual(result.parser.templates, self.parse_reference().templates)
+
+    def test_ingest_zip(self):
+        zip_io = io.BytesIO()
+        with zipfile.ZipFile(zip_io, mode='w', compression=zipfile.ZIP_DEFLATED) as z:
+            z.writestr("inner.csv", self.raw)
+        zip_io.seek(0)
+
+        dest = os.path.join(self.tmpdir.name, "upload.csv")
+        result = ingest_upload(zip_io, "dump.zip", dest)
+
+        self.assertEqual(result.filename, "inner.csv")
+        self.assertEqual(result.sha256, hashlib.sha256(self.raw).hexdigest())
+        self.assertEqual(result.parser.templates, self.parse_reference().templates)
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ["reference.csv", "upload.csv"])
+
+    def test_ingest_zip_without_csv(self):
+        zip_io = io.BytesIO()
+        with zipfile.ZipFile(zip_io, mode='w') as z:
+            z.writestr("readme.txt", "nothing here")
+        zip_io.seek(0)
+
+        dest = os.path.join(self.tmpdir.name, "upload.csv")
+        with self.assertRaises(UploadError):
+            ingest_upload(zip_io, "dump.zip", dest)
+        self.assertFalse(os.path.exists(dest))
+
+if __name__ == '__main__':
+    unittest.main()
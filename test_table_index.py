@@ -0,0 +1,112 @@
+import re
+import time
+import unittest
+
+from table_index import TableIndex
+
+COLUMNS = ("Tag", "ShortDesc", "Template")
+
+
+def make_rows(count):
+    return [(f"T{i % 7:02d}_Tag{i:06d}", f"Pump {i} running", f"$Template{i % 7:02d}") for i in range(count)]
+
+
+class TestTableIndex(unittest.TestCase):
+    def setUp(self):
+        self.rows = make_rows(2000) + [("Motor_01", "Straße\nline two", "$Motor")]
+        self.index = TableIndex(self.rows, COLUMNS)
+
+    def brute(self, predicate, column=None):
+        columns = range(len(COLUMNS)) if column is None else [COLUMNS.index(column)]
+        return [i for i, row in enumerate(self.rows) if any(predicate(row[c].casefold()) for c in columns)]
+
+    def check_all_modes(self):
+        for query in ("tag0012", "TAG00", "running", "ng 19", "strasse", "02", "zz"):
+            needle = query.casefold()
+            self.assertEqual(self.index.search(query), self.brute(lambda v: needle in v), query)
+            self.assertEqual(self.index.search(query, "prefix"), self.brute(lambda v: v.startswith(needle)), query)
+            self.assertEqual(
+                self.index.search(query, "contains", "Template"),
+                self.brute(lambda v: needle in v, "Template"), query
+            )
+        pattern = re.compile(r"^pump 1\d running$", re.IGNORECASE)
+        self.assertEqual(self.index.search(pattern.pattern, "regex"), self.brute(pattern.search))
+
+    def test_matches_brute_force_before_and_after_trigrams(self):
+        self.check_all_modes()
+        self.assertTrue(self.index.build_trigrams())
+        self.check_all_modes()
+
+    def test_typing_narrows(self):
+        self.index.build_trigrams()
+        found = None
+        for typed in ("t", "t0", "t01", "t01_", "t01_tag0001"):
+            found = self.index.search(typed)
+            self.assertEqual(found, self.brute(lambda v: typed in v), typed)
+        # Deleting characters widens the result again
+        self.assertEqual(len(self.index.search("tag0000")), 100)
+        self.assertEqual(self.index.search(""), list(range(len(self.rows))))
+
+    def test_values_are_matched_separately(self):
+        # A line break inside a value is a space, not a column boundary
+        self.assertEqual(self.index.search("line two", "prefix"), [])
+        self.assertEqual(self.index.search(r"\$motor", "regex"), [2000])
+        self.assertEqual(self.index.search("running\n$", "contains"), [])
+        self.assertEqual(self.index.search("^\\$motor$", "regex", "Template"), [2000])
+
+    def test_regex_sees_one_value_at_a_time(self):
+        motor = len(self.rows) - 1
+        # Anchors and lookbehind hold at the start of any value, not just the row's or block's
+        self.assertEqual(self.index.search(r"\A\$motor\Z", "regex"), [motor])
+        self.assertEqual(self.index.search(r"^strasse", "regex"), [motor])
+        self.assertEqual(self.index.search(r"(?<![a-z])\$motor", "regex"), [motor])
+        self.assertEqual(self.index.search(r"\Apump 1999 ", "regex"), [1999])
+        # \s and lookbehind never reach into the neighbouring column
+        self.assertEqual(self.index.search(r"two\s+\$motor", "regex"), [])
+        self.assertEqual(self.index.search(r"(?<=two\s)\$motor", "regex"), [])
+        self.assertEqual(self.index.search(r"running\s", "regex"), [])
+
+    def test_update_row_in_place(self):
+        building = TableIndex(list(self.rows), COLUMNS)
+        self.index.build_trigrams()
+        self.index.search("pump 12")
+        for index in (self.index, building):
+            i = index.find(("$Template05", "T05_Tag000012"), ("Template", "Tag"))
+            self.assertEqual(i, 12)
+            index.update_row(i, ("T05_Tag000012", "Valve 12 closed", "$Template05"))
+        # Updated while the trigram index was not built yet
+        self.assertTrue(building.build_trigrams())
+
+        for index in (self.index, building):
+            self.assertEqual(index.rows[12][1], "Valve 12 closed")
+            self.assertEqual(index.search("valve"), [12])
+            self.assertNotIn(12, index.search("pump 12"))
+            self.assertEqual(index.search("valve 1", "prefix", "ShortDesc"), [12])
+            self.assertEqual(index.search("pump 12", "prefix", "ShortDesc"), [120, 121, 122, 123, 124, 125, 126, 127, 128, 129] + list(range(1200, 1300)))
+            self.assertEqual(index.search("$template05", "prefix", "Template"), self.brute(lambda v: v == "$template05", "Template"))
+        self.assertIsNone(self.index.find(("$Template05", "Nope"), ("Template", "Tag")))
+
+    def test_errors(self):
+        with self.assertRaises(re.error):
+            self.index.search("([", "regex")
+        with self.assertRaises(ValueError):
+            self.index.search("x", "fuzzy")
+
+    def test_keystrokes_on_large_table(self):
+        index = TableIndex(make_rows(200000), COLUMNS)
+        index.build_trigrams()
+        for mode, typed in (("contains", "pump 1234"), ("prefix", "t03_tag01"), ("contains", "$template0")):
+            for end in range(1, len(typed) + 1):
+                start = time.perf_counter()
+                index.search(typed[:end], mode)
+                self.assertLess(time.perf_counter() - start, 0.1, typed[:end])
+
+    def test_close_stops_build(self):
+        self.index.close()
+        self.assertFalse(self.index.build_trigrams())
+        # Searching still works without the trigram index
+        self.assertEqual(len(self.index.search("pump 199")), 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import threading
+import time
+import unittest
+
+from main_gui import TaskCancelled, TaskRunner
+
+
+class FakeRoot:
+    """Stands in for tk.Tk: after() callbacks run when pump() is called, on the test thread."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def pump(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            callbacks, self.pending = self.pending, []
+            for callback in callbacks:
+                callback()
+            time.sleep(0.01)
+
+
+class TestTaskRunner(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.events = []
+        self.idle = []
+        self.runner = TaskRunner(self.root, on_progress=self.events.append, on_idle=lambda: self.idle.append(True))
+
+    def test_result_and_progress_arrive_on_main_thread(self):
+        main_thread = threading.current_thread()
+        results = []
+
+        def work(progress):
+            progress.begin("count", total_rows=2048)
+            progress.interval = 0
+            for _ in range(2048):
+                progress.row()
+            return threading.current_thread() is main_thread
+
+        def done(ran_on_main):
+            results.append((ran_on_main, threading.current_thread() is main_thread))
+
+        self.assertTrue(self.runner.run("Counting", work, done))
+        self.assertFalse(self.runner.run("Other", work, done))
+        self.root.pump()
+
+        self.assertEqual(results, [(False, True)])
+        self.assertTrue(self.events)
+        self.assertEqual(self.events[-1]["TotalRows"], 2048)
+        self.assertEqual(self.idle, [True])
+        self.assertFalse(self.runner.busy)
+
+    def test_cancel_stops_the_loop(self):
+        started = threading.Event()
+        errors = []
+        rows = []
+
+        def work(progress):
+            progress.begin("endless")
+            started.set()
+            while True:
+                progress.row()
+                rows.append(1)
+
+        self.runner.run("Endless", work, on_error=errors.append)
+        started.wait(5)
+        self.runner.cancel()
+        self.root.pump()
+
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], TaskCancelled)
+        self.assertFalse(self.runner.busy)
+
+    def test_errors_are_reported(self):
+        errors = []
+
+        def work(progress):
+            raise ValueError("bad file")
+
+        self.runner.run("Failing", work, on_error=errors.append)
+        self.root.pump()
+        self.assertEqual(str(errors[0]), "bad file")
+        # The runner is free for the next task
+        self.assertTrue(self.runner.run("Next", lambda progress: 1))
+        self.root.pump()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import tkinter as tk
+import unittest
+
+from virtual_table import VirtualTable
+
+
+class TestVirtualTable(unittest.TestCase):
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError:
+            raise unittest.SkipTest("No display")
+        self.root.geometry("600x400")
+        self.table = VirtualTable(self.root, ("Tag", "Value"))
+        self.table.pack(fill=tk.BOTH, expand=True)
+        self.root.update()
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def shown(self):
+        return [tuple(self.table.tree.item(i)["values"]) for i in self.table.tree.get_children()]
+
+    def test_only_the_window_is_materialized(self):
+        rows = [(f"Tag{i:06d}", f"V{i}") for i in range(300000)]
+        self.table.set_rows(rows)
+        self.root.update()
+
+        visible = self.table.visible_rows()
+        self.assertLessEqual(len(self.table.tree.get_children()), visible + VirtualTable.BUFFER)
+        self.assertEqual(self.shown()[0], ("Tag000000", "V0"))
+
+        self.table.yview("moveto", 0.5)
+        self.assertEqual(self.shown()[0], rows[150000])
+        self.table.yview("scroll", 1, "pages")
+        self.assertEqual(self.table.top, 150000 + visible)
+
+        self.table.scroll_to(len(rows))
+        self.assertEqual(self.shown()[-1], rows[-1])
+
+    def test_selection_follows_rows(self):
+        self.table.set_rows([(f"Tag{i}", "") for i in range(1000)])
+        self.root.update()
+        self.table.tree.selection_set(self.table.tree.get_children()[2])
+        self.root.update()
+        self.assertEqual(self.table.selected, {2})
+
+        self.table.scroll_to(500)
+        self.root.update()
+        self.assertEqual(self.table.tree.selection(), ())
+        self.assertEqual(self.table.selected_rows(), [("Tag2", "")])
+
+    def test_short_list(self):
+        self.table.set_rows([("A", "1"), ("B", "2")])
+        self.root.update()
+        self.assertEqual(self.shown(), [("A", 1), ("B", 2)])
+        self.table.set_rows([])
+        self.assertEqual(self.shown(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import threading
+import time
+import unittest
+
+from web_app.backend.warmup import WarmupCancelled, WarmupQueue
+
+
+def wait_idle(queue, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.status()
+        if not status["warmup_queued"] and not status["warmup_running"]:
+            return
+        time.sleep(0.01)
+    raise AssertionError("warm-ups did not finish")
+
+
+class TestWarmup(unittest.TestCase):
+    def test_runs_steps_in_order_and_stops_on_false(self):
+        calls = []
+
+        def run_step(key, step):
+            calls.append((key, step))
+            return step != "tags"
+
+        queue = WarmupQueue(run_step)
+        self.assertTrue(queue.submit("s1", ["model", "tags", "plcio"]))
+        wait_idle(queue)
+        self.assertEqual(calls, [("s1", "model"), ("s1", "tags")])
+        self.assertEqual(queue.counters["completed"], 1)
+
+    def test_concurrency_limit_and_cancel(self):
+        release = threading.Event()
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def run_step(key, step):
+            with lock:
+                running.append(key)
+                peak.append(len(running))
+            release.wait(5)
+            with lock:
+                running.remove(key)
+
+        queue = WarmupQueue(run_step, concurrency=2)
+        for key in ("a", "b", "c", "d"):
+            queue.submit(key, ["model", "tags"])
+        self.assertFalse(queue.submit("a", ["model"]))
+        time.sleep(0.1)
+        # "c" and "d" are still queued; "a" is cancelled before its second step
+        self.assertTrue(queue.cancel("c"))
+        self.assertTrue(queue.cancel("a"))
+        release.set()
+        wait_idle(queue)
+
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(queue.counters, {"completed": 2, "cancelled": 2, "failed": 0})
+
+    def test_waits_while_busy_and_survives_errors(self):
+        busy = threading.Event()
+        busy.set()
+        calls = []
+
+        def run_step(key, step):
+            calls.append(step)
+            raise RuntimeError("boom")
+
+        queue = WarmupQueue(run_step, busy=busy.is_set, busy_poll=0.01)
+        queue.submit("s1", ["model", "tags"])
+        time.sleep(0.1)
+        self.assertEqual(calls, [])
+        with self.assertLogs("web_app.backend.warmup", "WARNING"):
+            busy.clear()
+            wait_idle(queue)
+        self.assertEqual(calls, ["model"])
+        self.assertEqual(queue.counters["failed"], 1)
+
+    def test_step_cancelling_is_not_a_failure(self):
+        calls = []
+
+        def run_step(key, step):
+            calls.append(step)
+            if step == "tags":
+                # The session was dropped while the step ran
+                raise WarmupCancelled(key)
+
+        queue = WarmupQueue(run_step)
+        with self.assertNoLogs("web_app.backend.warmup"):
+            queue.submit("s1", ["model", "tags", "plcio"])
+            wait_idle(queue)
+        self.assertEqual(calls, ["model", "tags"])
+        self.assertEqual(queue.counters, {"completed": 0, "cancelled": 1, "failed": 0})
+
+    def test_disabled(self):
+        queue = WarmupQueue(lambda key, step: None, concurrency=0)
+        self.assertFalse(queue.submit("s1", ["model"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
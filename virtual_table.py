@@ -0,0 +1,279 @@
+import re
+import threading
+from bisect import bisect_left
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTable:
+    """
+    A ttk.Treeview over a Python list of rows that never inserts the whole
+    list: only the rows in view (plus BUFFER) exist as Tk items, and
+    scrolling rewrites their values. Loading 300k rows is one list
+    assignment; Tk memory and redraw cost depend on the window height only.
+
+    The Treeview itself never scrolls. The scrollbar, mouse wheel and
+    navigation keys move `top`, the index of the first row shown. Selection
+    is kept by row index, so it follows the rows rather than the reused items.
+    """
+    BUFFER = 1          # Partly visible row at the bottom
+    WHEEL_ROWS = 3      # Rows per mouse wheel notch
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, parent, columns, headings=None, widths=None):
+        self.columns = tuple(columns)
+        self.frame = tk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=self.columns, show="headings", selectmode="extended")
+        for col in self.columns:
+            self.tree.heading(col, text=(headings or {}).get(col, col))
+            if widths and col in widths:
+                self.tree.column(col, width=widths[col])
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.rows = []
+        self.top = 0
+        self.selected = set()   # Selected row indexes
+        self._items = []        # Item ids in view order; item i shows rows[top + i]
+        self._row_height = None
+        self._header_height = 0
+
+        self.tree.bind("<Configure>", lambda e: self.refresh())
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_rows(-self.WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_rows(self.WHEEL_ROWS))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        for key, move in (("<Up>", -1), ("<Down>", 1)):
+            self.tree.bind(key, lambda e, move=move: self._move_focus(move))
+        self.tree.bind("<Prior>", lambda e: self._scroll_rows(-self.visible_rows()))
+        self.tree.bind("<Next>", lambda e: self._scroll_rows(self.visible_rows()))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(len(self.rows)))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_rows(self, rows):
+        """Shows rows (a list of tuples, one value per column) from the top."""
+        self.rows = rows
+        self.top = 0
+        self.selected = set()
+        self.refresh()
+
+    def row_at(self, item):
+        """Row index shown by a Treeview item, or None."""
+        try:
+            index = self.top + self._items.index(item)
+        except ValueError:
+            return None
+        return index if index < len(self.rows) else None
+
+    def selected_rows(self):
+        return [self.rows[i] for i in sorted(self.selected) if i < len(self.rows)]
+
+    # Window geometry
+
+    def visible_rows(self):
+        height = self.tree.winfo_height()
+        if self._row_height is None and self._items:
+            # Measured from a real item: depends on the font and theme
+            bbox = self.tree.bbox(self._items[0])
+            if bbox:
+                self._header_height = bbox[1]
+                self._row_height = bbox[3]
+        row_height = self._row_height or self.DEFAULT_ROW_HEIGHT
+        return max(1, (height - self._header_height) // row_height)
+
+    def _max_top(self):
+        return max(0, len(self.rows) - self.visible_rows())
+
+    # Scrolling
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units" | "pages")."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = self.visible_rows() if args[2] == "pages" else 1
+            self._scroll_rows(int(args[1]) * step)
+
+    def scroll_to(self, top):
+        top = max(0, min(top, self._max_top()))
+        if top != self.top:
+            self.top = top
+            self.refresh()
+        return "break"
+
+    def see(self, index):
+        """Scrolls so that row index is in view."""
+        visible = self.visible_rows()
+        if index < self.top:
+            self.scroll_to(index)
+        elif index >= self.top + visible:
+            self.scroll_to(index - visible + 1)
+
+    def _scroll_rows(self, amount):
+        return self.scroll_to(self.top + amount)
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        notches = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self._scroll_rows(-notches * self.WHEEL_ROWS)
+
+    def _move_focus(self, move):
+        if not self.rows:
+            return "break"
+        focus = self.row_at(self.tree.focus())
+        index = max(0, min((self.top if focus is None else focus + move), len(self.rows) - 1))
+        self.selected = {index}
+        self.see(index)
+        self.refresh()
+        self.tree.focus(self._items[index - self.top])
+        return "break"
+
+    def _on_select(self, event):
+        shown = {self.top + i for i in range(len(self._items))}
+        picked = {self.row_at(item) for item in self.tree.selection()}
+        # Rows outside the window keep their selection state
+        self.selected = (self.selected - shown) | (picked - {None})
+
+        # Clicking the partly visible last row makes the Treeview scroll
+        # itself; move the window instead
+        first = self.tree.yview()[0]
+        if first > 0:
+            self.tree.yview_moveto(0)
+            self._scroll_rows(round(first * len(self._items)))
+
+    # Drawing
+
+    def refresh(self):
+        """Rewrites the items in view from rows[top:]. Cheap: a few dozen item updates."""
+        self.top = max(0, min(self.top, self._max_top()))
+        count = min(self.visible_rows() + self.BUFFER, len(self.rows) - self.top)
+
+        while len(self._items) < count:
+            self._items.append(self.tree.insert("", tk.END, values=()))
+        while len(self._items) > count:
+            self.tree.delete(self._items.pop())
+
+        for i, item in enumerate(self._items):
+            self.tree.item(item, values=self.rows[self.top + i])
+
+        # The <<TreeviewSelect>> this causes maps back to the same self.selected
+        self.tree.selection_set([item for i, item in enumerate(self._items) if self.top + i in self.selected])
+        self.tree.yview_moveto(0)
+
+        total = len(self.rows)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows()) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+class FilterBar:
+    """
+    Filter box for a VirtualTable: the table shows the rows of a TableIndex
+    that match the query, re-filtered DELAY_MS after the last keystroke so
+    that fast typing runs one search, not one per key.
+    """
+    DELAY_MS = 150
+    MODES = (("Contains", "contains"), ("Starts with", "prefix"), ("Regex", "regex"))
+    ALL_COLUMNS = "All columns"
+
+    def __init__(self, parent, table):
+        self.table = table
+        self.index = None
+        self.matches = None     # Row indexes shown, None while unfiltered
+        self._pending = None    # after() id of the scheduled search
+
+        self.frame = tk.Frame(parent)
+        tk.Label(self.frame, text="Filter:").pack(side=tk.LEFT)
+        self.query = tk.StringVar()
+        self.entry = ttk.Entry(self.frame, textvariable=self.query, width=40)
+        self.entry.pack(side=tk.LEFT, padx=5)
+
+        self.mode = ttk.Combobox(self.frame, values=[label for label, _ in self.MODES], state="readonly", width=11)
+        self.mode.current(0)
+        self.mode.pack(side=tk.LEFT, padx=5)
+
+        self._columns = {table.tree.heading(col)["text"]: col for col in table.columns}
+        self.column = ttk.Combobox(self.frame, values=[self.ALL_COLUMNS, *self._columns], state="readonly", width=16)
+        self.column.current(0)
+        self.column.pack(side=tk.LEFT, padx=5)
+
+        self.count_var = tk.StringVar()
+        tk.Label(self.frame, textvariable=self.count_var, fg="gray").pack(side=tk.LEFT, padx=5)
+
+        self.query.trace_add("write", lambda *args: self.schedule())
+        self.mode.bind("<<ComboboxSelected>>", lambda e: self.apply())
+        self.column.bind("<<ComboboxSelected>>", lambda e: self.apply())
+        self.entry.bind("<Return>", lambda e: self.apply())
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_index(self, index):
+        """Shows the rows of a new TableIndex, filtered by the current query."""
+        if self.index is not None:
+            self.index.close()
+        self.index = index
+        threading.Thread(target=index.build_trigrams, name="trigrams", daemon=True).start()
+        self.apply()
+
+    def update_rows(self, changes):
+        """
+        Applies (row index, new row) pairs to the index and redraws the rows
+        in view. The filter is not re-run: edited rows stay where they are
+        until the next search.
+        """
+        for i, row in changes:
+            self.index.update_row(i, row)
+            if self.matches is not None:
+                pos = bisect_left(self.matches, i)
+                if pos < len(self.matches) and self.matches[pos] == i:
+                    self.table.rows[pos] = row
+        # Unfiltered, the table shows the index's own list
+        self.table.refresh()
+
+    def shown_rows(self):
+        """(count, iterator) over the rows the table shows, read from the index rather than from Tk."""
+        if self.index is None:
+            return 0, iter(())
+        rows = self.index.rows
+        if self.matches is None:
+            return len(rows), iter(rows)
+        matches = self.matches
+        return len(matches), (rows[i] for i in matches)
+
+    def schedule(self):
+        if self._pending is not None:
+            self.frame.after_cancel(self._pending)
+        self._pending = self.frame.after(self.DELAY_MS, self.apply)
+
+    def apply(self):
+        if self._pending is not None:
+            self.frame.after_cancel(self._pending)
+            self._pending = None
+        if self.index is None:
+            return
+        rows = self.index.rows
+        query = self.query.get()
+        if not query:
+            self.matches = None
+            self.table.set_rows(rows)
+            self.count_var.set(f"{len(rows)} rows")
+            return
+
+        mode = dict(self.MODES)[self.mode.get()]
+        column = self._columns.get(self.column.get())
+        try:
+            self.matches = self.index.search(query, mode, column)
+        except re.error as e:
+            self.count_var.set(f"Invalid pattern: {e}")
+            return
+        self.table.set_rows([rows[i] for i in self.matches])
+        self.count_var.set(f"{len(self.matches)} of {len(rows)} rows")
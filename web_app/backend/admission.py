@@ -0,0 +1,234 @@
+import codecs
+import threading
+import time
+
+# How a model is held once admitted
+MEMORY = "memory"  # Fully parsed line lists
+DISK = "disk"      # Sections decoded from the memory-mapped snapshot on access
+
+# Rough CPython costs behind the estimates: a str object per line plus its
+# slot in the template list, and the extra bytes of lines holding characters
+# outside Latin-1 (stored with 2 bytes per character)
+LINE_OVERHEAD = 64
+WIDE_CHAR_COST = 3
+SECTION_OVERHEAD = 1024
+
+SCAN_CHUNK_SIZE = 1024 * 1024
+TEMPLATE_MARKER = ":TEMPLATE="
+
+
+class AdmissionRejected(Exception):
+    """Raised when a model does not fit in the memory budget within the queue timeout."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds, for the Retry-After header
+
+
+def _section_cost(rows, chars, wide_chars):
+    return chars + wide_chars * WIDE_CHAR_COST + rows * LINE_OVERHEAD + SECTION_OVERHEAD
+
+
+class DumpScan:
+    """Line and character counts of a dump, per section, from scan_dump() or a snapshot index."""
+
+    def __init__(self, size=0):
+        self.size = size  # Dump size in bytes
+        # { template_name or None (headers): [rows, chars, wide_chars] }
+        self.sections = {None: [0, 0, 0]}
+
+    @classmethod
+    def from_snapshot_index(cls, index, size):
+        scan = cls(size)
+        for name, offset, length, *rows in index["sections"]:
+            # UTF-8 lengths stand in for character counts; older snapshots
+            # have no row counts, assume short lines
+            scan.sections[name] = [rows[0] if rows else length // 32, length, 0]
+        return scan
+
+    @classmethod
+    def from_size(cls, size, encoding="utf-16"):
+        """
+        Estimate for a dump known only by its size (e.g. a chunked upload
+        before its data arrives): short lines, so the estimate errs high.
+        """
+        scan = cls(size)
+        chars = size // 2 if encoding.lower().startswith("utf-16") else size
+        scan.sections[None] = [chars // LINE_OVERHEAD, chars, 0]
+        return scan
+
+    @property
+    def rows(self):
+        return sum(s[0] for s in self.sections.values())
+
+    def memory_estimate(self):
+        """Bytes needed to hold the whole parsed model."""
+        return sum(_section_cost(*s) for s in self.sections.values())
+
+    def disk_estimate(self):
+        """Bytes needed in disk-backed mode: the headers plus the largest templates kept decoded."""
+        from .snapshot import SnapshotSections
+        templates = sorted((_section_cost(*s) for n, s in self.sections.items() if n is not None), reverse=True)
+        return (
+            _section_cost(*self.sections[None])
+            + sum(templates[:SnapshotSections.CACHE_SIZE])
+            + SECTION_OVERHEAD * len(templates)
+        )
+
+
+def _count(stats, text, start, end):
+    if start >= end:
+        return
+    segment = text[start:end]
+    stats[0] += segment.count("\n")
+    stats[1] += len(segment)
+    if not segment.isascii():
+        stats[2] += len(segment) - len(segment.encode("latin-1", "ignore"))
+
+
+def _template_lines(text):
+    """
+    Yields (line_start, template_name) for the :TEMPLATE= lines of text, with
+    the rule of AvevaParser._consume_line (the stripped line starts with the
+    marker). str.find() is used rather than a multiline regex, which costs
+    several times more than decoding the chunk.
+    """
+    position = text.find(TEMPLATE_MARKER)
+    while position >= 0:
+        line_start = text.rfind("\n", 0, position) + 1
+        if not text[line_start:position].strip():
+            line_end = text.find("\n", position)
+            if line_end < 0:
+                line_end = len(text)
+            yield line_start, text[position + len(TEMPLATE_MARKER):line_end].strip().split("=")[0]
+        position = text.find(TEMPLATE_MARKER, position + 1)
+
+
+def scan_dump(src, encoding="utf-16", progress=None, chunk_size=SCAN_CHUNK_SIZE):
+    """
+    Counts the lines and characters of every template section of a dump,
+    reading src (a binary file object) to the end without building the model.
+    It works on whole decoded chunks instead of lines, so it costs a fraction
+    of a parse. Line counts assume LF or CRLF line endings.
+    """
+    scan = DumpScan()
+    decoder = codecs.getincrementaldecoder(encoding)()
+    current = scan.sections[None]
+    pending = ""
+    if progress:
+        progress.begin("scan")
+
+    while True:
+        chunk = src.read(chunk_size)
+        final = not chunk
+        scan.size += len(chunk)
+        if progress:
+            progress.add_bytes(len(chunk))
+        text = pending + decoder.decode(chunk, final)
+        if final:
+            pending = ""
+        else:
+            # Only whole lines are searched; the rest waits for the next chunk
+            cut = text.rfind("\n") + 1
+            pending = text[cut:]
+            text = text[:cut]
+
+        position = 0
+        for line_start, name in _template_lines(text):
+            _count(current, text, position, line_start)
+            # A repeated template replaces the earlier one, as in the parser
+            current = scan.sections[name] = [0, 0, 0]
+            position = line_start
+        _count(current, text, position, len(text))
+        if final:
+            break
+
+    # An unterminated last line is still a line
+    if text and not text.endswith("\n"):
+        current[0] += 1
+    if progress:
+        progress.finish()
+    return scan
+
+
+class MemoryBudget:
+    """
+    Admission control for the models a worker process holds in memory.
+    admit(scan) reserves the estimated cost of a model and decides how to hold it:
+      - MEMORY when the full model is under max_model and fits in the budget
+      - DISK (sections decoded from the snapshot on access) when the full
+        model is over max_model, or the budget only has room for that
+      - otherwise the request waits up to queue_timeout for models to be
+        released, then AdmissionRejected is raised.
+    evict(amount), if given, is asked to release idle models (through
+    release()) before a request degrades to DISK or waits.
+    Every reservation must be given back with release(cost).
+    """
+
+    def __init__(self, limit, max_model=None, queue_timeout=30.0, evict=None):
+        self.limit = limit
+        self.max_model = limit if max_model is None else min(max_model, limit)
+        self.queue_timeout = queue_timeout
+        self.evict = evict
+        self.used = 0
+        self.waiting = 0
+        # Reentrant: evict() releases reservations while admit() holds the lock
+        self._cond = threading.Condition(threading.RLock())
+        self.counters = {"admitted_memory": 0, "admitted_disk": 0, "queued": 0, "rejected": 0}
+
+    def _take(self, cost, mode):
+        self.used += cost
+        self.counters[f"admitted_{mode}"] += 1
+        return mode, cost
+
+    def _fits(self, cost):
+        if self.used + cost <= self.limit:
+            return True
+        if self.evict is not None:
+            self.evict(self.used + cost - self.limit)
+        return self.used + cost <= self.limit
+
+    def admit(self, scan, wait=True):
+        """Returns (mode, reserved_bytes). With wait=False it never queues."""
+        memory_cost = scan.memory_estimate()
+        disk_cost = min(scan.disk_estimate(), memory_cost)
+        deadline = time.monotonic() + self.queue_timeout
+        queued = False
+
+        with self._cond:
+            while True:
+                if memory_cost <= self.max_model and self._fits(memory_cost):
+                    return self._take(memory_cost, MEMORY)
+                if self._fits(disk_cost):
+                    return self._take(disk_cost, DISK)
+
+                remaining = deadline - time.monotonic()
+                if not wait or disk_cost > self.limit or remaining <= 0:
+                    self.counters["rejected"] += 1
+                    raise AdmissionRejected(
+                        f"Not enough memory to load this dump (needs about {disk_cost // (1024 * 1024) + 1} MB); try again later",
+                        retry_after=max(1, round(self.queue_timeout)),
+                    )
+                if not queued:
+                    queued = True
+                    self.counters["queued"] += 1
+                self.waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+    def release(self, cost):
+        with self._cond:
+            self.used = max(0, self.used - cost)
+            self._cond.notify_all()
+
+    def status(self):
+        with self._cond:
+            return {
+                "memory_budget_bytes": self.limit,
+                "memory_reserved_bytes": self.used,
+                "max_model_bytes": self.max_model,
+                "admission_waiting": self.waiting,
+                **self.counters,
+            }
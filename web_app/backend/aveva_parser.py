@@ -1,12 +1,99 @@
+import codecs
 import csv
+import itertools
 import os
+import time
+
+# Numbers each parse, so caches built on the data can tell two loads apart
+_generations = itertools.count(1)
+
+class ProgressReporter:
+    """
+    Progress hook for long loops (parsing, extension analysis).
+    Loops call row() per item and section() per template; callback(event) is
+    only invoked every `interval` seconds. The clock is read once every
+    CHECK_EVERY rows, so reporting costs a counter increment per row.
+    event: {Operation, Template, Rows, TotalRows, Bytes, TotalBytes,
+            RowsPerSecond, Elapsed, Finished}
+    """
+    CHECK_EVERY = 512
+
+    def __init__(self, callback=None, interval=0.5):
+        self.callback = callback
+        self.interval = interval
+        self.begin("")
+
+    def begin(self, operation, total_rows=None, total_bytes=None, position=None):
+        """
+        Starts a new operation. position, if given, is a callable returning
+        the bytes processed so far; it is only called when an event is sent.
+        """
+        self.operation = operation
+        self.template = None
+        self.rows = 0
+        self.total_rows = total_rows
+        self.bytes = 0
+        self.total_bytes = total_bytes
+        self.position = position
+        self.started = time.monotonic()
+        self._last_sent = self.started
+        self._countdown = self.CHECK_EVERY
+
+    def row(self):
+        self.rows += 1
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._countdown = self.CHECK_EVERY
+            self._maybe_send()
+
+    def advance(self, rows):
+        """Batched form of row(), for loops that count rows themselves."""
+        self.rows += rows
+        self._maybe_send()
+
+    def section(self, template):
+        self.template = template
+        self._maybe_send()
+
+    def add_bytes(self, count):
+        self.bytes += count
+
+    def finish(self):
+        if self.callback:
+            self.callback(self.event(finished=True))
+
+    def _maybe_send(self):
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        if now - self._last_sent >= self.interval:
+            self._last_sent = now
+            self.callback(self.event())
+
+    def event(self, finished=False):
+        elapsed = time.monotonic() - self.started
+        done_bytes = self.position() if self.position else self.bytes
+        return {
+            "Operation": self.operation,
+            "Template": self.template,
+            "Rows": self.rows,
+            "TotalRows": self.total_rows,
+            "Bytes": done_bytes,
+            "TotalBytes": self.total_bytes,
+            "RowsPerSecond": round(self.rows / elapsed) if elapsed > 0 else 0,
+            "Elapsed": round(elapsed, 3),
+            "Finished": finished
+        }
 
 class AvevaParser:
-    def __init__(self, filepath):
+    def __init__(self, filepath, progress=None):
         self.filepath = filepath
         self.templates = {}  # {template_name: [lines]}
         self.headers = []    # File headers (comments, etc.) before the first template
         self.encoding = 'utf-16' # Default for Aveva dumps often
+        self.progress = progress # Optional ProgressReporter
+        self.column_edits = {}   # {(template_name, column_name): values changed}, for caches built on the data
+        self.generation = 0      # Changes whenever the templates are parsed again
 
     def parse(self):
         """aryses the file and identifies sections."""
@@ -16,29 +103,95 @@ class AvevaParser:
         # Basic encoding check or try-except block could be added, 
         # but defaulting to utf-16 as observed in user file.
         
-        current_template = None
+        self.begin_stream()
         
         try:
             with open(self.filepath, 'r', encoding=self.encoding) as f:
-                for line in f:
-                    stripped_line = line.strip()
-                    
-                    if stripped_line.startswith(':TEMPLATE='):
-                        # valid template line, e.g., :TEMPLATE=$Area
-                        current_template = stripped_line.split('=')[1]
-                        self.templates[current_template] = [line]
-                    elif current_template:
-                        # Add content to current template
-                        self.templates[current_template].append(line)
-                    else:
-                        # Header information before any template
-                        self.headers.append(line)
+                if self.progress:
+                    self._parse_with_progress(f)
+                else:
+                    for line in f:
+                        self._consume_line(line)
                         
         except UnicodeError:
             # Fallback or error reporting
             print("Encoding error. Please ensure the file is UTF-16.")
             raise
 
+    def _parse_with_progress(self, f):
+        progress = self.progress
+        # Bytes read so far; only queried when an event is sent
+        progress.begin("parse", total_bytes=os.path.getsize(self.filepath), position=f.buffer.tell)
+        batch = progress.CHECK_EVERY
+        count = 0
+        for line in f:
+            self._consume_line(line)
+            count += 1
+            if count == batch:
+                progress.advance(count)
+                count = 0
+        progress.advance(count)
+        progress.finish()
+
+    def begin_stream(self):
+        """Resets the parser so a dump can be fed to it chunk by chunk with feed()."""
+        self.templates = {}
+        self.headers = []
+        self.column_edits = {}
+        self.generation = next(_generations)
+        self._current_template = None
+        self._decoder = codecs.getincrementaldecoder(self.encoding)()
+        self._pending = ""
+
+    def feed(self, data):
+        """Scans a chunk of raw (encoded) bytes. Partial lines are carried over to the next chunk."""
+        if self.progress:
+            self.progress.add_bytes(len(data))
+        self._feed_text(self._decoder.decode(data))
+
+    def end_stream(self):
+        """Flushes the decoder and the last (unterminated) line."""
+        self._feed_text(self._decoder.decode(b"", True), final=True)
+
+    def _feed_text(self, text, final=False):
+        text = self._pending + text
+        self._pending = ""
+        # Hold back a trailing CR: it may be the first half of a CRLF split across chunks
+        if not final and text.endswith('\r'):
+            self._pending = '\r'
+            text = text[:-1]
+        # Same universal newline translation as reading the file in text mode
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        
+        parts = text.split('\n')
+        last = parts.pop()
+        for part in parts:
+            self._consume_line(part + '\n')
+        if self.progress:
+            self.progress.advance(len(parts))
+        
+        if final:
+            if last:
+                self._consume_line(last)
+        else:
+            self._pending = last + self._pending
+
+    def _consume_line(self, line):
+        stripped_line = line.strip()
+        
+        if stripped_line.startswith(':TEMPLATE='):
+            # valid template line, e.g., :TEMPLATE=$Area
+            self._current_template = stripped_line.split('=')[1]
+            self.templates[self._current_template] = [line]
+            if self.progress:
+                self.progress.section(self._current_template)
+        elif self._current_template:
+            # Add content to current template
+            self.templates[self._current_template].append(line)
+        else:
+            # Header information before any template
+            self.headers.append(line)
+
     def get_template_names(self):
         return list(self.templates.keys())
 
@@ -124,9 +277,109 @@ class AvevaParser:
                 writer = csv.writer(output, lineterminator='\n') # Use \n to match expected
                 writer.writerow(row)
                 lines[i] = output.getvalue()
+                self._count_edit(template_name, column_name)
                 return True
         return False
 
+    def update_tag_values(self, edits):
+        """
+        Applies a batch of edits in one indexed pass.
+        edits: iterable of (template_name, tagname, column_name, new_value).
+        Each template touched is scanned once to build a {tag: line index} map,
+        instead of one linear scan per edit as in update_tag_value.
+        Returns one dict per edit, in order:
+        {Template, Tag, Column, Value, OldValue, Status}
+        Status is "updated", "unchanged", "template_not_found",
+        "column_not_found" or "tag_not_found".
+        """
+        import io
+        results = []
+        tag_maps = {}  # { template: { tag: line index } }
+        
+        for template_name, tagname, column_name, new_value in edits:
+            result = {
+                "Template": template_name,
+                "Tag": tagname,
+                "Column": column_name,
+                "Value": new_value,
+                "OldValue": None,
+                "Status": "updated"
+            }
+            results.append(result)
+            
+            if template_name not in self.templates:
+                result["Status"] = "template_not_found"
+                continue
+                
+            col_idx = self.get_column_index(template_name, column_name)
+            tag_idx = self.get_column_index(template_name, "Tagname")
+            if col_idx == -1 or tag_idx == -1:
+                result["Status"] = "column_not_found"
+                continue
+            
+            lines = self.templates[template_name]
+            tag_map = tag_maps.get(template_name)
+            if tag_map is None:
+                tag_map = {}
+                # Same first-match semantics as update_tag_value. Lines are
+                # parsed one by one so indexes always match lines[]
+                for i in range(2, len(lines)):
+                    row = next(csv.reader([lines[i]]), [])
+                    if len(row) > tag_idx and row[tag_idx] not in tag_map:
+                        tag_map[row[tag_idx]] = i
+                tag_maps[template_name] = tag_map
+                
+            i = tag_map.get(tagname)
+            if i is None:
+                result["Status"] = "tag_not_found"
+                continue
+                
+            row = next(csv.reader([lines[i]]))
+            if len(row) <= col_idx:
+                row.extend([""] * (col_idx - len(row) + 1))
+                
+            result["OldValue"] = row[col_idx]
+            if row[col_idx] == new_value:
+                result["Status"] = "unchanged"
+                continue
+                
+            row[col_idx] = new_value
+            output = io.StringIO()
+            writer = csv.writer(output, lineterminator='\n')
+            writer.writerow(row)
+            lines[i] = output.getvalue()
+            self._count_edit(template_name, column_name)
+            
+            if col_idx == tag_idx:
+                # Renamed tag: keep the index in step for later edits in the batch
+                del tag_map[tagname]
+                tag_map.setdefault(new_value, i)
+            
+        return results
+
+    def _count_edit(self, template_name, column_name):
+        key = (template_name, column_name)
+        self.column_edits[key] = self.column_edits.get(key, 0) + 1
+
+    def copy(self, writable_templates=()):
+        """
+        Returns a parser sharing line lists with this one. Templates listed in
+        writable_templates get their own list, so editing them in the copy leaves
+        this parser untouched.
+        """
+        clone = AvevaParser(self.filepath)
+        clone.encoding = self.encoding
+        clone.headers = self.headers
+        clone.column_edits = dict(self.column_edits)
+        clone.generation = self.generation
+        # templates may be a disk-backed mapping (snapshot.SnapshotSections); its
+        # copy() shares the mapped file instead of decoding every section
+        clone.templates = self.templates.copy()
+        for name in writable_templates:
+            if name in clone.templates:
+                clone.templates[name] = list(clone.templates[name])
+        return clone
+
     def get_all_tags_with_column(self, column_name):
         """Returns a list of dicts {Tag, Value, Template} for all tags having the column."""
         results = []
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+
+class BlobStore:
+    """
+    Content-addressed storage for uploaded dumps.
+    Every distinct dump is stored once as blobs/<sha256>.csv, no matter how many
+    sessions uploaded it. Reference counting lives in the session store (the
+    sessions pointing at a hash are its references); when the last one goes,
+    remove() deletes the blob, its snapshot and every artifact derived from it.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.artifact_dir = os.path.join(root, "artifacts")
+        self._lock = threading.Lock()
+
+    def ensure_dirs(self):
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.artifact_dir, exist_ok=True)
+
+    def blob_path(self, sha256):
+        return os.path.join(self.blob_dir, f"{sha256}.csv")
+
+    def snapshot_path(self, sha256):
+        return os.path.join(self.blob_dir, f"{sha256}.snap")
+
+    def edit_log_path(self, sha256, session_id):
+        """Edits a session made on top of the shared dump (see main.apply_edits)."""
+        return os.path.join(self.blob_dir, f"{sha256}.{session_id}.edits")
+
+    def staging_path(self):
+        """Returns a unique path to spool an upload to before its hash is known."""
+        return os.path.join(self.blob_dir, f"{uuid.uuid4().hex}.part")
+
+    def commit(self, staging_path, sha256):
+        """Moves a spooled upload to its content address. Duplicates are discarded."""
+        target = self.blob_path(sha256)
+        with self._lock:
+            if os.path.exists(target):
+                os.remove(staging_path)
+            else:
+                os.replace(staging_path, target)
+        return target
+
+    def remove(self, sha256):
+        """Deletes a dump and everything derived from it (snapshot, edit logs, artifacts)."""
+        paths = []
+        if os.path.isdir(self.blob_dir):
+            paths.extend(os.path.join(self.blob_dir, n) for n in os.listdir(self.blob_dir) if n.startswith(f"{sha256}."))
+        self._remove_paths(paths)
+        self.remove_artifacts(sha256)
+
+    def remove_artifacts(self, model_key):
+        """Deletes the artifacts of a model (a dump hash, or the key of a session's edited copy)."""
+        if os.path.isdir(self.artifact_dir):
+            self._remove_paths(
+                os.path.join(self.artifact_dir, n) for n in os.listdir(self.artifact_dir)
+                if n.startswith(f"{model_key}_") or n.startswith(f"{model_key}-")
+            )
+
+    def _remove_paths(self, paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def artifact_key(self, sha256, operation, params):
+        """
+        Identifies a derived file: dump content, operation and parameters.
+        params must already be normalized (e.g. sorted area list) so equal
+        requests map to the same key.
+        """
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        return f"{sha256}_{operation}_{digest}"
+
+    def artifact_file(self, artifact_key, filename):
+        return os.path.join(self.artifact_dir, f"{artifact_key}_{filename}")
+
+    def artifact_path(self, sha256, operation, params, filename):
+        """Path of a derived file, shared by every session on the same dump."""
+        return self.artifact_file(self.artifact_key(sha256, operation, params), filename)
@@ -0,0 +1,227 @@
+import base64
+import bisect
+import csv
+import hashlib
+import json
+import threading
+
+
+class CursorError(ValueError):
+    """Raised for cursors that are malformed or belong to a different query."""
+
+
+class Dataset:
+    """
+    Read-only table with the indexes needed for interactive browsing:
+      - per sort column, a sorted list of (folded value, value, row id) keys,
+        built on first use; prefix search and cursor seeks are bisects on it
+      - per filter column (template, area), a {value: [row ids]} group index
+    Numeric columns (counts) hold digit strings and sort by their value; a
+    prefix on them is a plain startswith filter, since matches are not
+    contiguous in numeric order.
+    Cursors are keyset based (the last key returned), so a page never repeats
+    or skips rows however deep the client has paged.
+    """
+
+    # Sorted key lists for filtered views, e.g. (Template=$Pump, sort=Tag)
+    MAX_CACHED_VIEWS = 32
+
+    def __init__(self, columns, rows, group_columns=(), numeric_columns=()):
+        self.columns = list(columns)
+        self.rows = rows  # list of tuples, one value per column
+        self._col = {name: i for i, name in enumerate(self.columns)}
+        self._numeric = {self._col[name] for name in numeric_columns}
+        self._lock = threading.Lock()
+        self._sorted = {}  # { column: [keys] }
+        self._views = {}   # { (column, filter_column, filter_value): [keys] }
+        self._groups = {}  # { column: { value: [row ids] } }
+        for name in group_columns:
+            idx = self._col[name]
+            groups = {}
+            for row_id, row in enumerate(rows):
+                groups.setdefault(row[idx], []).append(row_id)
+            self._groups[name] = groups
+
+    def has_column(self, name):
+        return name in self._col
+
+    def group_counts(self, column):
+        return {value: len(ids) for value, ids in self._groups[column].items()}
+
+    def _key(self, idx, row_id):
+        value = self.rows[row_id][idx]
+        if idx in self._numeric:
+            # Zero-padded so that "9" sorts before "10"
+            return (value.zfill(20), value, row_id)
+        return (value.casefold(), value, row_id)
+
+    def _sorted_keys(self, column, filters):
+        """Sorted keys for column, restricted to the most selective group filter if any."""
+        idx = self._col[column]
+        group_filters = [(c, v) for c, v in filters.items() if c in self._groups]
+        if not group_filters:
+            with self._lock:
+                keys = self._sorted.get(column)
+            if keys is None:
+                keys = sorted(self._key(idx, row_id) for row_id in range(len(self.rows)))
+                with self._lock:
+                    self._sorted[column] = keys
+            return keys
+
+        filter_column, filter_value = min(group_filters, key=lambda f: len(self._groups[f[0]].get(f[1], ())))
+        view = (column, filter_column, filter_value)
+        with self._lock:
+            keys = self._views.get(view)
+        if keys is None:
+            ids = self._groups[filter_column].get(filter_value, ())
+            keys = sorted(self._key(idx, row_id) for row_id in ids)
+            with self._lock:
+                if len(self._views) >= self.MAX_CACHED_VIEWS:
+                    self._views.pop(next(iter(self._views)))
+                self._views[view] = keys
+        return keys
+
+    def page(self, sort, descending=False, limit=100, cursor=None, prefix=None, contains=None, filters=None):
+        """
+        Returns (rows, next_cursor, total).
+        prefix matches the start of the sort column (case-insensitive, via bisect);
+        contains is a case-insensitive substring match on any column;
+        filters are exact matches, e.g. {"Template": "$Pump", "Area": "EPLC_1"}.
+        total is None when a substring filter (or a prefix on a numeric column)
+        would need a full scan to count.
+        """
+        if sort not in self._col:
+            raise KeyError(sort)
+        filters = {c: v for c, v in (filters or {}).items() if v is not None}
+        for column in filters:
+            if column not in self._col:
+                raise KeyError(column)
+
+        keys = self._sorted_keys(sort, filters)
+        fingerprint = self._fingerprint(sort, descending, prefix, contains, filters)
+
+        # Range of keys matching the prefix
+        lo, hi = 0, len(keys)
+        numeric_prefix = prefix if prefix and self._col[sort] in self._numeric else None
+        if prefix and not numeric_prefix:
+            folded = prefix.casefold()
+            lo = bisect.bisect_left(keys, (folded,))
+            hi = bisect.bisect_left(keys, (folded + "\U0010ffff",), lo)
+        matching = hi - lo
+
+        # Continue after the last key of the previous page
+        if cursor:
+            last_key = self._decode_cursor(cursor, fingerprint)
+            if descending:
+                hi = min(hi, bisect.bisect_left(keys, last_key, lo, hi))
+            else:
+                lo = max(lo, bisect.bisect_right(keys, last_key, lo, hi))
+
+        needle = contains.casefold() if contains else None
+        residual = [(self._col[c], v) for c, v in filters.items()]
+        positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+
+        rows = []
+        last = None
+        more = False
+        for pos in positions:
+            key = keys[pos]
+            row = self.rows[key[2]]
+            if any(row[idx] != value for idx, value in residual):
+                continue
+            if numeric_prefix and not row[self._col[sort]].startswith(numeric_prefix):
+                continue
+            if needle and not any(needle in v.casefold() for v in row):
+                continue
+            if len(rows) == limit:
+                more = True
+                break
+            rows.append(row)
+            last = key
+
+        total = None
+        if not needle and not numeric_prefix and len(filters) <= 1:
+            # The key list is already restricted to the (single) group filter
+            total = matching
+        next_cursor = self._encode_cursor(last, fingerprint) if more else None
+        return rows, next_cursor, total
+
+    @staticmethod
+    def _fingerprint(*parts):
+        data = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(data).hexdigest()[:12]
+
+    @staticmethod
+    def _encode_cursor(key, fingerprint):
+        data = json.dumps({"k": list(key), "q": fingerprint}).encode("utf-8")
+        return base64.urlsafe_b64encode(data).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor, fingerprint):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            folded, value, row_id = data["k"]
+            query = data["q"]
+        except Exception:
+            raise CursorError("Malformed cursor")
+        if query != fingerprint:
+            raise CursorError("Cursor belongs to a different query")
+        return (folded, value, row_id)
+
+
+def _data_rows(parser, tmpl):
+    content = parser.get_template_content(tmpl)
+    if len(content) < 3:
+        return []
+    return csv.reader(content[2:])
+
+
+def _cell(row, idx):
+    return row[idx] if idx != -1 and len(row) > idx else ""
+
+
+def build_name_dataset(column, names):
+    """A single-column dataset of names (templates, areas), paged by name."""
+    return Dataset([column], [(name,) for name in names])
+
+
+def build_tag_dataset(parser):
+    """One row per tag: Tag, Template, Area, ShortDesc."""
+    rows = []
+    for tmpl in parser.get_template_names():
+        if tmpl == "$Area": continue
+
+        tag_idx = parser.get_column_index(tmpl, "Tagname")
+        if tag_idx == -1:
+            continue
+        area_idx = parser.get_column_index(tmpl, "Area")
+        sd_idx = parser.get_column_index(tmpl, "ShortDesc")
+
+        for row in _data_rows(parser, tmpl):
+            if len(row) > tag_idx:
+                rows.append((row[tag_idx], tmpl, _cell(row, area_idx), _cell(row, sd_idx)))
+    return Dataset(["Tag", "Template", "Area", "ShortDesc"], rows, group_columns=["Template", "Area"])
+
+
+def build_shortdesc_dataset(parser, tags):
+    """Tags of templates that have a ShortDesc column, as in the desktop ShortDesc Manager."""
+    with_sd = {t for t in parser.get_template_names() if parser.get_column_index(t, "ShortDesc") != -1}
+    rows = [(tag, sd, tmpl, area) for tag, tmpl, area, sd in tags.rows if tmpl in with_sd]
+    return Dataset(["Tag", "ShortDesc", "Template", "Area"], rows, group_columns=["Template", "Area"])
+
+
+def build_plcio_dataset(analyzer, tags):
+    """One row per I/O attribute: Tag, Attribute, PLC_Address, Template, Area."""
+    area_of = {(tmpl, tag): area for tag, tmpl, area, _ in tags.rows}
+    rows = [
+        (item["Tag"], item["Attribute"], item["PLC_Address"], item["Template"], area_of.get((item["Template"], item["Tag"]), ""))
+        for item in analyzer.get_plc_addresses()
+    ]
+    return Dataset(["Tag", "Attribute", "PLC_Address", "Template", "Area"], rows, group_columns=["Template", "Area"])
+
+
+def build_area_dataset(parser, tags):
+    """Areas defined in $Area, with the number of tags assigned to each."""
+    counts = tags.group_counts("Area")
+    rows = [(area, str(counts.get(area, 0))) for area in parser.get_area_names() if area]
+    return Dataset(["Area", "Tags"], rows, numeric_columns=["Tags"])
@@ -0,0 +1,76 @@
+import codecs
+import csv
+import json
+
+# Column of a PLC I/O attribute, as in the desktop PLC I/O Manager
+INPUT_SOURCE_COLUMN = "{}.InputSource(MxReferenceType)"
+
+# Buffer size for streaming the modified dump
+DOWNLOAD_CHUNK_CHARS = 256 * 1024
+
+
+def edits_from_csv(f):
+    """
+    Reads a batch of edits from a CSV file object. Accepted layouts:
+      - generic:        Template, Tag (or Tagname), Column, Value
+      - ShortDesc:      Tagname, ShortDesc, Template  (desktop ShortDesc export)
+      - PLC I/O:        Tag, Attribute, PLC_Address, Template  (desktop PLC I/O export)
+    Returns a list of (template, tag, column, value). Raises ValueError if the
+    header matches none of them.
+    """
+    reader = csv.DictReader(f)
+    fields = set(reader.fieldnames or [])
+    tag_field = "Tag" if "Tag" in fields else "Tagname"
+
+    if {"Template", "Column", "Value"} <= fields and tag_field in fields:
+        return [(row["Template"], row[tag_field], row["Column"], row["Value"]) for row in reader]
+    if {"Tagname", "ShortDesc", "Template"} <= fields:
+        return [(row["Template"], row["Tagname"], "ShortDesc", row["ShortDesc"]) for row in reader]
+    if {"Tag", "Attribute", "PLC_Address", "Template"} <= fields:
+        return [
+            (row["Template"], row["Tag"], INPUT_SOURCE_COLUMN.format(row["Attribute"]), row["PLC_Address"])
+            for row in reader
+        ]
+    raise ValueError(
+        "CSV must have columns Template,Tag,Column,Value or Tagname,ShortDesc,Template "
+        "or Tag,Attribute,PLC_Address,Template"
+    )
+
+
+def append_edit_log(path, revision, edits):
+    """Appends the edits of one revision to a session's edit log (JSON lines)."""
+    with open(path, "a", encoding="utf-8") as f:
+        for edit in edits:
+            f.write(json.dumps([revision, *edit]) + "\n")
+
+
+def read_edit_log(path, upto_revision):
+    """Returns the edits of revisions 1..upto_revision, in the order they were applied."""
+    edits = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            revision, *edit = json.loads(line)
+            if revision <= upto_revision:
+                edits.append(tuple(edit))
+    return edits
+
+
+def iter_dump_bytes(parser):
+    """Yields the dump as UTF-16 bytes in bounded chunks, without building it in memory."""
+    encoder = codecs.getincrementalencoder(parser.encoding)()
+    buffer = []
+    size = 0
+
+    def lines():
+        yield from parser.headers
+        for template_lines in parser.templates.values():
+            yield from template_lines
+
+    for line in lines():
+        buffer.append(line)
+        size += len(line)
+        if size >= DOWNLOAD_CHUNK_CHARS:
+            yield encoder.encode("".join(buffer))
+            buffer = []
+            size = 0
+    yield encoder.encode("".join(buffer), True)
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+# Default chunk size: fits under the ~4.5 MB request body limit of serverless hosts
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+MAX_CHUNKS = 100000
+# Marker claiming an upload for finalize; no chunk is accepted after it
+FINALIZING = "finalizing"
+
+
+class ChunkError(Exception):
+    """Raised for a chunk that does not belong to the upload (bad index, size or checksum)."""
+
+
+class UploadClosed(Exception):
+    """Raised for a chunk sent to an upload that is being finalized."""
+
+
+class ChunkedUploadStore:
+    """
+    Resumable uploads assembled on disk, under <root>/chunked/<upload_id>/:
+      info.json   filename, size, chunk_size, chunk count, optional sha256
+      data.part   the dump, preallocated; chunk i is written at i * chunk_size
+      <i>.ok      marker created once chunk i is completely written
+      finalizing  created by the request that finalizes the upload
+    Chunks may arrive in any order, in parallel and from several workers; the
+    markers are the only shared state, so a client can resume by asking
+    which chunks are missing.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.join(root, "chunked")
+
+    def _dir(self, upload_id):
+        if not UPLOAD_ID_PATTERN.match(upload_id):
+            raise KeyError(upload_id)
+        return os.path.join(self.root, upload_id)
+
+    def data_path(self, upload_id):
+        return os.path.join(self._dir(upload_id), "data.part")
+
+    def create(self, filename, size, chunk_size=DEFAULT_CHUNK_SIZE, sha256=None):
+        if size <= 0:
+            raise ChunkError("size must be positive")
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise ChunkError(f"chunk_size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+        chunks = -(-size // chunk_size)
+        if chunks > MAX_CHUNKS:
+            raise ChunkError(f"Too many chunks ({chunks}); use a larger chunk_size")
+
+        upload_id = uuid.uuid4().hex
+        directory = self._dir(upload_id)
+        os.makedirs(directory)
+        with open(self.data_path(upload_id), "wb") as f:
+            # Sparse on most file systems; chunks fill it in place
+            f.truncate(size)
+        info = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "size": size,
+            "chunk_size": chunk_size,
+            "chunks": chunks,
+            "sha256": sha256.lower() if sha256 else None,
+            "created": time.time(),
+        }
+        with open(os.path.join(directory, "info.json"), "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        return info
+
+    def info(self, upload_id):
+        """The upload's info.json, or None if there is no such upload."""
+        try:
+            with open(os.path.join(self._dir(upload_id), "info.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def chunk_length(self, info, index):
+        return min(info["chunk_size"], info["size"] - index * info["chunk_size"])
+
+    def write_chunk(self, info, index, data, checksum):
+        """Verifies a chunk against its SHA-256 (hex) and writes it at its offset."""
+        if not 0 <= index < info["chunks"]:
+            raise ChunkError(f"Chunk index must be between 0 and {info['chunks'] - 1}")
+        expected = self.chunk_length(info, index)
+        if len(data) != expected:
+            raise ChunkError(f"Chunk {index} must be {expected} bytes, got {len(data)}")
+        if not checksum or hashlib.sha256(data).hexdigest() != checksum.strip().lower():
+            raise ChunkError(f"Checksum mismatch for chunk {index}")
+
+        upload_id = info["upload_id"]
+        if os.path.exists(os.path.join(self._dir(upload_id), FINALIZING)):
+            raise UploadClosed(f"Upload {upload_id} is being finalized")
+        # FileNotFoundError once the upload is removed
+        with open(self.data_path(upload_id), "r+b") as f:
+            f.seek(index * info["chunk_size"])
+            f.write(data)
+        # Created only after the data is written, so a marker never points at a partial chunk
+        with open(os.path.join(self._dir(upload_id), f"{index}.ok"), "wb"):
+            pass
+
+    def claim_finalize(self, upload_id):
+        """
+        Marks the upload as being finalized, atomically across workers.
+        Returns False if it is gone or another request claimed it first.
+        """
+        try:
+            fd = os.open(os.path.join(self._dir(upload_id), FINALIZING), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except (KeyError, FileExistsError, FileNotFoundError):
+            return False
+        os.close(fd)
+        return True
+
+    def received(self, upload_id):
+        """Indexes of the chunks written so far, sorted."""
+        try:
+            names = os.listdir(self._dir(upload_id))
+        except (KeyError, FileNotFoundError):
+            return []
+        return sorted(int(n[:-3]) for n in names if n.endswith(".ok") and n[:-3].isdigit())
+
+    def file_sha256(self, upload_id):
+        digest = hashlib.sha256()
+        with open(self.data_path(upload_id), "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def remove(self, upload_id):
+        try:
+            shutil.rmtree(self._dir(upload_id))
+        except (KeyError, FileNotFoundError):
+            pass
+
+    def sweep(self, now, max_age):
+        """Removes uploads untouched for max_age seconds. Returns the bytes freed."""
+        if not os.path.isdir(self.root):
+            return 0
+        freed = 0
+        for upload_id in os.listdir(self.root):
+            directory = os.path.join(self.root, upload_id)
+            try:
+                # A new marker updates the directory, a chunk write the data file
+                last_change = max(os.stat(directory).st_mtime, os.stat(os.path.join(directory, "data.part")).st_mtime)
+            except FileNotFoundError:
+                last_change = 0
+            if now - last_change <= max_age:
+                continue
+            for dirpath, _, filenames in os.walk(directory):
+                for name in filenames:
+                    try:
+                        freed += os.path.getsize(os.path.join(dirpath, name))
+                    except OSError:
+                        pass
+            shutil.rmtree(directory, ignore_errors=True)
+        return freed
+
+
+class IncrementalIngest:
+    """
+    Hashes and section-scans a chunked upload while it arrives, so finalizing
+    does not have to read the whole dump again. Chunks are fed strictly in
+    order; advance() feeds every chunk that is contiguous with what was fed
+    before. parser is an AvevaParser (in-memory model) or a
+    StreamingSnapshotWriter (disk-backed model); `reserved` is the memory
+    reserved for it in the budget, given back by whoever discards it.
+    Once close() returns, advance() does nothing, so the parser can be
+    aborted or handed over.
+    """
+
+    def __init__(self, store, info, parser, reserved=0):
+        self.store = store
+        self.info = info
+        self.parser = parser
+        self.reserved = reserved
+        self.next_chunk = 0
+        self.seconds = 0.0  # Time spent hashing and scanning
+        self.digest = hashlib.sha256()
+        self.lock = threading.Lock()
+        self.closed = False
+        parser.begin_stream()
+
+    @property
+    def complete(self):
+        return self.next_chunk == self.info["chunks"]
+
+    def advance(self, blocking=True):
+        """
+        Feeds the received chunks that follow the fed prefix. With
+        blocking=False it returns at once if another thread is already at it.
+        """
+        if not self.lock.acquire(blocking):
+            return
+        try:
+            if self.closed:
+                # A background advance() queued before the upload was aborted or finalized
+                return
+            received = set(self.store.received(self.info["upload_id"]))
+            if self.complete or self.next_chunk not in received:
+                return
+            started = time.perf_counter()
+            try:
+                f = open(self.store.data_path(self.info["upload_id"]), "rb")
+            except FileNotFoundError:
+                # Aborted (or finalized elsewhere) while this was queued
+                return
+            with f:
+                f.seek(self.next_chunk * self.info["chunk_size"])
+                while self.next_chunk in received:
+                    data = f.read(self.store.chunk_length(self.info, self.next_chunk))
+                    self.digest.update(data)
+                    self.parser.feed(data)
+                    self.next_chunk += 1
+            if self.complete:
+                self.parser.end_stream()
+            self.seconds += time.perf_counter() - started
+        finally:
+            self.lock.release()
+
+    def close(self):
+        """Stops advance() for good, waiting for a call in progress."""
+        with self.lock:
+            self.closed = True
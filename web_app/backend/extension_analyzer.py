@@ -2,53 +2,150 @@ import csv
 import xml.etree.ElementTree as ET
 from collections import defaultdict
 
+try:
+    from .aveva_parser import ProgressReporter
+except ImportError:
+    from aveva_parser import ProgressReporter
+
+EXTENSIONS_COLUMN = "Extensions(MxBigString)"
+INPUT_SOURCE_SUFFIX = ".InputSource(MxReferenceType)"
+
+def affects_extensions(column_name):
+    """True for the columns the analyzer reads; edits to them invalidate its cache."""
+    return column_name in ("Tagname", "Area", EXTENSIONS_COLUMN) or column_name.endswith(INPUT_SOURCE_SUFFIX)
+
+def _parse_extensions(xml_string):
+    """(object extension types, (extension type, attribute name) pairs) of an Extensions cell."""
+    try:
+        # Aveva XML is usually clean XML fragment
+        root = ET.fromstring(xml_string)
+    except Exception:
+        # If XML is malformed, skip
+        return (), ()
+    objects = tuple(
+        ext.get("ExtensionType") for ext in root.findall(".//ObjectExtension/Extension")
+        if ext.get("ExtensionType")
+    )
+    attributes = tuple(
+        (attr.get("ExtensionType"), attr.get("Name")) for attr in root.findall(".//AttributeExtension/Attribute")
+        if attr.get("ExtensionType") and attr.get("Name")
+    )
+    return objects, attributes
+
 class ExtensionAnalyzer:
-    def __init__(self, parser):
+    """
+    Reads the Extensions XML and the InputSource columns of a parsed dump.
+    Each template is parsed once into records shared by every report; the
+    GUI keeps one analyzer per loaded file. A template is parsed again only
+    if the dump was parsed again (AvevaParser.generation) or the parser
+    counted edits to a column the records depend on (see affects_extensions),
+    so ShortDesc imports keep the cache while PLC address imports refresh the
+    templates touched. Disk-backed templates (snapshot.SnapshotSections) are
+    not cached: the records of every template would stay in memory.
+    """
+    def __init__(self, parser, progress=None):
         self.parser = parser
+        # Without a callback the reporter only counts rows
+        self.progress = progress or ProgressReporter()
+        self._cache = {}  # { template: (generation, edit count, rows, records) }
         
-    def analyze(self):
-        """
-        Analyzes Extensions(MxBigString) column for all templates.
-        Returns a dictionary: { ExtensionType: [ "Tag.Attr", "Tag" ] }
-        """
-        results = defaultdict(list)
+    def _begin(self, operation):
+        templates = self.parser.templates
+        if isinstance(templates, dict):
+            counts = [len(lines) for lines in templates.values()]
+        else:
+            # Disk-backed sections are counted from the snapshot index: decoding
+            # each one here would decode it twice per report
+            line_count = getattr(templates, "line_count", None)
+            counts = [line_count(t) for t in templates] if line_count else [None]
+        # Without every count the progress has no total
+        total = None if None in counts else sum(max(count - 2, 0) for count in counts)
+        self.progress.begin(operation, total_rows=total)
         
-        template_names = self.parser.get_template_names()
+    def _edit_count(self, tmpl):
+        edits = getattr(self.parser, "column_edits", {})
+        return sum(count for (name, column), count in edits.items() if name == tmpl and affects_extensions(column))
         
-        for tmpl in template_names:
-            # Identify columns
-            ext_col_name = "Extensions(MxBigString)"
-            # Handle potential variation or just use the known one
+    def _records(self, tmpl):
+        """
+        (input attributes, records) of a template, or None without a Tagname column.
+        One record per data row that has extensions or an input source:
+        (tagname, area or None, object extension types, (type, attribute) pairs,
+        InputSource values in the order of input attributes, None past the row's end).
+        """
+        if not isinstance(self.parser.templates, dict):
+            return self._parse_template(tmpl, self.parser.get_template_content(tmpl))
             
-            ext_idx = self.parser.get_column_index(tmpl, ext_col_name)
-            tag_idx = self.parser.get_column_index(tmpl, "Tagname")
+        key = (getattr(self.parser, "generation", 0), self._edit_count(tmpl))
+        cached = self._cache.get(tmpl)
+        if cached and cached[:2] == key:
+            self.progress.advance(cached[2])
+            return cached[3]
             
-            if ext_idx == -1 or tag_idx == -1:
+        content = self.parser.get_template_content(tmpl)
+        records = self._parse_template(tmpl, content)
+        # Only the row count is kept, not the line list
+        self._cache[tmpl] = (*key, max(len(content) - 2, 0), records)
+        return records
+        
+    def _parse_template(self, tmpl, content):
+        progress = self.progress
+        tag_idx = self.parser.get_column_index(tmpl, "Tagname")
+        if tag_idx == -1 or len(content) < 3: # Need at least Template, Header, and 1 Row
+            return None
+        ext_idx = self.parser.get_column_index(tmpl, EXTENSIONS_COLUMN)
+        area_idx = self.parser.get_column_index(tmpl, "Area")
+        
+        # Map headers
+        header_parts = [h.strip().lstrip(':') for h in content[1].split(',')]
+        col_map = {name: i for i, name in enumerate(header_parts)}
+        inputs = [(name[:-len(INPUT_SOURCE_SUFFIX)], i) for name, i in col_map.items() if name.endswith(INPUT_SOURCE_SUFFIX)]
+        
+        records = []
+        # Use csv.reader to handle quoted strings (XML often contains chars that might be quoted)
+        for row in csv.reader(content[2:]):
+            progress.row()
+            if len(row) <= tag_idx:
                 continue
                 
-            content = self.parser.get_template_content(tmpl)
-            if len(content) < 3: # Need at least Template, Header, and 1 Row
+            objects = attributes = ()
+            if ext_idx != -1 and len(row) > ext_idx:
+                xml_data = row[ext_idx]
+                if xml_data and xml_data.strip():
+                    objects, attributes = _parse_extensions(xml_data)
+                    
+            sources = tuple(row[i] if len(row) > i else None for _, i in inputs)
+            # Rows with nothing to report are not kept
+            if not (objects or attributes or any(addr and addr.strip() for addr in sources)):
                 continue
-                
-            data_rows = content[2:]
+            area = row[area_idx] if area_idx != -1 and len(row) > area_idx else None
+            records.append((row[tag_idx], area, objects, attributes, sources))
             
-            # Use csv.reader to handle quoted strings (XML often contains chars that might be quoted)
-            reader = csv.reader(data_rows)
-            
-            for row in reader:
-                # Ensure row has enough columns
-                if len(row) <= ext_idx or len(row) <= tag_idx:
-                    continue
-                    
-                tagname = row[tag_idx]
-                xml_data = row[ext_idx]
+        return tuple(attr for attr, _ in inputs), records
+        
+    def analyze(self):
+        """
+        Analyzes Extensions(MxBigString) column for all templates.
+        Returns a dictionary: { ExtensionType: [ "Tag.Attr", "Tag" ] }
+        """
+        results = defaultdict(list)
+        progress = self.progress
+        self._begin("analyze")
+        
+        for tmpl in self.parser.get_template_names():
+            progress.section(tmpl)
+            parsed = self._records(tmpl)
+            if parsed is None:
+                continue
                 
-                # Aveva dumps sometimes represent empty strings interestingly, but assuming empty string check
-                if not xml_data or xml_data.strip() == "":
-                    continue
-                    
-                self._parse_xml_and_collect(tagname, xml_data, results)
+            for tagname, _, objects, attributes, _ in parsed[1]:
+                # Object extension usually applies to the tag itself
+                for ext_type in objects:
+                    results[ext_type].append(tagname)
+                for ext_type, attr_name in attributes:
+                    results[ext_type].append(f"{tagname}.{attr_name}")
                 
+        progress.finish()
         return results
 
     def get_plc_addresses(self):
@@ -57,73 +154,34 @@ class ExtensionAnalyzer:
         Returns a list of dicts: {'Tag': ..., 'Attribute': ..., 'FullItem': ..., 'PLC_Address': ..., 'Template': ...}
         """
         results = []
+        progress = self.progress
+        self._begin("plc_addresses")
         
-        template_names = self.parser.get_template_names()
-        
-        for tmpl in template_names:
-            ext_idx = self.parser.get_column_index(tmpl, "Extensions(MxBigString)")
-            tag_idx = self.parser.get_column_index(tmpl, "Tagname")
-            
-            if ext_idx == -1 or tag_idx == -1:
-                continue
-                
-            content = self.parser.get_template_content(tmpl)
-            if len(content) < 3:
+        for tmpl in self.parser.get_template_names():
+            progress.section(tmpl)
+            parsed = self._records(tmpl)
+            if parsed is None:
                 continue
-                
-            data_rows = content[2:]
-            reader = csv.reader(data_rows)
-            
-            # Cache column indices for this template to avoid repeated lookups
-            # We don't know which attributes exist yet, so we have to do it dynamically 
-            # or pre-scan header? Pre-scan header is better.
-            header_line = content[1]
-            header_parts = [h.strip().lstrip(':') for h in header_line.split(',')]
-            # Map column name to index
-            col_map = {name: i for i, name in enumerate(header_parts)}
+            input_attrs, records = parsed
+            positions = {attr: k for k, attr in enumerate(input_attrs)}
             
-            for row in reader:
-                if len(row) <= ext_idx or len(row) <= tag_idx:
-                    continue
-                    
-                tagname = row[tag_idx]
-                xml_data = row[ext_idx]
-                
-                if not xml_data or xml_data.strip() == "":
-                    continue
-                
-                try:
-                    root = ET.fromstring(xml_data)
-                    attr_extensions = root.findall(".//AttributeExtension/Attribute")
+            for tagname, _, _, attributes, sources in records:
+                for ext_type, attr_name in attributes:
+                    if ext_type != "inputoutputextension":
+                        continue
+                    # Value of the AttributeName.InputSource(MxReferenceType) column
+                    k = positions.get(attr_name)
+                    plc_addr = sources[k] if k is not None and sources[k] is not None else ""
                     
-                    for attr in attr_extensions:
-                        ext_type = attr.get("ExtensionType")
-                        attr_name = attr.get("Name")
-                        
-                        if ext_type == "inputoutputextension" and attr_name:
-                            # Construct expected column name for InputSource
-                            # Format: AttributeName.InputSource(MxReferenceType)
-                            target_col = f"{attr_name}.InputSource(MxReferenceType)"
-                            
-                            plc_addr = ""
-                            if target_col in col_map:
-                                input_src_idx = col_map[target_col]
-                                if len(row) > input_src_idx:
-                                    plc_addr = row[input_src_idx]
-                            
-                            results.append({
-                                'Tag': tagname,
-                                'Attribute': attr_name,
-                                'FullItem': f"{tagname}.{attr_name}",
-                                'PLC_Address': plc_addr,
-                                'Template': tmpl
-                            })
-                            
-                except ET.ParseError:
-                    pass
-                except Exception:
-                    pass
+                    results.append({
+                        'Tag': tagname,
+                        'Attribute': attr_name,
+                        'FullItem': f"{tagname}.{attr_name}",
+                        'PLC_Address': plc_addr,
+                        'Template': tmpl
+                    })
                     
+        progress.finish()
         return results
 
     def get_plc_address_matrix(self):
@@ -218,120 +276,47 @@ class ExtensionAnalyzer:
         Returns a dict: { AreaName: [ [Tag.Attr, Address], ... ] }
         """
         results = defaultdict(list)
+        progress = self.progress
+        self._begin("addresses")
         
-        template_names = self.parser.get_template_names()
-        
-        for tmpl in template_names:
-            ext_idx = self.parser.get_column_index(tmpl, "Extensions(MxBigString)")
-            tag_idx = self.parser.get_column_index(tmpl, "Tagname")
-            area_idx = self.parser.get_column_index(tmpl, "Area")
-            
-            if tag_idx == -1 or area_idx == -1:
+        for tmpl in self.parser.get_template_names():
+            progress.section(tmpl)
+            parsed = self._records(tmpl)
+            if parsed is None:
                 continue
-                
-            content = self.parser.get_template_content(tmpl)
-            if len(content) < 3:
-                continue
-            
-            # Map headers
-            header_line = content[1]
-            header_parts = [h.strip().lstrip(':') for h in header_line.split(',')]
-            col_map = {name: i for i, name in enumerate(header_parts)}
+            input_attrs, records = parsed
             
-            # Dynamic Column Identification: Find all *.InputSource columns
-            input_source_cols = []
-            for col_name, idx in col_map.items():
-                if col_name.endswith(".InputSource(MxReferenceType)"):
-                    attr_name = col_name.replace(".InputSource(MxReferenceType)", "")
-                    input_source_cols.append((attr_name, idx))
-            
-            if not input_source_cols:
+            if not input_attrs:
                 continue # No input sources in this template, skip
-
-            data_rows = content[2:]
-            reader = csv.reader(data_rows)
             
-            for row in reader:
-                if len(row) <= tag_idx or len(row) <= area_idx:
+            for tagname, area, _, attributes, sources in records:
+                if area is None:
                     continue
                     
-                tagname = row[tag_idx]
-                area = row[area_idx]
-                
                 # Filter Logic
-                valid_alarm_attrs = set()
                 if alarm_only:
-                    if ext_idx == -1 or len(row) <= ext_idx:
-                        continue # Can't check extensions
-                    
-                    xml_data = row[ext_idx]
-                    if not xml_data or xml_data.strip() == "":
-                        continue
-                        
-                    try:
-                        root = ET.fromstring(xml_data)
-                        attr_extensions = root.findall(".//AttributeExtension/Attribute")
-                        
-                        for attr_node in attr_extensions:
-                            if attr_node.get("ExtensionType") == "alarmextension":
-                                attr_name = attr_node.get("Name")
-                                if attr_name:
-                                    valid_alarm_attrs.add(attr_name)
-                        
-                        if not valid_alarm_attrs:
-                            continue # No alarm attributes for this tag, skip entire tag
-                            
-                    except Exception:
-                        continue
+                    valid_alarm_attrs = {name for ext_type, name in attributes if ext_type == "alarmextension"}
+                    if not valid_alarm_attrs:
+                        continue # No alarm attributes for this tag, skip entire tag
                 
                 # Extraction Logic
-                for attr, idx in input_source_cols:
+                for attr, addr in zip(input_attrs, sources):
                     # If alarm_only is True, we only extract if this attribute is in our allowed list
                     if alarm_only and attr not in valid_alarm_attrs:
                         continue
 
-                    if len(row) > idx:
-                        addr = row[idx]
-                        if addr and addr.strip():
-                            # Trim address before "DB" if present
-                            db_idx = addr.upper().find("DB")
-                            if db_idx != -1:
-                                addr = addr[db_idx:]
-                                
-                            results[area].append([f"{tagname}.{attr}", addr])
+                    if addr and addr.strip():
+                        # Trim address before "DB" if present
+                        db_idx = addr.upper().find("DB")
+                        if db_idx != -1:
+                            addr = addr[db_idx:]
+                            
+                        results[area].append([f"{tagname}.{attr}", addr])
+        
+        progress.finish()
         
         # Sort results for each area by Tagname
         for area in results:
             results[area].sort(key=lambda x: x[0])
             
         return results
-
-    def _parse_xml_and_collect(self, tagname, xml_string, results):
-        try:
-            # Aveva XML is usually clean XML fragment
-            root = ET.fromstring(xml_string)
-            
-            # 1. Object Extensions (<ObjectExtension><Extension ... /></ObjectExtension>)
-            # Using loop to find all Extensions under ObjectExtension
-            obj_extensions = root.findall(".//ObjectExtension/Extension")
-            for ext in obj_extensions:
-                ext_type = ext.get("ExtensionType")
-                if ext_type:
-                    # Object extension usually applies to the tag itself
-                    results[ext_type].append(tagname)
-
-            # 2. Attribute Extensions (<AttributeExtension><Attribute ... /></AttributeExtension>)
-            attr_extensions = root.findall(".//AttributeExtension/Attribute")
-            for attr in attr_extensions:
-                ext_type = attr.get("ExtensionType")
-                attr_name = attr.get("Name")
-                if ext_type and attr_name:
-                     results[ext_type].append(f"{tagname}.{attr_name}")
-                    
-        except ET.ParseError:
-            # If XML is malformed, skip
-            # print(f"Debug: XML parse error for {tagname}")
-            pass
-        except Exception as e:
-            # General error safety
-            pass
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import threading
+import time
+
+# Scratch files (spooled uploads, half-written artifacts, progress events) are only removed once
+# they are clearly abandoned, never while a request may still be writing them
+SCRATCH_SUFFIXES = (".part", ".tmp", ".progress")
+# Sessions and dumps from before content-addressed storage ({session_id}_{name}.csv)
+LEGACY_SUFFIX = ".csv"
+
+
+def _files_under(directory):
+    """Yields (path, stat) for every file below directory."""
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                yield path, os.stat(path)
+            except FileNotFoundError:
+                pass
+
+
+class SessionLifecycle:
+    """
+    Expires idle sessions and keeps UPLOAD_DIR under a disk quota.
+
+    sweep() runs in three steps:
+      1. sessions idle for longer than idle_ttl are released
+      2. abandoned scratch files and legacy per-session files are deleted, and
+         each of `sweepers` (callables sweeper(now, max_age) returning the
+         bytes they freed) cleans up its own abandoned state
+      3. while usage is over the quota, the least recently used artifacts are
+         deleted first (they can be regenerated), then the least recently used
+         sessions are released
+    """
+
+    # Only persist last_access when it moved by more than this, so busy sessions
+    # don't turn every request into a write to the session store
+    TOUCH_INTERVAL = 30
+
+    def __init__(self, sessions, blobs, release_session, idle_ttl, disk_quota, sweep_interval, sweepers=()):
+        self.sessions = sessions
+        self.blobs = blobs
+        self.release_session = release_session
+        self.idle_ttl = idle_ttl
+        self.disk_quota = disk_quota
+        self.sweep_interval = sweep_interval
+        self.sweepers = list(sweepers)
+        self._lock = threading.Lock()
+        self.counters = {
+            "sweeps": 0,
+            "sessions_expired": 0,
+            "sessions_evicted": 0,
+            "artifacts_evicted": 0,
+            "scratch_files_removed": 0,
+            "bytes_freed": 0,
+            "last_sweep": None,
+            "last_sweep_seconds": None,
+        }
+
+    def new_record(self, **fields):
+        now = time.time()
+        fields.update(created=now, last_access=now)
+        return fields
+
+    def touch(self, session_id, record):
+        now = time.time()
+        if now - record.get("last_access", 0) > self.TOUCH_INTERVAL:
+            self.sessions.update(session_id, last_access=now)
+            record["last_access"] = now
+
+    def touch_artifact(self, path):
+        """Marks an artifact as used so quota eviction treats it as recent."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def disk_usage(self):
+        return sum(st.st_size for _, st in _files_under(self.blobs.root))
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _remove_file(self, path, size, counter):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        self._count(counter)
+        self._count("bytes_freed", size)
+        return size
+
+    def _release(self, session_id, counter):
+        before = self.disk_usage()
+        if self.release_session(session_id):
+            self._count(counter)
+            self._count("bytes_freed", max(before - self.disk_usage(), 0))
+
+    def sweep(self, now=None):
+        started = time.time()
+        now = now if now is not None else started
+
+        # 1. Idle sessions
+        records = self.sessions.items()
+        for session_id, record in records:
+            if now - record.get("last_access", 0) > self.idle_ttl:
+                self._release(session_id, "sessions_expired")
+
+        # 2. Abandoned scratch files and leftovers from the old per-session layout
+        for path, st in list(_files_under(self.blobs.root)):
+            if now - st.st_mtime <= self.idle_ttl:
+                continue
+            name = os.path.basename(path)
+            legacy = os.path.dirname(path) == self.blobs.root and name.endswith(LEGACY_SUFFIX)
+            if name.endswith(SCRATCH_SUFFIXES) or legacy:
+                self._remove_file(path, st.st_size, "scratch_files_removed")
+        for sweeper in self.sweepers:
+            self._count("bytes_freed", sweeper(now, self.idle_ttl))
+
+        # 3. Quota: artifacts first, then whole sessions, least recently used first
+        usage = self.disk_usage()
+        if usage > self.disk_quota:
+            artifacts = sorted(_files_under(self.blobs.artifact_dir), key=lambda item: item[1].st_mtime)
+            for path, st in artifacts:
+                if usage <= self.disk_quota:
+                    break
+                usage -= self._remove_file(path, st.st_size, "artifacts_evicted")
+
+        if usage > self.disk_quota:
+            by_access = sorted(self.sessions.items(), key=lambda item: item[1].get("last_access", 0))
+            for session_id, _ in by_access:
+                if self.disk_usage() <= self.disk_quota:
+                    break
+                self._release(session_id, "sessions_evicted")
+
+        with self._lock:
+            self.counters["sweeps"] += 1
+            self.counters["last_sweep"] = started
+            self.counters["last_sweep_seconds"] = time.time() - started
+
+    async def run(self):
+        """Periodic sweeper; started from the app lifespan and cancelled on shutdown."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                # File system walks and store writes stay off the event loop
+                await loop.run_in_executor(None, self.sweep)
+            except Exception as e:
+                print(f"Session sweep failed: {e}")
+
+    def status(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "active_sessions": len(self.sessions),
+            "disk_usage_bytes": self.disk_usage(),
+            "disk_quota_bytes": self.disk_quota,
+            "idle_ttl_seconds": self.idle_ttl,
+            "sweep_interval_seconds": self.sweep_interval,
+            **counters,
+        }
@@ -1,21 +1,73 @@
 import sys
 import os
-import shutil
+import re
+import hashlib
+import mimetypes
 import uuid
 import csv
 from typing import List, Optional
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi import BackgroundTasks
 from pydantic import BaseModel
-import zipfile
 import io
 
-# Imports from local directory
-from .aveva_parser import AvevaParser
-from .extension_analyzer import ExtensionAnalyzer
+# Imports from local directory. Modules only some endpoints need (parser,
+# analyzer, ZIP, snapshots, browse, bulk edits) are imported where they are
+# used, so a serverless cold start only pays for what the first request needs.
+from .admission import AdmissionRejected, MemoryBudget
+from .artifacts import (
+    COMPRESSIBLE_TYPES, artifact_writer, etag_matches, iter_compressed, iter_file, make_etag, negotiate_coding, write_zip_member
+)
+from .blob_store import BlobStore
+from .chunked_uploads import DEFAULT_CHUNK_SIZE, ChunkedUploadStore, ChunkError, IncrementalIngest, UploadClosed
+from .session_store import create_session_store
+from .single_flight import SingleFlight
+from .lifecycle import SessionLifecycle
+from .metrics import MetricsMiddleware, Registry
+from .progress import ProgressHub
+from .startup import RunOnceMiddleware
+from .warmup import WarmupCancelled, WarmupQueue
+
+import anyio.to_thread
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+
+@asynccontextmanager
+async def lifespan(app):
+    # Periodic cleanup of idle sessions and disk quota enforcement
+    sweeper = asyncio.create_task(LIFECYCLE.run())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+
+app = FastAPI(lifespan=lifespan)
+
+# In-process metrics, exposed at /metrics in Prometheus text format
+METRICS = Registry()
+HTTP_REQUESTS = METRICS.counter("aveva_http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+HTTP_LATENCY = METRICS.histogram("aveva_http_request_duration_seconds", "Time until the response is complete", ["method", "route"])
+PARSE_DURATION = METRICS.histogram("aveva_parse_duration_seconds", "Time to build a model, by source (upload, chunked, file, snapshot)", ["source"])
+PARSE_BYTES = METRICS.counter("aveva_parse_bytes_total", "Dump bytes turned into models, by source", ["source"])
+PARSE_THROUGHPUT = METRICS.histogram(
+    "aveva_parse_throughput_bytes_per_second", "Dump bytes per second when building a model", ["source"],
+    buckets=[2 ** n * 1024 * 1024 for n in range(11)]  # 1MB/s .. 1GB/s
+)
+CACHE_REQUESTS = METRICS.counter("aveva_cache_requests_total", "Lookups in the model, artifact and dataset caches", ["cache", "result"])
+THREADPOOL = METRICS.gauge("aveva_threadpool_threads", "Worker threads running sync endpoints (busy, queued, limit)", ["state"])
+
+app.add_middleware(MetricsMiddleware, requests=HTTP_REQUESTS, latency=HTTP_LATENCY)
 
-app = FastAPI()
+def record_parse(source, seconds, size):
+    PARSE_DURATION.observe(seconds, source=source)
+    PARSE_BYTES.inc(size, source=source)
+    if seconds > 0:
+        PARSE_THROUGHPUT.observe(size / seconds, source=source)
 
 # Allow CORS for local development
 app.add_middleware(
@@ -27,253 +79,1266 @@ app.add_middleware(
 )
 
 import tempfile
+import threading
+
+# Point every worker (or host) at the same directory to share sessions and dumps
+UPLOAD_DIR = os.environ.get("AVEVA_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "aveva_uploads"))
+
+# Uploads are stored once per distinct content and shared between sessions
+BLOBS = BlobStore(UPLOAD_DIR)
+
+# Session storage, shared by all workers unless AVEVA_SESSION_STORE=memory
+# { session_id: { "filename": original_name, "sha256": content_hash, "revision": edit_count,
+#                 "created": ts, "last_access": ts } }
+SESSIONS = create_session_store(os.environ.get("AVEVA_SESSION_STORE", "sqlite"), UPLOAD_DIR)
+
+# Parsed models shared by every session on the same dump (per worker process).
+# Other workers load them from the memory-mapped snapshot instead of re-parsing.
+# A session with edits gets its own copy-on-write model under its own key.
+# { model_key: AvevaParser }
+MODELS = {}
+MODELS_LOCK = threading.Lock()
+
+# Edited model of each session held by this worker (see hold_edited_model)
+# { session_id: (revision, model_key) }
+EDITED_MODELS = {}
+
+# Memory reserved by each dump model, least recently used first (see BUDGET)
+# { sha256: bytes }
+MODEL_COSTS = OrderedDict()
+
+# Browse indexes built from a model on first use
+# { (model_key, dataset_name): Dataset }
+DATASETS = {}
 
-# Simple in-memory session storage
-# { session_id: { "filepath": path, "filename": original_name } }
-SESSIONS = {}
-UPLOAD_DIR = os.path.join(tempfile.gettempdir(), "aveva_uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Identical concurrent work (same dump, operation and parameters) runs once;
+# the other requests wait for it and share the result
+FLIGHTS = SingleFlight()
+
+# Progress of long requests, streamed by /api/progress/{progress_id}
+PROGRESS = ProgressHub(os.path.join(UPLOAD_DIR, "progress"))
+
+def evict_models(amount):
+    """
+    Frees at least `amount` reserved bytes if it can, by dropping the least
+    recently used dump models that can be reloaded from their snapshot,
+    together with the edited copies sharing their lines.
+    """
+    freed = 0
+    with MODELS_LOCK:
+        for sha256 in list(MODEL_COSTS):
+            if freed >= amount:
+                break
+            if not os.path.exists(BLOBS.snapshot_path(sha256)):
+                # Still being written after the upload
+                continue
+            freed += MODEL_COSTS.pop(sha256)
+            for key in [k for k in MODELS if k == sha256 or k.startswith(f"{sha256}-")]:
+                del MODELS[key]
+            for key in [k for k in DATASETS if k[0] == sha256 or k[0].startswith(f"{sha256}-")]:
+                del DATASETS[key]
+            MODEL_EVICTIONS.inc()
+    if freed:
+        BUDGET.release(freed)
+
+# Models held by this worker reserve their estimated size in a budget of
+# AVEVA_MEMORY_BUDGET_MB. A model over AVEVA_MAX_MODEL_MB, or one that only
+# fits the budget that way, is held disk-backed: its sections are decoded from
+# the memory-mapped snapshot on access. When even that does not fit, requests
+# wait up to AVEVA_ADMISSION_TIMEOUT seconds, then get 503 with Retry-After.
+BUDGET = MemoryBudget(
+    limit=int(float(os.environ.get("AVEVA_MEMORY_BUDGET_MB", 1024)) * 1024 * 1024),
+    max_model=int(float(os.environ.get("AVEVA_MAX_MODEL_MB", 256)) * 1024 * 1024),
+    queue_timeout=float(os.environ.get("AVEVA_ADMISSION_TIMEOUT", 30)),
+    evict=evict_models,
+)
+MODEL_EVICTIONS = METRICS.counter("aveva_model_evictions_total", "Idle models dropped to make room in the memory budget")
+
+def admit_model(scan, wait=True):
+    """Reserves memory for a model (see BUDGET). Returns (mode, reserved_bytes)."""
+    try:
+        return BUDGET.admit(scan, wait)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def hold_model(sha256: str, parser, cost: int):
+    """Caches a freshly loaded dump model, or returns the one another request cached first."""
+    with MODELS_LOCK:
+        cached = MODELS.get(sha256)
+        if cached is None:
+            MODELS[sha256] = parser
+            MODEL_COSTS[sha256] = MODEL_COSTS.get(sha256, 0) + cost
+            return parser
+    BUDGET.release(cost)
+    return cached
+
+def prepare_storage():
+    # Directories are created before the first request instead of at import
+    # time; the SQLite session store creates its schema on first use
+    BLOBS.ensure_dirs()
+    PROGRESS.ensure_dir()
+
+app.add_middleware(RunOnceMiddleware, setup=prepare_storage)
+
+# Template and area lists come one sorted page at a time, so the upload
+# response and the lists the frontend renders stay small however large the galaxy
+SESSION_PAGE_SIZE = 100
 
 class SessionResponse(BaseModel):
     session_id: str
     filename: str
     total_templates: int
     total_areas: int
+    # First page of each list; pass the cursor to /api/session/{session_id}/templates (or /areas) for more
     templates: List[str]
     areas: List[str]
+    templates_cursor: Optional[str] = None
+    areas_cursor: Optional[str] = None
+
+class NamePage(BaseModel):
+    items: List[str]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
 
-def get_parser(session_id: str):
-    if session_id not in SESSIONS:
+def get_session(session_id: str):
+    session = SESSIONS.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
+    LIFECYCLE.touch(session_id, session)
+    return session
+
+def model_key(session_id: str, session: dict):
+    """
+    Key of the model a session sees: the dump hash, or for a session with
+    edits, the hash plus a suffix unique to the session and revision.
+    Artifacts and browse indexes are keyed by it.
+    """
+    revision = session.get("revision", 0)
+    if not revision:
+        return session["sha256"]
+    suffix = hashlib.sha256(f"{session_id}:{revision}".encode("utf-8")).hexdigest()[:16]
+    return f"{session['sha256']}-{suffix}"
+
+def get_parser(session_id: str, session: Optional[dict] = None, progress=None):
+    if session is None:
+        session = get_session(session_id)
+    key = model_key(session_id, session)
     
-    filepath = SESSIONS[session_id]["filepath"]
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="File not found on server")
-        
-    parser = AvevaParser(filepath)
+    with MODELS_LOCK:
+        parser = MODELS.get(key)
+        if session["sha256"] in MODEL_COSTS:
+            MODEL_COSTS.move_to_end(session["sha256"])
+    if parser is not None:
+        CACHE_REQUESTS.inc(cache="model", result="hit")
+        return parser
+    
+    CACHE_REQUESTS.inc(cache="model", result="miss")
+    if key == session["sha256"]:
+        return FLIGHTS.do(("model", key), lambda: load_model(key, progress))
+    return FLIGHTS.do(("model", key), lambda: load_edited_model(session_id, session, key, progress))
+
+def load_edited_model(session_id: str, session: dict, key: str, progress=None):
+    """Rebuilds a session's edited model (e.g. in another worker) by replaying its edit log on the shared dump."""
+    with MODELS_LOCK:
+        parser = MODELS.get(key)
+    if parser is not None:
+        return parser
+    
+    from .bulk_edits import read_edit_log
+    
+    sha256 = session["sha256"]
+    base = get_parser(session_id, {"sha256": sha256}, progress)
+    edits = read_edit_log(BLOBS.edit_log_path(sha256, session_id), session["revision"])
+    parser = base.copy({edit[0] for edit in edits})
+    parser.update_tag_values(edits)
+    return hold_edited_model(session_id, session["revision"], key, parser)
+
+def hold_edited_model(session_id: str, revision: int, key: str, parser):
+    """
+    Caches a session's edited model. Only the newest revision seen by this
+    worker is kept: it replaces the previous one, even when another worker
+    published the new revision, and an older revision is not cached at all.
+    """
+    with MODELS_LOCK:
+        held = EDITED_MODELS.get(session_id)
+        if held is not None and held[0] > revision:
+            return parser
+        parser = MODELS.setdefault(key, parser)
+        EDITED_MODELS[session_id] = (revision, key)
+    if held is not None and held[1] != key:
+        forget_edited_model(held[1])
+    return parser
+
+def parse_model(filepath: str, snapshot_path: str, mode: str, progress=None):
+    """
+    Parses a dump into the model admission chose: a disk-backed snapshot for
+    admission.DISK, otherwise an in-memory parser. Either way the snapshot is
+    (re)written at snapshot_path.
+    """
+    from .admission import DISK
+    from .aveva_parser import AvevaParser
+    from .snapshot import StreamingSnapshotWriter, load_snapshot, write_snapshot
+    
+    if mode == DISK:
+        writer = StreamingSnapshotWriter(filepath, snapshot_path, progress)
+        try:
+            writer.parse()
+            writer.commit()
+        finally:
+            writer.abort()
+        parser = load_snapshot(snapshot_path, filepath, lazy=True)
+        if parser is None:
+            raise RuntimeError("Snapshot was removed while it was being loaded")
+        return parser
+    parser = AvevaParser(filepath, progress)
     parser.parse()
+    # The model outlives this request
+    parser.progress = None
+    write_snapshot(parser, snapshot_path)
     return parser
 
+def load_model(sha256: str, progress=None):
+    from .admission import DISK, DumpScan, scan_dump
+    from .snapshot import load_snapshot, read_snapshot_index
+    
+    with MODELS_LOCK:
+        parser = MODELS.get(sha256)
+    if parser is not None:
+        # Another request finished loading it while we were queued
+        return parser
+    
+    filepath = BLOBS.blob_path(sha256)
+    if not os.path.exists(filepath):
+        raise HTTPException(status_code=404, detail="File not found on server")
+    
+    snapshot_path = BLOBS.snapshot_path(sha256)
+    size = os.path.getsize(filepath)
+    started = time.perf_counter()
+    index = read_snapshot_index(snapshot_path) if os.path.exists(snapshot_path) else None
+    if index is not None:
+        # The index alone tells the size of the model
+        mode, cost = admit_model(DumpScan.from_snapshot_index(index, size))
+        try:
+            parser = load_snapshot(snapshot_path, filepath, lazy=(mode == DISK))
+        except Exception:
+            BUDGET.release(cost)
+            raise
+        if parser is not None:
+            record_parse("snapshot", time.perf_counter() - started, size)
+            return hold_model(sha256, parser, cost)
+        # Removed or replaced by an unreadable file since the index was read
+        BUDGET.release(cost)
+    
+    with open(filepath, "rb") as f:
+        scan = scan_dump(f, progress=progress)
+    mode, cost = admit_model(scan)
+    try:
+        parser = parse_model(filepath, snapshot_path, mode, progress)
+    except Exception:
+        BUDGET.release(cost)
+        raise
+    record_parse("file", time.perf_counter() - started, size)
+    return hold_model(sha256, parser, cost)
+
+def forget_model(sha256: str):
+    """Called once no session references a dump any more."""
+    with MODELS_LOCK:
+        # Dropped before the files: a disk-backed model keeps its snapshot mapped
+        MODELS.pop(sha256, None)
+        cost = MODEL_COSTS.pop(sha256, 0)
+        for key in [k for k in DATASETS if k[0] == sha256]:
+            del DATASETS[key]
+    BUDGET.release(cost)
+    BLOBS.remove(sha256)
+
+def forget_edited_model(key: str):
+    with MODELS_LOCK:
+        MODELS.pop(key, None)
+        for k in [k for k in DATASETS if k[0] == key]:
+            del DATASETS[k]
+
+def drop_session(session_id: str):
+    """Ends a session. The dump, its model and artifacts go when the last session referencing them does."""
+    record = SESSIONS.release(session_id, on_last_reference=forget_model)
+    if record is None:
+        return False
+    WARMUP.cancel(session_id)
+    with MODELS_LOCK:
+        EDITED_MODELS.pop(session_id, None)
+    
+    if record.get("revision"):
+        # Edits are private to the session
+        key = model_key(session_id, record)
+        forget_edited_model(key)
+        BLOBS.remove_artifacts(key)
+        try:
+            os.remove(BLOBS.edit_log_path(record["sha256"], session_id))
+        except FileNotFoundError:
+            pass
+    return True
+
+# Resumable chunked uploads, assembled under UPLOAD_DIR/chunked. The worker
+# that starts an upload hashes and scans it while the chunks arrive.
+# { upload_id: IncrementalIngest }
+CHUNKED = ChunkedUploadStore(UPLOAD_DIR)
+CHUNKED_INGESTS = {}
+CHUNKED_LOCK = threading.Lock()
+
+def release_ingest(ingest):
+    """Gives back what an IncrementalIngest holds that was not handed over to a model."""
+    # After any background advance(): it would feed an aborted snapshot writer
+    ingest.close()
+    BUDGET.release(ingest.reserved)
+    ingest.reserved = 0
+    abort = getattr(ingest.parser, "abort", None)
+    if abort is not None:
+        abort()
+
+def discard_ingest(upload_id: str):
+    with CHUNKED_LOCK:
+        ingest = CHUNKED_INGESTS.pop(upload_id, None)
+    if ingest is not None:
+        release_ingest(ingest)
+
+def sweep_chunked_uploads(now: float, max_age: float):
+    freed = CHUNKED.sweep(now, max_age)
+    # Scans of uploads that were abandoned, or finalized by another worker
+    with CHUNKED_LOCK:
+        gone = [u for u in CHUNKED_INGESTS if CHUNKED.info(u) is None]
+    for upload_id in gone:
+        discard_ingest(upload_id)
+    return freed
+
+# Idle sessions expire after AVEVA_SESSION_TTL seconds; UPLOAD_DIR is kept under
+# AVEVA_DISK_QUOTA_MB by evicting least recently used artifacts, then sessions
+LIFECYCLE = SessionLifecycle(
+    SESSIONS,
+    BLOBS,
+    drop_session,
+    idle_ttl=float(os.environ.get("AVEVA_SESSION_TTL", 4 * 3600)),
+    disk_quota=int(float(os.environ.get("AVEVA_DISK_QUOTA_MB", 2048)) * 1024 * 1024),
+    sweep_interval=float(os.environ.get("AVEVA_SWEEP_INTERVAL", 300)),
+    sweepers=[sweep_chunked_uploads],
+)
+
+@contextmanager
+def progress_scope(progress_id: Optional[str]):
+    """
+    Reporter for a request's long-running work. The stream gets its final
+    "done" event when the block exits, with the error if it failed.
+    """
+    try:
+        yield PROGRESS.reporter(progress_id)
+    except HTTPException as e:
+        PROGRESS.close(progress_id, error=str(e.detail))
+        raise
+    except Exception as e:
+        PROGRESS.close(progress_id, error=str(e))
+        raise
+    else:
+        PROGRESS.close(progress_id)
+
+ARTIFACT_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}(-[0-9a-f]{16})?_[a-z]+_[0-9a-f]{16}$")
+
+def response_coding(request: Request, media_type: str):
+    """
+    Content coding for a download: gzip or deflate for CSVs if the client
+    accepts it. Range requests (resumed downloads) get the file as stored;
+    ranges of a compressed stream cannot be served without compressing the
+    whole file first.
+    """
+    if media_type not in COMPRESSIBLE_TYPES or "range" in request.headers:
+        return None
+    return negotiate_coding(request.headers.get("accept-encoding"))
+
+def vary_headers(media_type: str):
+    # The body of compressible downloads depends on Accept-Encoding; caches must key on it
+    return {"Vary": "Accept-Encoding"} if media_type in COMPRESSIBLE_TYPES else {}
+
+def artifact_response(path: str, filename: str, media_type: str, coding: Optional[str], headers: dict):
+    """The artifact file as is, or compressed on the fly while it is sent."""
+    headers.update(vary_headers(media_type))
+    if coding is None:
+        return FileResponse(path, filename=filename, media_type=media_type, headers=headers)
+    headers["Content-Encoding"] = coding
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(iter_compressed(iter_file(path), coding), media_type=media_type, headers=headers)
+
+def serve_artifact(request: Request, session_id: str, operation: str, params: dict, filename: str, media_type: str, build,
+                   progress_id: Optional[str] = None):
+    """
+    Serves a derived file from the artifact cache, building it on first use.
+    Responses carry a strong ETag; a matching If-None-Match gets 304 without
+    touching the model, and Range requests are answered by FileResponse.
+    build(path, parser, progress) must write the artifact through artifact_writer().
+    """
+    with progress_scope(progress_id) as progress:
+        return _serve_artifact(request, session_id, operation, params, filename, media_type, build, progress)
+
+def _serve_artifact(request, session_id, operation, params, filename, media_type, build, progress):
+    session = get_session(session_id)
+    artifact_key = BLOBS.artifact_key(model_key(session_id, session), operation, params)
+    coding = response_coding(request, media_type)
+    etag = make_etag(artifact_key, coding)
+    path = BLOBS.artifact_file(artifact_key, filename)
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        CACHE_REQUESTS.inc(cache="artifact", result="hit")
+        LIFECYCLE.touch_artifact(path)
+        return Response(status_code=304, headers={"ETag": etag, **vary_headers(media_type)})
+    
+    if os.path.exists(path):
+        CACHE_REQUESTS.inc(cache="artifact", result="hit")
+        LIFECYCLE.touch_artifact(path)
+    else:
+        CACHE_REQUESTS.inc(cache="artifact", result="miss")
+        build_artifact(session_id, session, artifact_key, path, build, progress)
+    
+    headers = {
+        "ETag": etag,
+        # Re-download (or resume) later with GET and the usual conditional headers
+        "Content-Location": f"/api/artifact/{session_id}/{artifact_key}/{filename}",
+        "Cache-Control": "private, no-cache",
+    }
+    return artifact_response(path, filename, media_type, coding, headers)
+
+def build_artifact(session_id, session, artifact_key, path, build, progress=None):
+    # Double clicks and several users on the same dump share one build
+    FLIGHTS.do(
+        ("artifact", path),
+        lambda: os.path.exists(path) or build(path, get_parser(session_id, session, progress), progress)
+    )
+
+def write_dump_lines(path, lines):
+    # RULE: Use utf-16 for Aveva Dump files and newline=''
+    with artifact_writer(path, 'w', encoding='utf-16', newline='') as f:
+        for line in lines:
+            f.write(line)
+
 @app.post("/api/upload", response_model=SessionResponse)
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...), progress_id: Optional[str] = None):
+    with progress_scope(progress_id) as progress:
+        return await _upload_file(file, progress, background_tasks)
+
+async def _upload_file(file: UploadFile, progress, background_tasks: BackgroundTasks):
+    staging_path = BLOBS.staging_path()
+    return await ingest_session(file.file, file.filename, staging_path, progress, background_tasks)
+
+async def ingest_session(src, filename: str, staging_path: str, progress, background_tasks: BackgroundTasks):
+    """Ingests an uploaded dump (CSV or ZIP file object) and opens a session on it."""
+    from .admission import DISK, MEMORY, DumpScan
+    from .snapshot import read_snapshot_index
+    from .uploads import UploadError, ingest_upload
+    
+    reserved = []
+    
+    def admit(scan):
+        # Only the size is known before the single pass over the upload: the
+        # model is built in memory if its (pessimistic) estimate fits right
+        # now, else streamed into a snapshot and admitted from its index
+        # afterwards, as for chunked uploads. Uploads never queue for memory:
+        # that would hold a threadpool thread for up to AVEVA_ADMISSION_TIMEOUT.
+        if scan.memory_estimate() > BUDGET.max_model:
+            return DISK
+        try:
+            mode, cost = BUDGET.admit(scan, wait=False)
+        except AdmissionRejected:
+            return DISK
+        if mode != MEMORY:
+            BUDGET.release(cost)
+            return DISK
+        reserved.append(cost)
+        return mode
+    
+    try:
+        # Hash and section-scan in one pass off the event loop
+        started = time.perf_counter()
+        result = await run_in_threadpool(ingest_upload, src, filename, staging_path, progress, admit)
+        record_parse("upload", time.perf_counter() - started, result.size)
+    except UploadError as e:
+        BUDGET.release(sum(reserved))
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        BUDGET.release(sum(reserved))
+        raise HTTPException(status_code=400, detail=f"Failed to parse file: {str(e)}")
+    
+    mode = result.mode
+    try:
+        if result.snapshot_path is not None:
+            index = await run_in_threadpool(read_snapshot_index, result.snapshot_path)
+            mode, cost = await run_in_threadpool(admit_model, DumpScan.from_snapshot_index(index, result.size), False)
+            reserved.append(cost)
+        session_id, _ = await run_in_threadpool(
+            open_session, result.filename, result.sha256, staging_path, background_tasks,
+            sum(reserved), result.parser, result.snapshot_path, mode
+        )
+    except Exception:
+        BUDGET.release(sum(reserved))
+        for path in (staging_path, result.snapshot_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+        raise
+    return await run_in_threadpool(session_response, session_id, result.filename)
+
+def open_session(filename: str, sha256: str, staging_path: str, background_tasks: BackgroundTasks,
+                 reserved: int, parser=None, snapshot_part: Optional[str] = None, mode: Optional[str] = None):
+    """
+    Registers a session on an ingested dump and caches its model: `parser`,
+    or the snapshot written during the ingest (disk-backed unless mode is
+    admission.MEMORY). `reserved` bytes of the memory budget are already
+    held for the model. Returns (session_id, parser).
+    """
+    from .admission import DISK, MEMORY
+    from .snapshot import load_snapshot, write_snapshot
+    
     session_id = str(uuid.uuid4())
-    file_location = os.path.join(UPLOAD_DIR, f"{session_id}_{file.filename}")
-    
-    if file.filename.lower().endswith(".zip"):
-        content = await file.read()
-        with zipfile.ZipFile(io.BytesIO(content)) as z:
-            csv_files = [n for n in z.namelist() if n.lower().endswith(".csv")]
-            if not csv_files:
-                raise HTTPException(status_code=400, detail="No CSV file found in ZIP")
-            
-            target_csv = csv_files[0]
-            with z.open(target_csv) as zf, open(file_location, "wb") as f:
-                shutil.copyfileobj(zf, f)
-            # Update filename to the extracted CSV name for reference
-            file.filename = target_csv 
+    # Register the session before committing the blob: it holds the reference
+    # that stops a concurrent drop_session() from deleting the shared file
+    SESSIONS.put(session_id, LIFECYCLE.new_record(
+        filename=filename,
+        sha256=sha256,
+        revision=0
+    ))
+    blob_path = BLOBS.commit(staging_path, sha256)
+    snapshot_path = BLOBS.snapshot_path(sha256)
+    
+    if parser is None:
+        # The dump was streamed into a snapshot instead of a model
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_part)
+        else:
+            os.replace(snapshot_part, snapshot_path)
+        parser = load_snapshot(snapshot_path, blob_path, lazy=(mode != MEMORY))
+        if parser is None:
+            # The snapshot already on disk is unreadable; parse the dump again
+            parser = parse_model(blob_path, snapshot_path, mode or DISK)
     else:
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-        
+        parser.filepath = blob_path
+    # Sessions on an already known dump reuse its cached model
+    parser = hold_model(sha256, parser, reserved)
+    
+    if not os.path.exists(snapshot_path):
+        # Other workers, and reloads after eviction, need it; write it after the response is sent
+        background_tasks.add_task(write_snapshot, parser, snapshot_path)
+    background_tasks.add_task(WARMUP.submit, session_id, WARMUP_STEPS)
+    return session_id, parser
+
+def session_response(session_id: str, filename: str):
+    templates = name_page(session_id, "template_names")
+    areas = name_page(session_id, "area_names")
+    
+    return SessionResponse(
+        session_id=session_id,
+        filename=filename,
+        total_templates=templates.total,
+        total_areas=areas.total,
+        templates=templates.items,
+        areas=areas.items,
+        templates_cursor=templates.next_cursor,
+        areas_cursor=areas.next_cursor
+    )
+
+def name_page(session_id: str, name: str, prefix: Optional[str] = None, cursor: Optional[str] = None,
+              limit: int = SESSION_PAGE_SIZE):
+    """A page of a template_names or area_names dataset, sorted case-insensitively."""
+    from .browse import CursorError
+    
+    dataset = get_dataset(session_id, name)
     try:
-        # Validate by parsing
-        parser = AvevaParser(file_location)
-        parser.parse()
-        
-        SESSIONS[session_id] = {
-            "filepath": file_location,
-            "filename": file.filename
-        }
-        
-        templates = parser.get_template_names()
-        display_templates = [t for t in templates if t != "$Area"]
-        areas = parser.get_area_names()
-        
-        return SessionResponse(
-            session_id=session_id,
-            filename=file.filename,
-            total_templates=len(templates),
-            total_areas=len(areas),
-            templates=display_templates,
-            areas=areas
+        rows, next_cursor, total = dataset.page(dataset.columns[0], limit=limit, cursor=cursor, prefix=prefix)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return NamePage(items=[row[0] for row in rows], next_cursor=next_cursor, total=total)
+
+# Name lists of a session: prefix narrows to names starting with it
+# (case-insensitive), next_cursor is passed back as cursor for the next page.
+
+@app.get("/api/session/{session_id}/templates", response_model=NamePage)
+def list_templates(session_id: str, prefix: Optional[str] = None, cursor: Optional[str] = None,
+                   limit: int = Query(SESSION_PAGE_SIZE, ge=1, le=1000)):
+    return name_page(session_id, "template_names", prefix, cursor, limit)
+
+@app.get("/api/session/{session_id}/areas", response_model=NamePage)
+def list_areas(session_id: str, prefix: Optional[str] = None, cursor: Optional[str] = None,
+               limit: int = Query(SESSION_PAGE_SIZE, ge=1, le=1000)):
+    return name_page(session_id, "area_names", prefix, cursor, limit)
+
+# Chunked upload protocol, for dumps too large for one request (or over a
+# serverless body limit) and for resuming after a dropped connection:
+#   POST   /api/upload/chunked                      {filename, size, chunk_size?, sha256?}
+#   PUT    /api/upload/chunked/{upload_id}/{index}  raw chunk, X-Chunk-Sha256: <hex>
+#   GET    /api/upload/chunked/{upload_id}          which chunks are missing (resume)
+#   POST   /api/upload/chunked/{upload_id}/finalize same response as /api/upload
+#   DELETE /api/upload/chunked/{upload_id}
+# Chunks can be sent in any order and in parallel.
+
+class ChunkedUploadRequest(BaseModel):
+    filename: str
+    size: int
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    sha256: Optional[str] = None
+
+class ChunkedUploadStatus(BaseModel):
+    upload_id: str
+    filename: str
+    size: int
+    chunk_size: int
+    chunks: int
+    received: int
+    missing: List[int]
+
+def get_chunked_upload(upload_id: str):
+    info = CHUNKED.info(upload_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return info
+
+def chunked_status(info: dict):
+    received = set(CHUNKED.received(info["upload_id"]))
+    return ChunkedUploadStatus(
+        upload_id=info["upload_id"],
+        filename=info["filename"],
+        size=info["size"],
+        chunk_size=info["chunk_size"],
+        chunks=info["chunks"],
+        received=len(received),
+        missing=[i for i in range(info["chunks"]) if i not in received]
+    )
+
+@app.post("/api/upload/chunked", response_model=ChunkedUploadStatus)
+def start_chunked_upload(req: ChunkedUploadRequest):
+    from .admission import MEMORY, DumpScan
+    from .aveva_parser import AvevaParser
+    from .snapshot import StreamingSnapshotWriter
+    
+    if req.size > LIFECYCLE.disk_quota:
+        raise HTTPException(status_code=413, detail="File is larger than the upload quota")
+    try:
+        info = CHUNKED.create(os.path.basename(req.filename), req.size, req.chunk_size, req.sha256)
+    except ChunkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not info["filename"].lower().endswith(".zip"):
+        # Scan while the chunks arrive (ZIPs can only be read once complete).
+        # Only the size is known yet: the model is built in memory if its
+        # (pessimistic) estimate fits the budget right now, else streamed
+        # into a snapshot and admitted from it at finalize.
+        data_path = CHUNKED.data_path(info["upload_id"])
+        try:
+            mode, cost = BUDGET.admit(DumpScan.from_size(info["size"]), wait=False)
+        except AdmissionRejected:
+            mode, cost = None, 0
+        if mode == MEMORY:
+            parser = AvevaParser(data_path)
+        else:
+            BUDGET.release(cost)
+            cost = 0
+            parser = StreamingSnapshotWriter(data_path, data_path + ".snap.part")
+        with CHUNKED_LOCK:
+            CHUNKED_INGESTS[info["upload_id"]] = IncrementalIngest(CHUNKED, info, parser, cost)
+    return chunked_status(info)
+
+@app.get("/api/upload/chunked/{upload_id}", response_model=ChunkedUploadStatus)
+def chunked_upload_status(upload_id: str):
+    return chunked_status(get_chunked_upload(upload_id))
+
+@app.put("/api/upload/chunked/{upload_id}/{index}")
+async def put_chunk(upload_id: str, index: int, request: Request, background_tasks: BackgroundTasks):
+    info = get_chunked_upload(upload_id)
+    data = await request.body()
+    try:
+        await run_in_threadpool(CHUNKED.write_chunk, info, index, data, request.headers.get("x-chunk-sha256"))
+    except ChunkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadClosed as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except FileNotFoundError:
+        # Aborted or finalized since get_chunked_upload()
+        raise HTTPException(status_code=404, detail="Upload not found")
+    
+    with CHUNKED_LOCK:
+        ingest = CHUNKED_INGESTS.get(upload_id)
+    if ingest is not None:
+        # Scan whatever is now contiguous after the response is sent
+        background_tasks.add_task(ingest.advance, False)
+    return {"upload_id": upload_id, "index": index, "status": "received"}
+
+@app.post("/api/upload/chunked/{upload_id}/finalize", response_model=SessionResponse)
+async def finalize_chunked_upload(upload_id: str, background_tasks: BackgroundTasks, progress_id: Optional[str] = None):
+    with progress_scope(progress_id) as progress:
+        return await _finalize_chunked_upload(upload_id, progress, background_tasks)
+
+async def _finalize_chunked_upload(upload_id: str, progress, background_tasks: BackgroundTasks):
+    info = get_chunked_upload(upload_id)
+    missing = info["chunks"] - len(CHUNKED.received(upload_id))
+    if missing:
+        raise HTTPException(status_code=409, detail=f"{missing} chunk(s) missing")
+    if not CHUNKED.claim_finalize(upload_id):
+        raise HTTPException(status_code=409, detail="Upload is already being finalized")
+    
+    with CHUNKED_LOCK:
+        ingest = CHUNKED_INGESTS.pop(upload_id, None)
+    data_path = CHUNKED.data_path(upload_id)
+    try:
+        if ingest is None:
+            # Started by another worker (or before a restart), or a ZIP: ingest the assembled file
+            if info["sha256"] and await run_in_threadpool(CHUNKED.file_sha256, upload_id) != info["sha256"]:
+                raise HTTPException(status_code=400, detail="SHA-256 of the assembled file does not match")
+            with open(data_path, "rb") as src:
+                return await ingest_session(src, info["filename"], BLOBS.staging_path(), progress, background_tasks)
+        return await _open_ingested(info, ingest, background_tasks)
+    finally:
+        if ingest is not None:
+            release_ingest(ingest)
+        CHUNKED.remove(upload_id)
+
+async def _open_ingested(info: dict, ingest, background_tasks: BackgroundTasks):
+    from .admission import DumpScan
+    from .snapshot import read_snapshot_index
+    
+    # The chunks not scanned yet; after close() no background advance() touches the parser
+    await run_in_threadpool(ingest.advance)
+    await run_in_threadpool(ingest.close)
+    sha256 = ingest.digest.hexdigest()
+    if info["sha256"] and sha256 != info["sha256"]:
+        raise HTTPException(status_code=400, detail="SHA-256 of the assembled file does not match")
+    record_parse("chunked", ingest.seconds, info["size"])
+    data_path = CHUNKED.data_path(info["upload_id"])
+    
+    if ingest.reserved:
+        # Handed over to the model once the session is open; until then
+        # release_ingest() gives it back if anything fails
+        session_id, _ = await run_in_threadpool(
+            open_session, info["filename"], sha256, data_path, background_tasks, ingest.reserved, ingest.parser
         )
-        
-    except Exception as e:
-        if os.path.exists(file_location):
-            try:
-                os.remove(file_location)
-            except:
-                pass
-        raise HTTPException(status_code=400, detail=f"Failed to parse file: {str(e)}")
+        ingest.reserved = 0
+    else:
+        snapshot_part = await run_in_threadpool(ingest.parser.commit)
+        index = await run_in_threadpool(read_snapshot_index, snapshot_part)
+        mode, reserved = await run_in_threadpool(admit_model, DumpScan.from_snapshot_index(index, info["size"]))
+        try:
+            session_id, _ = await run_in_threadpool(
+                open_session, info["filename"], sha256, data_path, background_tasks, reserved, None, snapshot_part, mode
+            )
+        except Exception:
+            BUDGET.release(reserved)
+            raise
+    return await run_in_threadpool(session_response, session_id, info["filename"])
+
+@app.delete("/api/upload/chunked/{upload_id}")
+def abort_chunked_upload(upload_id: str):
+    get_chunked_upload(upload_id)
+    discard_ingest(upload_id)
+    CHUNKED.remove(upload_id)
+    return {"status": "deleted"}
+
+@app.delete("/api/session/{session_id}")
+def delete_session(session_id: str):
+    if not drop_session(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"status": "deleted"}
+
+@app.get("/api/status")
+def status():
+    return {**LIFECYCLE.status(), **BUDGET.status(), **WARMUP.status()}
+
+def models_cached():
+    with MODELS_LOCK:
+        return len(MODELS)
+
+METRICS.gauge("aveva_active_sessions", "Sessions in the session store", function=lambda: len(SESSIONS))
+METRICS.gauge("aveva_upload_dir_bytes", "Disk used by UPLOAD_DIR", function=LIFECYCLE.disk_usage)
+METRICS.gauge("aveva_upload_dir_quota_bytes", "AVEVA_DISK_QUOTA_MB in bytes", function=lambda: LIFECYCLE.disk_quota)
+METRICS.gauge("aveva_models_cached", "Parsed models held by this worker", function=models_cached)
+METRICS.gauge("aveva_single_flight_in_flight", "Distinct operations running", function=FLIGHTS.in_flight)
+METRICS.counter("aveva_single_flight_coalesced_total", "Requests that shared another request's result", function=lambda: FLIGHTS.coalesced)
+METRICS.gauge("aveva_memory_budget_bytes", "AVEVA_MEMORY_BUDGET_MB in bytes", function=lambda: BUDGET.limit)
+METRICS.gauge("aveva_memory_reserved_bytes", "Estimated memory reserved by the models of this worker", function=lambda: BUDGET.used)
+METRICS.gauge("aveva_admission_waiting", "Requests queued for room in the memory budget", function=lambda: BUDGET.waiting)
+for _name, _help in [
+    ("admitted_memory", "Models admitted fully in memory"),
+    ("admitted_disk", "Models admitted disk-backed"),
+    ("queued", "Requests that waited for room in the memory budget"),
+    ("rejected", "Requests rejected with 503 by the memory budget"),
+]:
+    METRICS.counter(f"aveva_admission_{_name}_total", _help, function=lambda _name=_name: BUDGET.counters[_name])
+for _name in ("completed", "cancelled", "failed"):
+    METRICS.counter(f"aveva_warmups_{_name}_total", f"Background warm-ups after upload {_name}",
+                    function=lambda _name=_name: WARMUP.counters[_name])
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus scrape endpoint. Values are per worker process, except the
+    session count and UPLOAD_DIR usage, which are shared.
+    """
+    # The limiter can only be inspected from the event loop
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    stats = limiter.statistics()
+    THREADPOOL.set(stats.borrowed_tokens, state="busy")
+    THREADPOOL.set(stats.tasks_waiting, state="queued")
+    THREADPOOL.set(limiter.total_tokens, state="limit")
+    # Scrapes walk UPLOAD_DIR; keep that off the event loop
+    body = await run_in_threadpool(METRICS.render)
+    return Response(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/progress/{progress_id}")
+async def progress_events(progress_id: str, timeout: float = Query(600, ge=1, le=3600)):
+    """
+    Server-sent events for a request started with the same progress_id:
+    "progress" events (bytes and rows scanned, current template, rows per
+    second) at most every 0.5s, then one "done" event.
+    """
+    if not PROGRESS.valid_id(progress_id):
+        raise HTTPException(status_code=400, detail="progress_id must be 8-64 characters of [A-Za-z0-9_-]")
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(PROGRESS.stream(progress_id, timeout), media_type="text/event-stream", headers=headers)
+
+@app.get("/api/artifact/{session_id}/{artifact_key}/{filename}")
+def get_artifact(request: Request, session_id: str, artifact_key: str, filename: str):
+    """Cached artifact by the Content-Location returned when it was generated."""
+    session = get_session(session_id)
+    # Only artifacts of the model this session currently sees
+    key_prefix = model_key(session_id, session) + "_"
+    if not ARTIFACT_KEY_PATTERN.match(artifact_key) or not artifact_key.startswith(key_prefix) or os.path.basename(filename) != filename:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    coding = response_coding(request, media_type)
+    etag = make_etag(artifact_key, coding)
+    path = BLOBS.artifact_file(artifact_key, filename)
+    if not os.path.exists(path):
+        # Evicted; the client has to request it again with the original POST
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    
+    LIFECYCLE.touch_artifact(path)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, **vary_headers(media_type)})
+    return artifact_response(path, filename, media_type, coding, {"ETag": etag, "Cache-Control": "private, no-cache"})
 
 class ExtractTemplateRequest(BaseModel):
     session_id: str
     templates: List[str]
+    progress_id: Optional[str] = None
 
 @app.post("/api/extract/template")
-def extract_template(req: ExtractTemplateRequest):
-    parser = get_parser(req.session_id)
-    
-    lines = []
-    lines.extend(parser.get_headers())
-    
-    if "$Area" in parser.get_template_names():
-        # Ensure blank line logic
-        if lines and lines[-1].strip() != "": lines.append("\n")
-        lines.extend(parser.get_template_content("$Area"))
-    
-    for tmpl in req.templates:
-        if lines and lines[-1].strip() != "": lines.append("\n")
-        lines.extend(parser.get_template_content(tmpl))
+def extract_template(req: ExtractTemplateRequest, request: Request):
+    def build(path, parser, progress):
         
-    # Create temp file to serve
-    output_filename = f"extracted_templates.csv"
-    output_path = os.path.join(UPLOAD_DIR, f"{req.session_id}_{output_filename}")
-    
-    with open(output_path, 'w', encoding='utf-16', newline='') as f:
-        for line in lines:
-            f.write(line)
+        lines = []
+        lines.extend(parser.get_headers())
+        
+        if "$Area" in parser.get_template_names():
+            # Ensure blank line logic
+            if lines and lines[-1].strip() != "": lines.append("\n")
+            lines.extend(parser.get_template_content("$Area"))
+        
+        for tmpl in req.templates:
+            if lines and lines[-1].strip() != "": lines.append("\n")
+            lines.extend(parser.get_template_content(tmpl))
             
-    return FileResponse(output_path, filename=output_filename, media_type='text/csv')
+        write_dump_lines(path, lines)
+    
+    # Template order is kept in the output, so it is part of the key as given
+    params = {"templates": req.templates}
+    return serve_artifact(request, req.session_id, "template", params, "extracted_templates.csv", 'text/csv', build, req.progress_id)
 
 class ExtractAreaRequest(BaseModel):
     session_id: str
     areas: List[str]
+    progress_id: Optional[str] = None
 
 @app.post("/api/extract/area")
-def extract_area(req: ExtractAreaRequest):
-    parser = get_parser(req.session_id)
-    
-    # Logic from main_gui.py perform_area_extraction
-    lines = []
-    lines.extend(parser.get_headers())
-    
-    if "$Area" in parser.get_template_names():
-        if lines and lines[-1].strip() != "": lines.append("\n")
-        lines.extend(parser.get_template_content("$Area"))
-
-    for tmpl in parser.get_template_names():
-        if tmpl == "$Area": continue
-        
-        content = parser.get_template_content(tmpl)
-        area_col_idx = parser.get_column_index(tmpl, "Area")
+def extract_area(req: ExtractAreaRequest, request: Request):
+    def build(path, parser, progress):
         
-        if area_col_idx == -1:
-            continue 
-            
-        matching_rows = []
-        for line in content[2:]: # Data rows
-            parts = line.strip().split(',')
-            if len(parts) > area_col_idx:
-                 val = parts[area_col_idx]
-                 if val in req.areas:
-                    matching_rows.append(line)
+        # Logic from main_gui.py perform_area_extraction
+        lines = []
+        lines.extend(parser.get_headers())
         
-        if matching_rows:
+        if "$Area" in parser.get_template_names():
             if lines and lines[-1].strip() != "": lines.append("\n")
-            lines.append(content[0]) # :TEMPLATE=...
-            lines.append(content[1]) # Headers
-            lines.extend(matching_rows)
+            lines.extend(parser.get_template_content("$Area"))
+
+        for tmpl in parser.get_template_names():
+            if tmpl == "$Area": continue
             
-    output_filename = f"extracted_areas.csv"
-    output_path = os.path.join(UPLOAD_DIR, f"{req.session_id}_{output_filename}")
-    
-    with open(output_path, 'w', encoding='utf-16', newline='') as f:
-        for line in lines:
-            f.write(line)
+            content = parser.get_template_content(tmpl)
+            area_col_idx = parser.get_column_index(tmpl, "Area")
             
-    return FileResponse(output_path, filename=output_filename, media_type='text/csv')
+            if area_col_idx == -1:
+                continue 
+                
+            matching_rows = []
+            for line in content[2:]: # Data rows
+                parts = line.strip().split(',')
+                if len(parts) > area_col_idx:
+                     val = parts[area_col_idx]
+                     if val in req.areas:
+                        matching_rows.append(line)
+            
+            if matching_rows:
+                if lines and lines[-1].strip() != "": lines.append("\n")
+                lines.append(content[0]) # :TEMPLATE=...
+                lines.append(content[1]) # Headers
+                lines.extend(matching_rows)
+                
+        write_dump_lines(path, lines)
+    
+    params = {"areas": sorted(set(req.areas))}
+    return serve_artifact(request, req.session_id, "area", params, "extracted_areas.csv", 'text/csv', build, req.progress_id)
 
 class MatrixRequest(BaseModel):
     session_id: str
+    progress_id: Optional[str] = None
 
 @app.post("/api/extract/matrix")
-def extract_matrix(req: MatrixRequest):
-    parser = get_parser(req.session_id)
-    analyzer = ExtensionAnalyzer(parser)
-    matrices = analyzer.get_plc_matrices_by_template()
-    
-    # Create a zip file in memory
-    zip_io = io.BytesIO()
-    with zipfile.ZipFile(zip_io, mode='w', compression=zipfile.ZIP_DEFLATED) as temp_zip:
-        for tmpl, (headers, rows) in matrices.items():
-            clean_tmpl = tmpl.replace('$', '').replace(':', '')
-            filename = f"{clean_tmpl}_Matrix.csv"
-            
-            # Write CSV to string
-            csv_io = io.StringIO()
-            writer = csv.writer(csv_io)
-            writer.writerow(headers)
-            writer.writerows(rows)
-            
-            temp_zip.writestr(filename, csv_io.getvalue().encode('utf-8-sig'))
+def extract_matrix(req: MatrixRequest, request: Request):
+    def build(path, parser, progress):
+        import zipfile
+        from .extension_analyzer import ExtensionAnalyzer
+        
+        analyzer = ExtensionAnalyzer(parser, progress)
+        matrices = analyzer.get_plc_matrices_by_template()
+        
+        with artifact_writer(path) as f, zipfile.ZipFile(f, mode='w', compression=zipfile.ZIP_DEFLATED) as temp_zip:
+            for tmpl, (headers, rows) in matrices.items():
+                clean_tmpl = tmpl.replace('$', '').replace(':', '')
+                filename = f"{clean_tmpl}_Matrix.csv"
+                
+                # Write CSV to string
+                csv_io = io.StringIO()
+                writer = csv.writer(csv_io)
+                writer.writerow(headers)
+                writer.writerows(rows)
+                
+                write_zip_member(temp_zip, filename, csv_io.getvalue().encode('utf-8-sig'))
     
-    zip_io.seek(0)
-    return StreamingResponse(
-        iter([zip_io.getvalue()]), 
-        media_type="application/zip", 
-        headers={"Content-Disposition": f"attachment; filename=plc_matrices.zip"}
-    )
-
-from fastapi.responses import StreamingResponse
-
+    return serve_artifact(request, req.session_id, "matrix", {}, "plc_matrices.zip", "application/zip", build, req.progress_id)
 
 class ExtractAddressRequest(BaseModel):
     session_id: str
     alarm_only: bool = False
+    progress_id: Optional[str] = None
 
 @app.post("/api/extract/addresses")
-def extract_addresses(req: ExtractAddressRequest):
-    parser = get_parser(req.session_id)
-    analyzer = ExtensionAnalyzer(parser)
-    area_data = analyzer.extract_address_map_by_area(alarm_only=req.alarm_only)
-    
-    if not area_data:
-        raise HTTPException(status_code=404, detail="No address data found.")
-    
-    # Create zip
-    zip_io = io.BytesIO()
-    with zipfile.ZipFile(zip_io, mode='w', compression=zipfile.ZIP_DEFLATED) as temp_zip:
-        timestamp = "Export" # simplified
-        for area, rows in area_data.items():
-            clean_area = area.replace('/', '_').replace('\\', '_')
-            if not clean_area: clean_area = "NoArea"
-            filename = f"{clean_area}_Addresses.csv"
-            
-            csv_io = io.StringIO()
-            writer = csv.writer(csv_io, quoting=csv.QUOTE_ALL)
-            for row in rows:
-                writer.writerow(row)
-            
-            temp_zip.writestr(filename, csv_io.getvalue().encode('utf-8-sig'))
-            
-    zip_io.seek(0)
+def extract_addresses(req: ExtractAddressRequest, request: Request):
+    def build(path, parser, progress):
+        import zipfile
+        from .extension_analyzer import ExtensionAnalyzer
+        
+        analyzer = ExtensionAnalyzer(parser, progress)
+        area_data = analyzer.extract_address_map_by_area(alarm_only=req.alarm_only)
+        
+        if not area_data:
+            raise HTTPException(status_code=404, detail="No address data found.")
+        
+        with artifact_writer(path) as f, zipfile.ZipFile(f, mode='w', compression=zipfile.ZIP_DEFLATED) as temp_zip:
+            for area, rows in area_data.items():
+                clean_area = area.replace('/', '_').replace('\\', '_')
+                if not clean_area: clean_area = "NoArea"
+                filename = f"{clean_area}_Addresses.csv"
+                
+                csv_io = io.StringIO()
+                writer = csv.writer(csv_io, quoting=csv.QUOTE_ALL)
+                for row in rows:
+                    writer.writerow(row)
+                
+                write_zip_member(temp_zip, filename, csv_io.getvalue().encode('utf-8-sig'))
+    
     suffix = "AlarmOnly" if req.alarm_only else "AllTags"
-    return StreamingResponse(
-        iter([zip_io.getvalue()]), 
-        media_type="application/zip", 
-        headers={"Content-Disposition": f"attachment; filename=Addresses_{suffix}.zip"}
-    )
+    params = {"alarm_only": req.alarm_only}
+    return serve_artifact(request, req.session_id, "addresses", params, f"Addresses_{suffix}.zip", "application/zip", build, req.progress_id)
 
 class AnalyzeExtensionsRequest(BaseModel):
     session_id: str
+    progress_id: Optional[str] = None
 
-@app.post("/api/analyze/extensions")
-def analyze_extensions(req: AnalyzeExtensionsRequest):
-    parser = get_parser(req.session_id)
-    analyzer = ExtensionAnalyzer(parser)
+def build_extensions_report(path, parser, progress):
+    from .extension_analyzer import ExtensionAnalyzer
+    
+    analyzer = ExtensionAnalyzer(parser, progress)
     results = analyzer.analyze()
     
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Extension Type", "Defined Item"])
-    for ext_type, items in results.items():
-        for item in items:
-            writer.writerow([ext_type, item])
+    with artifact_writer(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Extension Type", "Defined Item"])
+        for ext_type, items in results.items():
+            for item in items:
+                writer.writerow([ext_type, item])
+
+@app.post("/api/analyze/extensions")
+def analyze_extensions(req: AnalyzeExtensionsRequest, request: Request):
+    return serve_artifact(request, req.session_id, "extensions", {}, "extensions_report.csv", "text/csv",
+                          build_extensions_report, req.progress_id)
+
+def get_dataset(session_id: str, name: str):
+    session = get_session(session_id)
+    key = (model_key(session_id, session), name)
+    with MODELS_LOCK:
+        dataset = DATASETS.get(key)
+    if dataset is not None:
+        CACHE_REQUESTS.inc(cache="dataset", result="hit")
+        return dataset
+    CACHE_REQUESTS.inc(cache="dataset", result="miss")
+    
+    def build():
+        from . import browse as datasets
+        
+        parser = get_parser(session_id, session)
+        if name == "template_names":
+            dataset = datasets.build_name_dataset("Template", [t for t in parser.get_template_names() if t != "$Area"])
+        elif name == "area_names":
+            dataset = datasets.build_name_dataset("Area", [a for a in parser.get_area_names() if a])
+        elif name == "tags":
+            dataset = datasets.build_tag_dataset(parser)
+        else:
+            tags = get_dataset(session_id, "tags")
+            if name == "shortdesc":
+                dataset = datasets.build_shortdesc_dataset(parser, tags)
+            elif name == "plcio":
+                from .extension_analyzer import ExtensionAnalyzer
+                dataset = datasets.build_plcio_dataset(ExtensionAnalyzer(parser), tags)
+            else:
+                dataset = datasets.build_area_dataset(parser, tags)
+        with MODELS_LOCK:
+            if MODELS.get(key[0]) is not parser:
+                # The model was forgotten (session dropped) or evicted meanwhile:
+                # caching the index would keep it past forget_model()
+                return dataset
+            return DATASETS.setdefault(key, dataset)
+    
+    return FLIGHTS.do(("dataset",) + key, build)
+
+# After an upload, a low-priority warm-up builds what the first clicks wait
+# for: the model, the tag index, the PLC I/O index (every tag's Extensions
+# XML) and the extension report. At most AVEVA_WARMUP_CONCURRENCY sessions
+# warm up at once (0 disables it); dropping the session cancels its warm-up.
+WARMUP_STEPS = ("model", "tags", "plcio", "extensions")
+
+def warm_session(session_id: str, step: str):
+    """
+    One warm-up step. Returns False to stop the warm-up. Raises
+    WarmupCancelled if the session is dropped before or during the step,
+    in which case a 404 from its removed dump is expected, not a failure.
+    """
+    session = SESSIONS.get(session_id)
+    if session is None:
+        raise WarmupCancelled(session_id)
+    failure = None
+    try:
+        warmed = warm_step(session_id, session, step)
+    except Exception as e:
+        failure = e
+    if SESSIONS.get(session_id) is None:
+        discard_warmed(session_id, session)
+        raise WarmupCancelled(session_id)
+    if failure is not None:
+        raise failure
+    return warmed
+
+def warm_step(session_id: str, session: dict, step: str):
+    from .snapshot import SnapshotSections
+    
+    if step == "model":
+        parser = get_parser(session_id, session)
+        # Disk-backed because memory is short: indexes held in memory would defeat that
+        return not isinstance(parser.templates, SnapshotSections)
+    if step == "extensions":
+        artifact_key = BLOBS.artifact_key(model_key(session_id, session), "extensions", {})
+        build_artifact(session_id, session, artifact_key, BLOBS.artifact_file(artifact_key, "extensions_report.csv"),
+                       build_extensions_report)
+    else:
+        get_dataset(session_id, step)
+    return True
+
+def discard_warmed(session_id: str, session: dict):
+    """
+    Drops what a warm-up step cached after drop_session() cleaned up, e.g. a
+    model parsed (and snapshot written) from a dump deleted under it.
+    """
+    key = model_key(session_id, session)
+    if key != session["sha256"]:
+        forget_edited_model(key)
+        BLOBS.remove_artifacts(key)
+    if not SESSIONS.count_for(session["sha256"]):
+        forget_model(session["sha256"])
+
+WARMUP = WarmupQueue(
+    warm_session,
+    concurrency=int(os.environ.get("AVEVA_WARMUP_CONCURRENCY", 1)),
+    # Requests waiting for memory go first
+    busy=lambda: BUDGET.waiting > 0,
+)
+
+class PageResponse(BaseModel):
+    columns: List[str]
+    rows: List[List[str]]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+def browse(session_id, name, sort, order, limit, cursor, prefix, contains, filters):
+    from .browse import CursorError
+    
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    dataset = get_dataset(session_id, name)
+    if sort not in dataset.columns:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by {sort}. Columns: {dataset.columns}")
+    
+    try:
+        rows, next_cursor, total = dataset.page(
+            sort,
+            descending=(order == "desc"),
+            limit=limit,
+            cursor=cursor,
+            prefix=prefix,
+            contains=contains,
+            filters=filters
+        )
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return PageResponse(columns=dataset.columns, rows=[list(r) for r in rows], next_cursor=next_cursor, total=total)
+
+# Paginated browse endpoints. prefix matches the start of the sort column,
+# contains is a case-insensitive substring over all columns, template/area are
+# exact filters. Pass next_cursor back as cursor to get the following page.
+
+@app.get("/api/browse/tags", response_model=PageResponse)
+def browse_tags(session_id: str, template: Optional[str] = None, area: Optional[str] = None,
+                prefix: Optional[str] = None, contains: Optional[str] = None,
+                sort: str = "Tag", order: str = "asc", limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None):
+    return browse(session_id, "tags", sort, order, limit, cursor, prefix, contains, {"Template": template, "Area": area})
+
+@app.get("/api/browse/shortdesc", response_model=PageResponse)
+def browse_shortdesc(session_id: str, template: Optional[str] = None, area: Optional[str] = None,
+                     prefix: Optional[str] = None, contains: Optional[str] = None,
+                     sort: str = "Tag", order: str = "asc", limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None):
+    return browse(session_id, "shortdesc", sort, order, limit, cursor, prefix, contains, {"Template": template, "Area": area})
+
+@app.get("/api/browse/plcio", response_model=PageResponse)
+def browse_plcio(session_id: str, template: Optional[str] = None, area: Optional[str] = None,
+                 prefix: Optional[str] = None, contains: Optional[str] = None,
+                 sort: str = "Tag", order: str = "asc", limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None):
+    return browse(session_id, "plcio", sort, order, limit, cursor, prefix, contains, {"Template": template, "Area": area})
+
+@app.get("/api/browse/areas", response_model=PageResponse)
+def browse_areas(session_id: str, prefix: Optional[str] = None, contains: Optional[str] = None,
+                 sort: str = "Area", order: str = "asc", limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None):
+    return browse(session_id, "areas", sort, order, limit, cursor, prefix, contains, {})
+
+# Edits are applied to a copy of the session's model and published atomically,
+# so concurrent browse/extract requests see either the old or the new revision.
+# EDITS_LOCK only orders the edits of one worker: across workers the revision
+# is bumped by a compare-and-set in the session store, together with the edit
+# log append, and an edit that lost the race is applied again on the newer
+# revision, up to EDIT_ATTEMPTS times before answering 409.
+EDITS_LOCK = threading.Lock()
+EDIT_ATTEMPTS = 3
+
+def apply_edits(session_id: str, edits):
+    from .bulk_edits import append_edit_log
+    
+    with EDITS_LOCK:
+        for _ in range(EDIT_ATTEMPTS):
+            session = get_session(session_id)
+            current = get_parser(session_id, session)
+            revision = session.get("revision", 0)
+            
+            parser = current.copy({edit[0] for edit in edits})
+            results = parser.update_tag_values(edits)
+            applied = [
+                (r["Template"], r["Tag"], r["Column"], r["Value"])
+                for r in results if r["Status"] == "updated"
+            ]
+            if not applied:
+                return revision, results
             
-    return StreamingResponse(
-        iter([output.getvalue().encode('utf-8-sig')]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=extensions_report.csv"}
+            new_revision = revision + 1
+            log_path = BLOBS.edit_log_path(session["sha256"], session_id)
+            if SESSIONS.compare_and_update(
+                session_id, {"revision": session.get("revision")}, {"revision": new_revision},
+                before_commit=lambda: append_edit_log(log_path, new_revision, applied)
+            ):
+                break
+        else:
+            raise HTTPException(status_code=409, detail="The session is being edited by another request; try again.")
+        
+        new_session = dict(session, revision=new_revision)
+        hold_edited_model(session_id, new_revision, model_key(session_id, new_session), parser)
+        
+        if revision:
+            # The previous revision's artifacts are private to this session
+            # (hold_edited_model dropped its model)
+            BLOBS.remove_artifacts(model_key(session_id, session))
+        return new_revision, results
+
+class BulkEdit(BaseModel):
+    template: str
+    tag: str
+    column: str
+    value: str
+
+class BulkUpdateRequest(BaseModel):
+    session_id: str
+    edits: List[BulkEdit]
+
+class BulkUpdateResponse(BaseModel):
+    revision: int
+    updated: int
+    unchanged: int
+    failed: int
+    results: List[dict]
+
+def bulk_update_response(revision, results):
+    counts = {"updated": 0, "unchanged": 0}
+    for r in results:
+        if r["Status"] in counts:
+            counts[r["Status"]] += 1
+    return BulkUpdateResponse(
+        revision=revision,
+        updated=counts["updated"],
+        unchanged=counts["unchanged"],
+        failed=len(results) - counts["updated"] - counts["unchanged"],
+        results=results
     )
 
+@app.post("/api/update/bulk", response_model=BulkUpdateResponse)
+def bulk_update(req: BulkUpdateRequest):
+    """Applies ShortDesc / PLC address (or any column) edits in one indexed pass per template."""
+    edits = [(e.template, e.tag, e.column, e.value) for e in req.edits]
+    revision, results = apply_edits(req.session_id, edits)
+    return bulk_update_response(revision, results)
+
+@app.post("/api/update/bulk/csv", response_model=BulkUpdateResponse)
+def bulk_update_csv(session_id: str = Form(...), file: UploadFile = File(...)):
+    """Same as /api/update/bulk, from a CSV exported by the desktop ShortDesc or PLC I/O Manager."""
+    from .bulk_edits import edits_from_csv
+    
+    try:
+        text = io.TextIOWrapper(file.file, encoding='utf-8-sig', newline='')
+        edits = edits_from_csv(text)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    revision, results = apply_edits(session_id, edits)
+    return bulk_update_response(revision, results)
+
+@app.get("/api/update/download")
+def download_modified(session_id: str, request: Request):
+    """
+    The session's dump with its edits applied, streamed in UTF-16 as the
+    desktop app saves it, and compressed on the way if the client accepts it.
+    """
+    from .bulk_edits import iter_dump_bytes
+    
+    session = get_session(session_id)
+    parser = get_parser(session_id, session)
+    base = os.path.splitext(session["filename"])[0]
+    headers = {"Content-Disposition": f'attachment; filename="{base}_Modified.csv"', **vary_headers("text/csv")}
+    body = iter_dump_bytes(parser)
+    coding = response_coding(request, "text/csv")
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+        body = iter_compressed(body, coding)
+    return StreamingResponse(body, media_type="text/csv; charset=utf-16", headers=headers)
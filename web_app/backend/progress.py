@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+
+# Client-chosen ids: keep them to something safe to use as a file name
+PROGRESS_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+# Files are only ever replaced whole, so readers never see a partial event
+PROGRESS_SUFFIX = ".progress"
+
+
+class ProgressHub:
+    """
+    Progress of long-running requests, published as small JSON files under
+    directory so the /api/progress stream works whichever worker (or host
+    sharing UPLOAD_DIR) runs the operation.
+
+    The client picks a progress_id, opens the event stream and passes the same
+    id to the request. Reporters write at most one event per interval; close()
+    writes the final "done" event once the request has finished, even when it
+    was answered from cache and nothing was reported.
+    """
+
+    def __init__(self, directory, interval=0.5, poll_interval=0.25, heartbeat=15):
+        self.directory = directory
+        self.interval = interval
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+
+    def ensure_dir(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+    def valid_id(self, progress_id):
+        return bool(progress_id) and PROGRESS_ID_PATTERN.match(progress_id) is not None
+
+    def path(self, progress_id):
+        return os.path.join(self.directory, progress_id + PROGRESS_SUFFIX)
+
+    def reporter(self, progress_id):
+        """ProgressReporter publishing to progress_id; a silent one if the request has no id."""
+        # Imported here: the parser module is not needed to start the app
+        from .aveva_parser import ProgressReporter
+        if not self.valid_id(progress_id):
+            return ProgressReporter()
+        return ProgressReporter(lambda event: self.publish(progress_id, "progress", event), self.interval)
+
+    def publish(self, progress_id, kind, data):
+        record = {"Event": kind, "Time": time.time(), "Data": data}
+        path = self.path(progress_id)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Progress is best effort; never fail the operation because of it
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def close(self, progress_id, error=None):
+        if self.valid_id(progress_id):
+            status = {"Status": "error", "Detail": error} if error else {"Status": "ok"}
+            self.publish(progress_id, "done", status)
+
+    def read(self, progress_id):
+        try:
+            with open(self.path(progress_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    async def stream(self, progress_id, timeout):
+        """
+        Yields server-sent event frames until the "done" event, or until
+        nothing happened for timeout seconds. Polling is a stat() per
+        poll_interval; the file is only read when it changed.
+        """
+        path = self.path(progress_id)
+        last_mtime = None
+        last_activity = last_frame = time.monotonic()
+
+        while True:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+
+            now = time.monotonic()
+            if mtime is not None and mtime != last_mtime:
+                last_mtime = mtime
+                record = self.read(progress_id)
+                if record is not None:
+                    last_activity = last_frame = now
+                    yield f"event: {record['Event']}\ndata: {json.dumps(record['Data'])}\n\n"
+                    if record["Event"] == "done":
+                        return
+
+            if now - last_activity > timeout:
+                yield "event: timeout\ndata: {}\n\n"
+                return
+            if now - last_frame > self.heartbeat:
+                # Keeps proxies from closing an idle connection
+                last_frame = now
+                yield ": keep-alive\n\n"
+
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+
+
+class MemorySessionStore:
+    """
+    Sessions kept in a process-local dict.
+    Only correct with a single worker process; use SqliteSessionStore otherwise.
+    """
+
+    def __init__(self):
+        self._sessions = {}  # { session_id: record }
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            record = self._sessions.get(session_id)
+            return dict(record) if record is not None else None
+
+    def put(self, session_id, record):
+        with self._lock:
+            self._sessions[session_id] = dict(record)
+
+    def update(self, session_id, **fields):
+        with self._lock:
+            if session_id in self._sessions:
+                self._sessions[session_id].update(fields)
+
+    def compare_and_update(self, session_id, expected, fields, before_commit=None):
+        """
+        Updates a session only if its record still holds the values in
+        expected (a missing field counts as None), e.g. bumps "revision" from
+        the value a request read. before_commit() runs first, with other
+        writers held off; if it raises, the record is left unchanged.
+        Returns False if the session is gone or another update won.
+        """
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None or any(record.get(k) != v for k, v in expected.items()):
+                return False
+            if before_commit:
+                before_commit()
+            record.update(fields)
+            return True
+
+    def release(self, session_id, on_last_reference=None):
+        """
+        Deletes a session and returns its record (None if unknown).
+        If no other session references the same dump, on_last_reference(sha256)
+        runs while the store is still locked, so a concurrent upload of the same
+        dump cannot slip in between the check and the cleanup.
+        """
+        with self._lock:
+            record = self._sessions.pop(session_id, None)
+            if record is None:
+                return None
+            sha256 = record["sha256"]
+            if on_last_reference and not any(r["sha256"] == sha256 for r in self._sessions.values()):
+                on_last_reference(sha256)
+            return record
+
+    def count_for(self, sha256):
+        with self._lock:
+            return sum(1 for r in self._sessions.values() if r["sha256"] == sha256)
+
+    def items(self):
+        with self._lock:
+            return [(sid, dict(r)) for sid, r in self._sessions.items()]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+class SqliteSessionStore:
+    """
+    Sessions kept in a SQLite database next to the uploads, so every worker
+    process (uvicorn --workers N) sharing the upload directory sees the same
+    sessions.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        # The database is opened and its schema created on first use, not at
+        # import time, so a serverless cold start does no file system work
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _conn(self):
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+            if not self._ready:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+            if not self._ready:
+                self._prepare(conn)
+        return conn
+
+    def _prepare(self, conn):
+        with self._ready_lock:
+            if self._ready:
+                return
+            # WAL lets readers in other workers proceed while one of them writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            with _Transaction(conn) as c:
+                c.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions ("
+                    "session_id TEXT PRIMARY KEY, sha256 TEXT NOT NULL, data TEXT NOT NULL)"
+                )
+                c.execute("CREATE INDEX IF NOT EXISTS sessions_sha256 ON sessions (sha256)")
+            self._ready = True
+
+    def _transaction(self):
+        return _Transaction(self._conn())
+
+    def get(self, session_id):
+        row = self._conn().execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, session_id, record):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, sha256, data) VALUES (?, ?, ?)",
+                (session_id, record["sha256"], json.dumps(record)),
+            )
+
+    def update(self, session_id, **fields):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row:
+                record = json.loads(row[0])
+                record.update(fields)
+                conn.execute("UPDATE sessions SET data = ? WHERE session_id = ?", (json.dumps(record), session_id))
+
+    def compare_and_update(self, session_id, expected, fields, before_commit=None):
+        """See MemorySessionStore.compare_and_update. The check and the update share one write transaction."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return False
+            record = json.loads(row[0])
+            if any(record.get(k) != v for k, v in expected.items()):
+                return False
+            if before_commit:
+                before_commit()
+            record.update(fields)
+            conn.execute("UPDATE sessions SET data = ? WHERE session_id = ?", (json.dumps(record), session_id))
+            return True
+
+    def release(self, session_id, on_last_reference=None):
+        """See MemorySessionStore.release. The callback runs inside the write transaction."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            record = json.loads(row[0])
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            remaining = conn.execute("SELECT COUNT(*) FROM sessions WHERE sha256 = ?", (record["sha256"],)).fetchone()[0]
+            if on_last_reference and remaining == 0:
+                on_last_reference(record["sha256"])
+            return record
+
+    def count_for(self, sha256):
+        return self._conn().execute("SELECT COUNT(*) FROM sessions WHERE sha256 = ?", (sha256,)).fetchone()[0]
+
+    def items(self):
+        rows = self._conn().execute("SELECT session_id, data FROM sessions").fetchall()
+        return [(sid, json.loads(data)) for sid, data in rows]
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+class _Transaction:
+    """Wraps a statement group in BEGIN IMMEDIATE ... COMMIT (takes the write lock up front)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def create_session_store(kind, upload_dir):
+    """Builds the store selected by AVEVA_SESSION_STORE ("sqlite" by default, or "memory")."""
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind == "sqlite":
+        return SqliteSessionStore(os.path.join(upload_dir, "sessions.db"))
+    raise ValueError(f"Unknown session store: {kind}")
@@ -0,0 +1,249 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from .aveva_parser import AvevaParser
+
+# File layout:
+#   MAGIC
+#   body: every line of every section, UTF-8 encoded, sections back to back
+#   JSON index: {"encoding": ..., "sections": [[template_name or null, offset, length, rows], ...]}
+#   8-byte little-endian length of the JSON index
+# The index sits at the end so the file is written in a single pass. Offsets are
+# relative to the start of the body; a null name is the header block.
+MAGIC = b"AVSNAP1\n"
+_LENGTH = struct.Struct("<Q")
+# Buffer of the streaming writer, so each line is not a separate write() call
+WRITE_BUFFER = 1024 * 1024
+
+
+def _write_index(f, encoding, sections):
+    index = json.dumps({"encoding": encoding, "sections": sections}).encode("utf-8")
+    f.write(index)
+    f.write(_LENGTH.pack(len(index)))
+
+
+def write_snapshot(parser, path):
+    """Writes the parsed model of a dump so other workers can load it without re-parsing."""
+    sections = []
+    offset = 0
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            blocks = [(None, parser.headers)] + list(parser.templates.items())
+            for name, lines in blocks:
+                data = "".join(lines).encode("utf-8")
+                f.write(data)
+                sections.append([name, offset, len(data), len(lines)])
+                offset += len(data)
+
+            _write_index(f, parser.encoding, sections)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class StreamingSnapshotWriter(AvevaParser):
+    """
+    Parser for dumps too large to hold in memory: lines are written straight
+    to a snapshot instead of being kept in the template lists. Feed it like
+    AvevaParser (parse(), or begin_stream()/feed()/end_stream()), then call
+    commit() to move the finished snapshot to `path`, or abort().
+    Sections are laid out in the same order, with the same "last :TEMPLATE
+    line wins" rule, as the templates of a parsed model.
+    """
+
+    def __init__(self, filepath, path, progress=None):
+        super().__init__(filepath, progress)
+        self.path = path
+        self._file = None
+
+    def begin_stream(self):
+        super().begin_stream()
+        self.abort()
+        self._tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        self._file = open(self._tmp_path, "wb", buffering=WRITE_BUFFER)
+        self._file.write(MAGIC)
+        self._offset = 0
+        # { template_name or None: [offset, length, rows] }
+        self._sections = {None: [0, 0, 0]}
+        self._section = self._sections[None]
+
+    def _consume_line(self, line):
+        stripped_line = line.strip()
+        if stripped_line.startswith(':TEMPLATE='):
+            self._current_template = stripped_line.split('=')[1]
+            # A repeated template replaces the earlier one but keeps its position
+            self._section = self._sections[self._current_template] = [self._offset, 0, 0]
+            if self.progress:
+                self.progress.section(self._current_template)
+        data = line.encode("utf-8")
+        self._file.write(data)
+        self._offset += len(data)
+        self._section[1] += len(data)
+        self._section[2] += 1
+
+    def commit(self):
+        """Writes the index and moves the snapshot into place. Returns its path."""
+        try:
+            sections = [[name, *entry] for name, entry in self._sections.items()]
+            _write_index(self._file, self.encoding, sections)
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self.path)
+        finally:
+            self.abort()
+        return self.path
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if getattr(self, "_tmp_path", None) and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def _decode_lines(data):
+    lines = data.decode("utf-8").split("\n")
+    # split() drops the terminators and leaves a trailing remainder
+    last = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+class SnapshotSections(MutableMapping):
+    """
+    Template sections of a memory-mapped snapshot, decoded on access: the
+    disk-backed form of AvevaParser.templates for dumps too large to hold in
+    memory. Only the CACHE_SIZE most recently used templates stay decoded.
+    Sections are returned as tuples, so editing one in place fails instead of
+    being silently lost when it leaves the cache; assign a list (as
+    AvevaParser.copy(writable_templates) does) to keep an edited section in
+    memory.
+    """
+    CACHE_SIZE = 2
+
+    def __init__(self, mm, body_start, index, line_counts=None):
+        self._mm = mm
+        self._body_start = body_start
+        self._index = index        # { template_name: (offset, length) }
+        self._line_counts = line_counts or {}  # { template_name: lines }, from the snapshot index
+        self._order = list(index)  # Template order of the dump
+        self._assigned = {}        # { template_name: lines } set after loading
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        if name in self._assigned:
+            return self._assigned[name]
+        with self._lock:
+            lines = self._cache.get(name)
+            if lines is not None:
+                self._cache.move_to_end(name)
+                return lines
+        offset, length = self._index[name]
+        start = self._body_start + offset
+        lines = tuple(_decode_lines(self._mm[start:start + length]))
+        with self._lock:
+            self._cache[name] = lines
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return lines
+
+    def __setitem__(self, name, lines):
+        if name not in self._assigned and name not in self._index:
+            self._order.append(name)
+        self._assigned[name] = lines
+
+    def __delitem__(self, name):
+        if name not in self._assigned and name not in self._index:
+            raise KeyError(name)
+        self._assigned.pop(name, None)
+        self._index = {k: v for k, v in self._index.items() if k != name}
+        self._order.remove(name)
+        with self._lock:
+            self._cache.pop(name, None)
+
+    def line_count(self, name):
+        """Number of lines of a section without decoding it, or None if the index does not say."""
+        if name in self._assigned:
+            return len(self._assigned[name])
+        return self._line_counts.get(name)
+
+    def __contains__(self, name):
+        return name in self._assigned or name in self._index
+
+    def __iter__(self):
+        return iter(list(self._order))
+
+    def __len__(self):
+        return len(self._order)
+
+    def copy(self):
+        """Shares the mapped file (and read-only sections) with this mapping."""
+        clone = SnapshotSections(self._mm, self._body_start, self._index, self._line_counts)
+        clone._order = list(self._order)
+        clone._assigned = dict(self._assigned)
+        return clone
+
+
+def read_snapshot_index(path):
+    """Returns the JSON index of a snapshot without reading its body, or None if it is not a valid snapshot."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < len(MAGIC) + _LENGTH.size or f.read(len(MAGIC)) != MAGIC:
+            return None
+        f.seek(size - _LENGTH.size)
+        (index_len,) = _LENGTH.unpack(f.read(_LENGTH.size))
+        f.seek(size - _LENGTH.size - index_len)
+        return json.loads(f.read(index_len).decode("utf-8"))
+
+
+def load_snapshot(path, filepath, lazy=False):
+    """
+    Rebuilds an AvevaParser from a snapshot. The file is memory-mapped, so the
+    OS page cache is shared by every worker and no UTF-16 decoding or section
+    scan is needed. With lazy=True the templates are a SnapshotSections
+    mapping decoded on access, and the file stays mapped for the lifetime of
+    the parser. Returns None if the file is not a valid snapshot.
+    """
+    index = read_snapshot_index(path)
+    if index is None:
+        return None
+
+    parser = AvevaParser(filepath)
+    parser.encoding = index["encoding"]
+    body_start = len(MAGIC)
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    lazy_index = {}
+    line_counts = {}
+    for name, offset, length, *rows in index["sections"]:
+        if name is not None and lazy:
+            lazy_index[name] = (offset, length)
+            if rows:
+                line_counts[name] = rows[0]
+            continue
+        start = body_start + offset
+        lines = _decode_lines(mm[start:start + length])
+        if name is None:
+            parser.headers = lines
+        else:
+            parser.templates[name] = lines
+
+    if lazy:
+        parser.templates = SnapshotSections(mm, body_start, lazy_index, line_counts)
+    else:
+        mm.close()
+    return parser
@@ -0,0 +1,25 @@
+import threading
+
+
+class RunOnceMiddleware:
+    """
+    ASGI middleware that runs setup() once, before the first request is handled.
+    Used for work that would otherwise happen at import time (creating
+    directories), which every serverless cold start would pay for even when
+    the first request does not need it. Afterwards it costs one flag check
+    per request.
+    """
+
+    def __init__(self, app, setup):
+        self.app = app
+        self.setup = setup
+        self._done = False
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if not self._done and scope["type"] == "http":
+            with self._lock:
+                if not self._done:
+                    self.setup()
+                    self._done = True
+        await self.app(scope, receive, send)
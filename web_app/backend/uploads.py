@@ -0,0 +1,144 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+
+from .admission import DISK, MEMORY, DumpScan
+from .aveva_parser import AvevaParser
+from .snapshot import StreamingSnapshotWriter
+
+# Read/write granularity for spooling uploads to disk
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Raised when an upload cannot be turned into a dump file (e.g. ZIP without CSV)."""
+
+
+class IngestResult:
+    def __init__(self, filepath, filename, sha256, size, parser, mode=MEMORY, snapshot_path=None):
+        self.filepath = filepath  # Dump (CSV) file on disk
+        self.filename = filename  # Original name, or the CSV member name for ZIPs
+        self.sha256 = sha256      # Hex digest of the CSV content
+        self.size = size          # Size of the CSV content in bytes
+        self.parser = parser      # Parser already populated by the section scan (MEMORY mode)
+        self.mode = mode          # admission.MEMORY or admission.DISK
+        self.snapshot_path = snapshot_path  # Snapshot written during the scan (DISK mode)
+
+
+def _remaining_size(src):
+    """Bytes left to read from a seekable file object, None if it is not seekable."""
+    try:
+        position = src.tell()
+        end = src.seek(0, os.SEEK_END)
+        src.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _pump(src, dest, parser, total_bytes=None):
+    """Copies src to dest chunk by chunk, hashing and section-scanning every chunk on the way."""
+    digest = hashlib.sha256()
+    size = 0
+    parser.begin_stream()
+    if parser.progress:
+        parser.progress.begin("upload", total_bytes=total_bytes)
+
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        dest.write(chunk)
+        digest.update(chunk)
+        parser.feed(chunk)
+        size += len(chunk)
+
+    parser.end_stream()
+    if parser.progress:
+        parser.progress.finish()
+    return digest.hexdigest(), size
+
+
+def _make_parser(mode, file_location, progress):
+    if mode == DISK:
+        return StreamingSnapshotWriter(file_location, file_location + ".snap.part", progress)
+    return AvevaParser(file_location, progress)
+
+
+def ingest_upload(src, filename, file_location, progress=None, admit=None):
+    """
+    Writes an uploaded dump to file_location without buffering it in memory.
+    The content hash and the template section scan are computed in the same pass,
+    so the file never has to be re-read for parsing.
+    ZIP uploads are spooled to disk first (the central directory sits at the end
+    of the archive), then the first CSV member is decompressed as a stream.
+    progress (a ProgressReporter) receives bytes and rows scanned.
+    admit(scan), if given, is called before anything is parsed and returns
+    the mode to hold the model in. The scan is DumpScan.from_size() of the
+    CSV (the ZIP member's declared size), not a scan of the content, so the
+    dump is still read once. In DISK mode no model is built; the sections are
+    streamed into a snapshot (IngestResult.snapshot_path) instead.
+    Returns an IngestResult.
+    """
+    mode = MEMORY
+    parser = None
+    spool = None
+
+    try:
+        if filename.lower().endswith(".zip"):
+            zip_location = file_location + ".zip.part"
+            try:
+                with open(zip_location, "wb") as f:
+                    shutil.copyfileobj(src, f, CHUNK_SIZE)
+
+                with zipfile.ZipFile(zip_location) as z:
+                    csv_files = [n for n in z.namelist() if n.lower().endswith(".csv")]
+                    if not csv_files:
+                        raise UploadError("No CSV file found in ZIP")
+
+                    target_csv = csv_files[0]
+                    csv_size = z.getinfo(target_csv).file_size
+                    if admit is not None:
+                        mode = admit(DumpScan.from_size(csv_size))
+                    parser = _make_parser(mode, file_location, progress)
+                    with z.open(target_csv) as zf, open(file_location, "wb") as f:
+                        sha256, size = _pump(zf, f, parser, csv_size)
+                    # Keep the extracted CSV name for reference
+                    filename = target_csv
+            finally:
+                if os.path.exists(zip_location):
+                    os.remove(zip_location)
+        else:
+            if admit is not None:
+                if _remaining_size(src) is None:
+                    # Admission needs the size up front (uploads are already spooled, so seekable)
+                    spool = tempfile.TemporaryFile(dir=os.path.dirname(file_location) or None)
+                    shutil.copyfileobj(src, spool, CHUNK_SIZE)
+                    spool.seek(0)
+                    src = spool
+                mode = admit(DumpScan.from_size(_remaining_size(src)))
+            parser = _make_parser(mode, file_location, progress)
+            with open(file_location, "wb") as f:
+                sha256, size = _pump(src, f, parser, _remaining_size(src))
+
+        snapshot_path = parser.commit() if mode == DISK else None
+    except Exception:
+        if isinstance(parser, StreamingSnapshotWriter):
+            parser.abort()
+        if os.path.exists(file_location):
+            try:
+                os.remove(file_location)
+            except OSError:
+                pass
+        raise
+    finally:
+        if spool is not None:
+            spool.close()
+
+    if mode == DISK:
+        return IngestResult(file_location, filename, sha256, size, None, mode, snapshot_path)
+    # The model outlives this request
+    parser.progress = None
+    return IngestResult(file_location, filename, sha256, size, parser, mode)
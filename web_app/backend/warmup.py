@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+# Niceness added to warm-up threads (Linux applies it per thread)
+WARMUP_NICE = 10
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupCancelled(Exception):
+    """Raised by run_step when what the job warms up is gone; counted as cancelled, not failed."""
+
+
+class _Job:
+    def __init__(self, key, steps):
+        self.key = key
+        self.steps = steps
+        self.cancelled = threading.Event()
+
+
+class WarmupQueue:
+    """
+    Low-priority background work, one job per session: run_step(key, step)
+    is called for each step in order and returns False to end the job early.
+    At most `concurrency` jobs run at once (0 disables warm-ups), each on a
+    daemon thread of its own with a lowered OS priority; other jobs wait in
+    FIFO order. A step raising WarmupCancelled ends the job as cancelled;
+    other errors end it as failed and are logged. Before each step the job waits while busy() is true, so
+    warm-ups give way to requests queued for memory.
+
+    cancel(key) stops a job before its next step. A step in progress is not
+    interrupted: its result lands in the shared caches, where requests may
+    already be waiting on it.
+    """
+
+    def __init__(self, run_step, concurrency=1, busy=None, busy_poll=0.5):
+        self.run_step = run_step
+        self.concurrency = concurrency
+        self.busy = busy or (lambda: False)
+        self.busy_poll = busy_poll
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._jobs = {}  # { key: _Job }, queued or running
+        self._running = 0
+        self.counters = {"completed": 0, "cancelled": 0, "failed": 0}
+
+    def submit(self, key, steps):
+        """Queues a warm-up. Returns False if disabled or one is already queued for key."""
+        if self.concurrency <= 0:
+            return False
+        with self._lock:
+            if key in self._jobs:
+                return False
+            job = _Job(key, list(steps))
+            self._jobs[key] = job
+            self._pending.append(job)
+            if self._running < self.concurrency:
+                self._running += 1
+                threading.Thread(target=self._worker, name="warmup", daemon=True).start()
+        return True
+
+    def cancel(self, key):
+        with self._lock:
+            job = self._jobs.pop(key, None)
+            if job is None:
+                return False
+            job.cancelled.set()
+            try:
+                self._pending.remove(job)
+                # Never started
+                self.counters["cancelled"] += 1
+            except ValueError:
+                pass
+        return True
+
+    def _worker(self):
+        if hasattr(os, "setpriority") and hasattr(threading, "get_native_id"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), WARMUP_NICE)
+            except OSError:
+                pass
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._running -= 1
+                    return
+                job = self._pending.popleft()
+            self._run(job)
+
+    def _run(self, job):
+        result = "completed"
+        for step in job.steps:
+            while self.busy() and not job.cancelled.is_set():
+                time.sleep(self.busy_poll)
+            if job.cancelled.is_set():
+                result = "cancelled"
+                break
+            try:
+                if self.run_step(job.key, step) is False:
+                    break
+            except WarmupCancelled:
+                result = "cancelled"
+                break
+            except Exception:
+                # Warm-ups are best effort; the request that needs the result will report the error
+                logger.warning("Warm-up %s of %s failed", step, job.key, exc_info=True)
+                result = "failed"
+                break
+        with self._lock:
+            self.counters[result] += 1
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+
+    def status(self):
+        with self._lock:
+            return {
+                "warmup_queued": len(self._pending),
+                "warmup_running": len(self._jobs) - len(self._pending),
+            }
@@ -21,6 +21,7 @@ function App() {
     const [processing, setProcessing] = useState(false);
     const [dragActive, setDragActive] = useState(false);
     const [message, setMessage] = useState(null);
+    const [progress, setProgress] = useState(null);
 
     useEffect(() => {
         // Check active sessions and sets the user
@@ -38,27 +39,104 @@ function App() {
         return () => subscription.unsubscribe();
     }, []);
 
+    // Follows /api/progress/{id} while a long request runs; returns the id and a function to stop
+    const watchProgress = () => {
+        const progressId = crypto.randomUUID();
+        const source = new EventSource(`/api/progress/${progressId}`);
+        const stop = () => {
+            source.close();
+            setProgress(null);
+        };
+        source.addEventListener('progress', (e) => setProgress(JSON.parse(e.data)));
+        source.addEventListener('done', stop);
+        source.addEventListener('timeout', stop);
+        return [progressId, stop];
+    };
+
+    const formatProgress = (p) => {
+        let done = `${p.Rows.toLocaleString()} rows`;
+        if (p.TotalBytes) done = `${Math.round(100 * p.Bytes / p.TotalBytes)}%`;
+        else if (p.TotalRows) done = `${Math.round(100 * p.Rows / p.TotalRows)}%`;
+        const template = p.Template ? ` (${p.Template})` : '';
+        const rate = p.RowsPerSecond ? `, ${p.RowsPerSecond.toLocaleString()} rows/s` : '';
+        return `${p.Operation}: ${done}${template}${rate}`;
+    };
+
+    // Files above this go through the resumable chunked upload API
+    const CHUNKED_UPLOAD_THRESHOLD = 32 * 1024 * 1024;
+    const PARALLEL_CHUNKS = 3;
+
+    const sha256Hex = async (buffer) => {
+        const digest = await crypto.subtle.digest('SHA-256', buffer);
+        return Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('');
+    };
+
+    // init -> PUT every chunk (a few in parallel, each retried) -> finalize
+    const uploadChunked = async (file, progressId) => {
+        const { data: upload } = await axios.post('/api/upload/chunked', { filename: file.name, size: file.size });
+        const pending = [...upload.missing];
+        let sent = upload.chunks - pending.length;
+
+        const sendChunk = async (index) => {
+            const blob = file.slice(index * upload.chunk_size, (index + 1) * upload.chunk_size);
+            const buffer = await blob.arrayBuffer();
+            const checksum = await sha256Hex(buffer);
+            for (let attempt = 1; ; attempt++) {
+                try {
+                    await axios.put(`/api/upload/chunked/${upload.upload_id}/${index}`, buffer, {
+                        headers: { 'Content-Type': 'application/octet-stream', 'X-Chunk-Sha256': checksum },
+                    });
+                    break;
+                } catch (err) {
+                    if (attempt >= 3) throw err;
+                }
+            }
+            sent += 1;
+            setProgress({ Operation: 'upload', Rows: 0, Bytes: sent, TotalBytes: upload.chunks, Template: null });
+        };
+
+        const worker = async () => {
+            while (pending.length) await sendChunk(pending.shift());
+        };
+        await Promise.all(Array.from({ length: PARALLEL_CHUNKS }, worker));
+        return axios.post(`/api/upload/chunked/${upload.upload_id}/finalize?progress_id=${progressId}`);
+    };
+
     const uploadFile = async (file) => {
         if (!file) return;
 
         setUploading(true);
         const formData = new FormData();
         formData.append('file', file);
+        const [progressId, stopProgress] = watchProgress();
 
         try {
-            const res = await axios.post('/api/upload', formData, {
-                headers: { 'Content-Type': 'multipart/form-data' },
-            });
+            const res = file.size > CHUNKED_UPLOAD_THRESHOLD
+                ? await uploadChunked(file, progressId)
+                : await axios.post(`/api/upload?progress_id=${progressId}`, formData, {
+                    headers: { 'Content-Type': 'multipart/form-data' },
+                });
             setSession(res.data);
             setMessage({ type: 'success', text: 'File uploaded successfully!' });
         } catch (err) {
             console.error(err);
             setMessage({ type: 'error', text: 'Upload failed: ' + (err.response?.data?.detail || err.message) });
         } finally {
+            stopProgress();
             setUploading(false);
         }
     };
 
+    const resetSession = async () => {
+        // Release the server-side copy; shared dumps are kept until their last session ends
+        try {
+            await axios.delete(`/api/session/${session.session_id}`);
+        } catch (err) {
+            console.error(err);
+        }
+        setSession(null);
+    };
+
     const handleFileSelect = (e) => {
         uploadFile(e.target.files[0]);
     };
@@ -95,10 +173,12 @@ function App() {
     const extractTemplates = async () => {
         if (selectedTemplates.length === 0) return;
         setProcessing(true);
+        const [progressId, stopProgress] = watchProgress();
         try {
-            const res = await axios.post('/api/extract/templates', {
+            const res = await axios.post('/api/extract/template', {
                 session_id: session.session_id,
-                templates: selectedTemplates
+                templates: selectedTemplates,
+                progress_id: progressId
             }, { responseType: 'blob' });
 
             const url = window.URL.createObjectURL(new Blob([res.data]));
@@ -107,6 +187,7 @@ function App() {
         } catch (err) {
             setMessage({ type: 'error', text: 'Extraction failed.' });
         } finally {
+            stopProgress();
             setProcessing(false);
         }
     };
@@ -114,10 +195,12 @@ function App() {
     const extractAreas = async () => {
         if (selectedAreas.length === 0) return;
         setProcessing(true);
+        const [progressId, stopProgress] = watchProgress();
         try {
-            const res = await axios.post('/api/extract/areas', {
+            const res = await axios.post('/api/extract/area', {
                 session_id: session.session_id,
-                areas: selectedAreas
+                areas: selectedAreas,
+                progress_id: progressId
             }, { responseType: 'blob' });
 
             const url = window.URL.createObjectURL(new Blob([res.data]));
@@ -126,15 +209,18 @@ function App() {
         } catch (err) {
             setMessage({ type: 'error', text: 'Extraction failed.' });
         } finally {
+            stopProgress();
             setProcessing(false);
         }
     };
 
     const extractMatrix = async () => {
         setProcessing(true);
+        const [progressId, stopProgress] = watchProgress();
         try {
             const res = await axios.post('/api/extract/matrix', {
-                session_id: session.session_id
+                session_id: session.session_id,
+                progress_id: progressId
             }, { responseType: 'blob' });
 
             const url = window.URL.createObjectURL(new Blob([res.data]));
@@ -143,6 +229,7 @@ function App() {
         } catch (err) {
             setMessage({ type: 'error', text: 'Extraction failed.' });
         } finally {
+            stopProgress();
             setProcessing(false);
         }
     };
@@ -150,10 +237,12 @@ function App() {
 
     const extractAddresses = async (alarmOnly) => {
         setProcessing(true);
+        const [progressId, stopProgress] = watchProgress();
         try {
             const res = await axios.post('/api/extract/addresses', {
                 session_id: session.session_id,
-                alarm_only: alarmOnly
+                alarm_only: alarmOnly,
+                progress_id: progressId
             }, { responseType: 'blob' });
 
             const suffix = alarmOnly ? "AlarmOnly" : "AllTags";
@@ -164,15 +253,18 @@ function App() {
             console.error(err);
             setMessage({ type: 'error', text: 'Extraction failed: ' + (err.response?.statusText || "Server Error") });
         } finally {
+            stopProgress();
             setProcessing(false);
         }
     };
 
     const analyzeExtensions = async () => {
         setProcessing(true);
+        const [progressId, stopProgress] = watchProgress();
         try {
             const res = await axios.post('/api/analyze/extensions', {
-                session_id: session.session_id
+                session_id: session.session_id,
+                progress_id: progressId
             }, { responseType: 'blob' });
 
             const url = window.URL.createObjectURL(new Blob([res.data]));
@@ -181,6 +273,7 @@ function App() {
         } catch (err) {
             setMessage({ type: 'error', text: 'Analysis failed.' });
         } finally {
+            stopProgress();
             setProcessing(false);
         }
     };
@@ -231,7 +324,7 @@ function App() {
                             </label>
                         </div>
 
-                        {uploading && <p className="mt-4 text-sm text-gray-500 animate-pulse">Uploading and Parsing...</p>}
+                        {uploading && <p className="mt-4 text-sm text-gray-500 animate-pulse">{progress ? formatProgress(progress) : "Uploading and Parsing..."}</p>}
                         {message && <div className={cn("mt-4 p-2 rounded text-sm", message.type === 'error' ? "bg-red-100 text-red-600" : "bg-green-100 text-green-600")}>{message.text}</div>}
                     </div>
                 </div>
@@ -251,7 +344,7 @@ function App() {
                         <FileText className="w-4 h-4" />
                         <span className="font-medium truncate max-w-[200px]">{session.filename}</span>
                     </div>
-                    <button onClick={() => setSession(null)} className="text-gray-500 hover:text-gray-700 font-medium">Reset</button>
+                    <button onClick={resetSession} className="text-gray-500 hover:text-gray-700 font-medium">Reset</button>
                     <button onClick={() => supabase.auth.signOut()} className="text-red-500 hover:text-red-700 font-medium flex items-center gap-1 ml-2">
                         <LogOut className="w-4 h-4" /> Sign Out
                     </button>
@@ -285,27 +378,25 @@ function App() {
                         </div>
                     )}
 
+                    {processing && progress && (
+                        <div className="mb-4 p-3 rounded bg-blue-50 text-blue-700 border border-blue-100 text-sm animate-pulse">
+                            {formatProgress(progress)}
+                        </div>
+                    )}
+
                     {activeTab === 'templates' && (
                         <div className="h-full flex flex-col">
                             <h2 className="text-lg font-bold mb-4">Template Extraction</h2>
                             <p className="text-gray-500 mb-4 text-sm">Select templates to extract into a new CSV file. $Area is included automatically.</p>
 
-                            <div className="flex-1 overflow-auto border rounded-lg p-2 mb-4 bg-gray-50">
-                                {session.templates.map(tmpl => (
-                                    <label key={tmpl} className="flex items-center gap-2 p-2 hover:bg-gray-100 rounded cursor-pointer">
-                                        <input
-                                            type="checkbox"
-                                            className="w-4 h-4 rounded text-indigo-600 focus:ring-indigo-500"
-                                            checked={selectedTemplates.includes(tmpl)}
-                                            onChange={(e) => {
-                                                if (e.target.checked) setSelectedTemplates([...selectedTemplates, tmpl]);
-                                                else setSelectedTemplates(selectedTemplates.filter(t => t !== tmpl));
-                                            }}
-                                        />
-                                        <span className="text-sm">{tmpl}</span>
-                                    </label>
-                                ))}
-                            </div>
+                            <NameList
+                                key={`${session.session_id}-templates`}
+                                sessionId={session.session_id}
+                                kind="templates"
+                                firstPage={{ items: session.templates, cursor: session.templates_cursor }}
+                                selected={selectedTemplates}
+                                setSelected={setSelectedTemplates}
+                            />
 
                             <div className="flex justify-between items-center">
                                 <span className="text-sm text-gray-500">{selectedTemplates.length} selected</span>
@@ -325,22 +416,14 @@ function App() {
                             <h2 className="text-lg font-bold mb-4">Area Extraction</h2>
                             <p className="text-gray-500 mb-4 text-sm">Select Areas to filter all data. Only data rows matching the area will be kept.</p>
 
-                            <div className="flex-1 overflow-auto border rounded-lg p-2 mb-4 bg-gray-50">
-                                {session.areas.map(area => (
-                                    <label key={area} className="flex items-center gap-2 p-2 hover:bg-gray-100 rounded cursor-pointer">
-                                        <input
-                                            type="checkbox"
-                                            className="w-4 h-4 rounded text-indigo-600 focus:ring-indigo-500"
-                                            checked={selectedAreas.includes(area)}
-                                            onChange={(e) => {
-                                                if (e.target.checked) setSelectedAreas([...selectedAreas, area]);
-                                                else setSelectedAreas(selectedAreas.filter(a => a !== area));
-                                            }}
-                                        />
-                                        <span className="text-sm">{area}</span>
-                                    </label>
-                                ))}
-                            </div>
+                            <NameList
+                                key={`${session.session_id}-areas`}
+                                sessionId={session.session_id}
+                                kind="areas"
+                                firstPage={{ items: session.areas, cursor: session.areas_cursor }}
+                                selected={selectedAreas}
+                                setSelected={setSelectedAreas}
+                            />
 
                             <div className="flex justify-between items-center">
                                 <span className="text-sm text-gray-500">{selectedAreas.length} selected</span>
@@ -414,6 +497,86 @@ function App() {
     );
 }
 
+// Checkbox list over a paged name list (/api/session/{id}/templates or /areas):
+// starts from the first page in the upload response, searches by prefix and
+// loads further pages on demand, so only what was asked for is rendered.
+function NameList({ sessionId, kind, firstPage, selected, setSelected }) {
+    const [prefix, setPrefix] = useState('');
+    const [page, setPage] = useState(firstPage);
+    const [loading, setLoading] = useState(false);
+
+    const fetchPage = (cursor) => axios.get(`/api/session/${sessionId}/${kind}`, {
+        params: { prefix: prefix || undefined, cursor: cursor || undefined },
+    }).then((res) => res.data);
+
+    useEffect(() => {
+        if (!prefix) {
+            setPage(firstPage);
+            return;
+        }
+        let stale = false;
+        // Wait for a pause in typing before asking the server
+        const timer = setTimeout(() => {
+            fetchPage(null).then((data) => {
+                if (!stale) setPage({ items: data.items, cursor: data.next_cursor });
+            }).catch((err) => console.error(err));
+        }, 250);
+        return () => {
+            stale = true;
+            clearTimeout(timer);
+        };
+    }, [prefix]);
+
+    const loadMore = async () => {
+        setLoading(true);
+        try {
+            const data = await fetchPage(page.cursor);
+            setPage({ items: [...page.items, ...data.items], cursor: data.next_cursor });
+        } catch (err) {
+            console.error(err);
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    return (
+        <div className="flex-1 flex flex-col min-h-0 mb-4">
+            <input
+                type="text"
+                value={prefix}
+                onChange={(e) => setPrefix(e.target.value)}
+                placeholder="Search by prefix..."
+                className="mb-2 px-3 py-2 border rounded-lg text-sm focus:outline-none focus:ring-2 focus:ring-indigo-500"
+            />
+            <div className="flex-1 overflow-auto border rounded-lg p-2 bg-gray-50">
+                {page.items.map(name => (
+                    <label key={name} className="flex items-center gap-2 p-2 hover:bg-gray-100 rounded cursor-pointer">
+                        <input
+                            type="checkbox"
+                            className="w-4 h-4 rounded text-indigo-600 focus:ring-indigo-500"
+                            checked={selected.includes(name)}
+                            onChange={(e) => {
+                                if (e.target.checked) setSelected([...selected, name]);
+                                else setSelected(selected.filter(n => n !== name));
+                            }}
+                        />
+                        <span className="text-sm">{name}</span>
+                    </label>
+                ))}
+                {page.cursor && (
+                    <button
+                        onClick={loadMore}
+                        disabled={loading}
+                        className="w-full mt-1 py-2 text-sm text-indigo-600 hover:bg-indigo-50 rounded disabled:opacity-50"
+                    >
+                        {loading ? "Loading..." : "Load more"}
+                    </button>
+                )}
+            </div>
+        </div>
+    );
+}
+
 function TabButton({ id, icon: Icon, label, active, set }) {
     return (
         <button